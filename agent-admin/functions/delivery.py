@@ -0,0 +1,116 @@
+# functions/delivery.py
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class InflightWindow:
+    """
+    Sliding window of emitted-but-unacknowledged data frames.
+
+    A frame is one emit (a single agent_data entry or an agent_data_batch)
+    and counts as many window slots as the entries it carries. Frames stay
+    in the window until the backend acks them or they are discarded; frames
+    not acked within `timeout` seconds are handed back for retransmission
+    with their original payload (same sequence numbers), so the backend can
+    drop duplicates.
+
+    Completed frames leave the window in send order, which lets callers
+    advance an ordered cursor (the spool ack position) safely.
+    """
+
+    def __init__(self, max_entries: int = 64, timeout: float = 10.0):
+        self.max_entries = max(1, max_entries)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._frames: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._entries = 0
+
+        self.sent = 0
+        self.acked = 0
+        self.retransmits = 0
+
+    def has_room(self) -> bool:
+        with self._lock:
+            return self._entries < self.max_entries
+
+    def add(self, event: str, payload: Any, entries: int = 1, spool_pos=None) -> Dict[str, Any]:
+        with self._lock:
+            frame = {
+                "id": next(self._ids),
+                "event": event,
+                "payload": payload,
+                "entries": entries,
+                "spool_pos": spool_pos,
+                "sent_at": time.time(),
+                "attempts": 1,
+                "acked": False,
+            }
+            self._frames[frame["id"]] = frame
+            self._entries += entries
+            self.sent += 1
+            return frame
+
+    def discard(self, frame_id: int):
+        """Forgets a frame whose emit failed; the caller re-queues its data."""
+        with self._lock:
+            frame = self._frames.pop(frame_id, None)
+            if frame and not frame["acked"]:
+                self._entries -= frame["entries"]
+
+    def ack(self, frame_id: int) -> List[Any]:
+        """
+        Marks a frame delivered. Returns the spool positions of frames that
+        are now complete in send order (oldest first).
+        """
+        done = []
+        with self._lock:
+            frame = self._frames.get(frame_id)
+            if frame is None or frame["acked"]:
+                return done
+            frame["acked"] = True
+            self._entries -= frame["entries"]
+            self.acked += 1
+            while self._frames:
+                head = next(iter(self._frames.values()))
+                if not head["acked"]:
+                    break
+                self._frames.popitem(last=False)
+                if head["spool_pos"] is not None:
+                    done.append(head["spool_pos"])
+        return done
+
+    def due(self, everything: bool = False) -> List[Dict[str, Any]]:
+        """
+        Unacked frames to retransmit now: timed-out ones, or all of them
+        (after a reconnect). Their send time and attempt count are updated.
+        """
+        now = time.time()
+        out = []
+        with self._lock:
+            for frame in self._frames.values():
+                if frame["acked"]:
+                    continue
+                if everything or now - frame["sent_at"] >= self.timeout:
+                    frame["sent_at"] = now
+                    frame["attempts"] += 1
+                    self.retransmits += 1
+                    out.append(frame)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = [f for f in self._frames.values() if not f["acked"]]
+            oldest: Optional[float] = min((f["sent_at"] for f in pending), default=None)
+            return {
+                "inflight_frames": len(pending),
+                "inflight_entries": self._entries,
+                "window": self.max_entries,
+                "sent": self.sent,
+                "acked": self.acked,
+                "retransmits": self.retransmits,
+                "oldest_age_s": round(time.time() - oldest, 2) if oldest else 0.0,
+            }
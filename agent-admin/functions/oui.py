@@ -0,0 +1,157 @@
+# functions/oui.py
+"""
+MAC vendor (OUI) lookup for the visualizer scanner's device records.
+
+data/oui.bin is the IEEE MA-L registry compiled by build_oui.py:
+
+    header   "OUI1" | record count (u32) | names offset (u32)      big-endian
+    records  count x (24-bit prefix | 24-bit name offset), sorted by prefix
+    names    length byte + UTF-8 organization name, deduplicated
+
+The file is mmap'd read-only and searched in place (binary search on the
+prefix), so a lookup is O(log n) and the agent only keeps the pages it
+touches resident.
+"""
+import csv
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+MAGIC = b"OUI1"
+HEADER = struct.Struct(">4sII")
+RECORD_SIZE = 6
+
+_BASE = getattr(sys, "_MEIPASS", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+OUI_FILE = os.path.join(_BASE, "data", "oui.bin")
+
+
+def mac_prefix(mac: Union[str, bytes]) -> Optional[int]:
+    """24-bit OUI of a MAC ("aa:bb:cc:...", "aa-bb-cc-...", or 6 bytes); None if unusable."""
+    if isinstance(mac, (bytes, bytearray)):
+        if len(mac) < 3:
+            return None
+        prefix = int.from_bytes(mac[:3], "big")
+    else:
+        digits = "".join(c for c in mac[:8] if c not in ":-.")
+        if len(digits) < 6:
+            return None
+        try:
+            prefix = int(digits[:6], 16)
+        except ValueError:
+            return None
+    # Locally administered (randomized) and multicast addresses have no vendor
+    if prefix & 0x030000:
+        return None
+    return prefix
+
+
+def build_index(rows: Iterable[Tuple[int, str]]) -> bytes:
+    """oui.bin contents from (prefix, organization) pairs."""
+    by_prefix = {}
+    for prefix, name in rows:
+        name = " ".join(name.split())
+        if name:
+            by_prefix[prefix & 0xFFFFFF] = name
+
+    names = bytearray()
+    name_offsets = {}
+    records = bytearray()
+    for prefix in sorted(by_prefix):
+        name = by_prefix[prefix]
+        offset = name_offsets.get(name)
+        if offset is None:
+            encoded = name.encode("utf-8")[:255]
+            offset = name_offsets[name] = len(names)
+            names += bytes([len(encoded)]) + encoded
+        records += prefix.to_bytes(3, "big") + offset.to_bytes(3, "big")
+    if len(names) >= 1 << 24:
+        raise ValueError("OUI names do not fit 24-bit offsets")
+    count = len(by_prefix)
+    return HEADER.pack(MAGIC, count, HEADER.size + count * RECORD_SIZE) + bytes(records) + bytes(names)
+
+
+def read_ieee_csv(path: str) -> Iterator[Tuple[int, str]]:
+    """(prefix, organization) from the IEEE registry CSV (Registry,Assignment,Organization Name,...)."""
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        for row in csv.DictReader(f):
+            assignment = (row.get("Assignment") or "").strip()
+            if len(assignment) != 6:
+                continue
+            try:
+                yield int(assignment, 16), row.get("Organization Name") or ""
+            except ValueError:
+                continue
+
+
+class OuiIndex:
+    def __init__(self, path: str = OUI_FILE):
+        self.path = path
+        self.count = 0
+        self._map = None
+        self._names = 0
+        self._opened = False
+        self._lock = threading.Lock()
+
+    def open(self) -> bool:
+        with self._lock:
+            if self._opened:
+                return self._map is not None
+            self._opened = True
+            try:
+                with open(self.path, "rb") as f:
+                    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, count, names = HEADER.unpack_from(m)
+                if magic != MAGIC or names != HEADER.size + count * RECORD_SIZE or names > len(m):
+                    raise ValueError("not an oui.bin file")
+            except (OSError, ValueError, struct.error) as e:
+                logging.warning(f"[OUI] vendor lookup disabled ({self.path}): {e}")
+                return False
+            self._map, self.count, self._names = m, count, names
+            return True
+
+    def lookup(self, mac: Union[str, bytes]) -> Optional[str]:
+        if not self._opened:
+            self.open()
+        m = self._map
+        prefix = mac_prefix(mac) if m is not None else None
+        if prefix is None:
+            return None
+        key = prefix.to_bytes(3, "big")
+        lo, hi = 0, self.count - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            at = HEADER.size + mid * RECORD_SIZE
+            found = m[at:at + 3]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid - 1
+            else:
+                name_at = self._names + int.from_bytes(m[at + 3:at + 6], "big")
+                return m[name_at + 1:name_at + 1 + m[name_at]].decode("utf-8", "replace")
+        return None
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            self._opened = False
+
+
+_index = OuiIndex()
+
+
+def lookup_vendor(mac: Union[str, bytes, None]) -> Optional[str]:
+    return _index.lookup(mac) if mac else None
+
+
+def fill_vendor(record: dict) -> dict:
+    """Sets a scanner device record's "vendor" from its "mac" when the scanner left it empty."""
+    if isinstance(record, dict) and not record.get("vendor") and record.get("mac"):
+        record["vendor"] = lookup_vendor(record["mac"])
+    return record
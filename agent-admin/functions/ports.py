@@ -1,7 +1,26 @@
 # functions/ports.py
+import errno
+import os
+import selectors
 import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+# Non-blocking connect_ex() results meaning "still connecting" (10035 is WSAEWOULDBLOCK)
+_CONNECTING = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN, errno.EALREADY, 10035}
+
+# select() on Windows is limited to 512 sockets per call
+_MAX_INFLIGHT = 500 if sys.platform == "win32" else 4096
 
 def _check_port(target: str, port: int, timeout: float) -> Tuple[int, bool]:
     """Return (port, is_open)."""
@@ -31,6 +50,78 @@ def _parse_port_range(port_range: str) -> Tuple[int, int]:
         start, end = end, start
     return start, end
 
+def _scan_threaded(target: str, ports: Iterable[int], timeout: float, workers: int) -> List[int]:
+    """One blocking connect per port on a thread pool (the previous engine)."""
+    open_ports: List[int] = []
+    with ThreadPoolExecutor(max_workers=max(10, min(workers, 1000))) as executor:
+        futures = {executor.submit(_check_port, target, p, timeout): p for p in ports}
+        for fut in as_completed(futures):
+            port, is_open = fut.result()
+            if is_open:
+                open_ports.append(port)
+    return open_ports
+
+def _scan_selector(target: str, ports: Iterable[int], timeout: float, max_inflight: int) -> List[int]:
+    """
+    Single-threaded scan: up to `max_inflight` non-blocking connects at a
+    time, completions collected in batches from one selector (epoll/kqueue/
+    select). A connect still pending after `timeout` counts as closed.
+    """
+    family, _, _, _, sockaddr = socket.getaddrinfo(target, None, proto=socket.IPPROTO_TCP)[0]
+    max_inflight = max(1, min(max_inflight, _MAX_INFLIGHT))
+    pending = iter(ports)
+    inflight: "OrderedDict[socket.socket, Tuple[int, float]]" = OrderedDict()
+    open_ports: List[int] = []
+
+    def finish(s: socket.socket):
+        inflight.pop(s, None)
+        try:
+            sel.unregister(s)
+        except (KeyError, ValueError):
+            pass
+        s.close()
+
+    with selectors.DefaultSelector() as sel:
+        exhausted = False
+        while True:
+            # Top up the in-flight set
+            while not exhausted and len(inflight) < max_inflight:
+                port = next(pending, None)
+                if port is None:
+                    exhausted = True
+                    break
+                s = socket.socket(family, socket.SOCK_STREAM)
+                s.setblocking(False)
+                res = s.connect_ex((sockaddr[0], port) + tuple(sockaddr[2:]))
+                if res == 0:
+                    open_ports.append(port)
+                    s.close()
+                elif res in _CONNECTING:
+                    inflight[s] = (port, time.monotonic() + timeout)
+                    sel.register(s, selectors.EVENT_WRITE)
+                else:
+                    s.close()
+
+            if not inflight:
+                break
+
+            # Deadlines are in launch order, so the oldest one bounds the wait
+            first_deadline = next(iter(inflight.values()))[1]
+            for key, _ in sel.select(max(0.0, first_deadline - time.monotonic())):
+                s = key.fileobj
+                if s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    open_ports.append(inflight[s][0])
+                finish(s)
+
+            now = time.monotonic()
+            while inflight:
+                s, (_, deadline) = next(iter(inflight.items()))
+                if deadline > now:
+                    break
+                finish(s)
+
+    return open_ports
+
 def scan_ports(target: str = "127.0.0.1",
                port_range: str = "1-1024",
                timeout: float = 0.35,
@@ -38,27 +129,190 @@ def scan_ports(target: str = "127.0.0.1",
     """
     Scan ports on target and return {"target": target, "open_ports": [...]}.
     - timeout: seconds per connection attempt
-    - workers: number of threads to use
+    - workers: number of connection attempts in flight at once
     """
     try:
         start, end = _parse_port_range(port_range)
-        total = end - start + 1
         ports = range(start, end + 1)
+        open_ports = _scan_selector(target, ports, timeout, workers)
+        open_ports.sort()
+        return {"target": target, "open_ports": open_ports, "scanned_range": f"{start}-{end}"}
+    except Exception as e:
+        return {"error": str(e)}
 
-        open_ports: List[int] = []
 
-        # Limit workers sensibly
-        max_workers = max(10, min(workers, 1000))
+# -----------------------------------------------------------
+# Listener inventory (no probing: ask the OS)
+# -----------------------------------------------------------
+_TCP_LISTEN = "0A"
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(_check_port, target, p, timeout): p for p in ports}
-            checked = 0
-            for fut in as_completed(futures):
-                port, is_open = fut.result()
-                checked += 1
-                if is_open:
-                    open_ports.append(port)
-        open_ports.sort()
-        return {"target": target, "open_ports": open_ports, "scanned_range": f"{start}-{end}"}
+def _decode_proc_addr(hex_addr: str, family: int) -> Tuple[str, int]:
+    """'0100007F:1F90' -> ('127.0.0.1', 8080); addresses are host-order 32-bit words."""
+    addr_hex, port_hex = hex_addr.split(":")
+    raw = bytes.fromhex(addr_hex)
+    # Each 4-byte word is little-endian on the hosts we run on
+    raw = b"".join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    return socket.inet_ntop(family, raw), int(port_hex, 16)
+
+def _proc_socket_owners() -> Dict[int, int]:
+    """Socket inode -> pid, from /proc/<pid>/fd (only our own processes unless root)."""
+    owners: Dict[int, int] = {}
+    try:
+        pids = [e.name for e in os.scandir("/proc") if e.name.isdigit()]
+    except OSError:
+        return owners
+    for pid in pids:
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            if target.startswith("socket:["):
+                owners[int(target[8:-1])] = int(pid)
+    return owners
+
+def _proc_name(pid: Optional[int]) -> Optional[str]:
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/comm", "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _listeners_proc(root: str = "/proc/net") -> List[Dict[str, Any]]:
+    """Parses /proc/net/tcp and tcp6 for sockets in LISTEN state."""
+    rows = []
+    for name, family in (("tcp", socket.AF_INET), ("tcp6", socket.AF_INET6)):
+        try:
+            with open(os.path.join(root, name), "r") as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 10 or fields[3] != _TCP_LISTEN:
+                        continue
+                    address, port = _decode_proc_addr(fields[1], family)
+                    rows.append((address, port, 4 if family == socket.AF_INET else 6, int(fields[9])))
+        except OSError:
+            continue
+
+    owners = _proc_socket_owners() if rows else {}
+    names: Dict[int, Optional[str]] = {}
+    listeners = []
+    for address, port, family, inode in rows:
+        pid = owners.get(inode)
+        if pid is not None and pid not in names:
+            names[pid] = _proc_name(pid)
+        listeners.append({"port": port, "address": address, "family": family,
+                          "pid": pid, "process": names.get(pid)})
+    return listeners
+
+def _listeners_psutil() -> List[Dict[str, Any]]:
+    names: Dict[int, Optional[str]] = {}
+    listeners = []
+    for conn in psutil.net_connections(kind="inet"):
+        if conn.type != socket.SOCK_STREAM or conn.status != psutil.CONN_LISTEN or not conn.laddr:
+            continue
+        pid = conn.pid
+        if pid is not None and pid not in names:
+            try:
+                names[pid] = psutil.Process(pid).name()
+            except Exception:
+                names[pid] = None
+        listeners.append({"port": conn.laddr.port, "address": conn.laddr.ip,
+                          "family": 6 if conn.family == socket.AF_INET6 else 4,
+                          "pid": pid, "process": names.get(pid)})
+    return listeners
+
+def list_listeners() -> Dict[str, Any]:
+    """
+    Every listening TCP socket on this machine (all ports, IPv4 and IPv6)
+    with its owning pid and process name, read from the OS instead of
+    probed. Same shape as scan_ports() plus a "listeners" list, so the
+    backend keeps working off "open_ports".
+    """
+    try:
+        if sys.platform.startswith("linux") and os.path.exists("/proc/net/tcp"):
+            listeners, source = _listeners_proc(), "proc"
+        elif psutil is not None:
+            listeners, source = _listeners_psutil(), "psutil"
+        else:
+            return {"error": "no listener source available (psutil missing)"}
+        listeners.sort(key=lambda l: (l["port"], l["family"], l["address"]))
+        return {
+            "target": "localhost",
+            "open_ports": sorted({l["port"] for l in listeners}),
+            "scanned_range": "1-65535",
+            "listeners": listeners,
+            "source": source,
+        }
     except Exception as e:
         return {"error": str(e)}
+
+def collect_ports() -> Dict[str, Any]:
+    """
+    port_scan collector. AGENT_PORT_SCAN_MODE=listeners (default) reads the
+    OS listener table; "connect" connect-scans 127.0.0.1:1-1024 as before.
+    Falls back to the connect scan if the listener table is unavailable.
+    """
+    if os.getenv("AGENT_PORT_SCAN_MODE", "listeners").lower() != "connect":
+        result = list_listeners()
+        if "error" not in result:
+            return result
+    return scan_ports("127.0.0.1", "1-1024")
+
+
+# -----------------------------------------------------------
+# Change-driven reporting
+# -----------------------------------------------------------
+class ListenerTracker:
+    """
+    Turns successive collect_ports() results into what needs sending: a
+    full port_scan snapshot the first time and whenever request_full() was
+    called (reconnect, backend request), otherwise one port_opened /
+    port_closed event per listener that appeared or went away since the
+    previous result. Unchanged cycles produce nothing.
+
+    Listeners are keyed by (port, address, family) when the result carries
+    a "listeners" list, by port alone for a connect scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous: Optional[Dict[Tuple, Dict[str, Any]]] = None
+        self._detailed = None
+        self._full = True
+
+    def request_full(self):
+        with self._lock:
+            self._full = True
+
+    def update(self, result: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Returns [(data_type, payload), ...] to send for this result."""
+        if "error" in result:
+            return [("port_scan", result)]
+
+        detailed = "listeners" in result
+        if detailed:
+            current = {(l["port"], l["address"], l["family"]): l for l in result["listeners"]}
+        else:
+            current = {(port,): {"port": port} for port in result.get("open_ports", [])}
+
+        with self._lock:
+            previous, self._previous = self._previous, current
+            # Also full when the collector mode changed and the keys are not comparable
+            full = self._full or previous is None or detailed != self._detailed
+            self._full = False
+            self._detailed = detailed
+        if full:
+            return [("port_scan", result)]
+
+        now = datetime.now().isoformat()
+        out = [("port_closed", dict(previous[k], timestamp=now)) for k in previous.keys() - current.keys()]
+        out += [("port_opened", dict(current[k], timestamp=now)) for k in current.keys() - previous.keys()]
+        return out
@@ -0,0 +1,170 @@
+# functions/scanner_link.py
+"""
+agent-admin's end of the pipe to the visualizer scanner subprocess.
+Mirrors visualizer-scanner/framing.py:
+
+    4-byte big-endian body length | 1-byte codec ("j" JSON, "m" msgpack) | body
+
+The scanner is asked for frames (SCANNER_PROTOCOL=framed). A scanner that
+answers with JSON lines instead (older build) is detected from the first
+byte (frames start with 0x00) and read line by line. Control messages go
+back on the scanner's stdin in whichever form it speaks.
+"""
+import json
+import logging
+import struct
+import threading
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+HEADER = struct.Struct(">IB")
+MAX_FRAME = 16 * 1024 * 1024
+JSON = ord("j")
+MSGPACK = ord("m")
+
+SUPPORTED_CODECS = "msgpack,json" if msgpack else "json"
+
+
+def encode_frame(obj: Any, codec: int = JSON) -> bytes:
+    if codec == MSGPACK:
+        body = msgpack.packb(obj, use_bin_type=True)
+    else:
+        body = json.dumps(obj, separators=(",", ":")).encode()
+    return HEADER.pack(len(body), codec) + body
+
+
+def _read_exact(stream, n: int) -> Optional[bytes]:
+    buf = b""
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def read_frame(stream) -> Any:
+    """Next decoded frame from a binary stream; raises EOFError at the end."""
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        raise EOFError
+    length, codec = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"scanner frame too large ({length} bytes)")
+    body = _read_exact(stream, length)
+    if body is None:
+        raise EOFError
+    if codec == MSGPACK:
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def extract_first_json(s):
+    s = s.strip()
+    if not s:
+        return None
+    start = None
+    for i, ch in enumerate(s):
+        if ch in ("[", "{"):
+            start = i
+            break
+    if start is None:
+        return None
+    pairs = {"{": "}", "[": "]"}
+    stack = []
+    for j in range(start, len(s)):
+        c = s[j]
+        if c in ("{", "["):
+            stack.append(c)
+        elif c in ("}", "]"):
+            if not stack:
+                continue
+            top = stack[-1]
+            if pairs.get(top) == c:
+                stack.pop()
+                if not stack:
+                    return s[start:j+1]
+    return None
+
+
+def parse_line(line: str) -> Any:
+    """A JSON line; lines with other text around the JSON go through extract_first_json."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        js = extract_first_json(line)
+        return json.loads(js) if js else None
+
+
+def scanner_env(base: Dict[str, str]) -> Dict[str, str]:
+    """Environment asking the scanner for framed output in a codec we can read."""
+    return dict(base, SCANNER_PROTOCOL="framed", SCANNER_CODECS=SUPPORTED_CODECS)
+
+
+class ScannerLink:
+    """
+    Reads records from a scanner started with binary pipes (stdin, stdout)
+    and hands each decoded JSON value to `on_record`. send_control() is
+    thread-safe.
+    """
+
+    def __init__(self, proc, on_record: Callable[[Any], None]):
+        self.proc = proc
+        self.on_record = on_record
+        self.framed = True
+        self._lock = threading.Lock()
+        self.frames = 0
+
+    def run(self):
+        """Blocks until the scanner's stdout closes."""
+        stdout = self.proc.stdout
+        first = stdout.peek(1)[:1]
+        if not first:
+            return
+        self.framed = first == b"\x00"
+        if not self.framed:
+            logging.info("[SCAN] scanner speaks JSON lines; using line mode")
+        while True:
+            try:
+                if self.framed:
+                    record = read_frame(stdout)
+                else:
+                    raw = stdout.readline()
+                    if not raw:
+                        break
+                    record = parse_line(raw.decode("utf-8", "replace"))
+            except EOFError:
+                break
+            except ValueError as e:
+                logging.error(f"[SCAN] unreadable scanner output: {e}")
+                if self.framed:
+                    break  # lost frame sync
+                continue
+            if record is None:
+                continue
+            self.frames += 1
+            try:
+                self.on_record(record)
+            except Exception as e:
+                logging.error(f"[SCAN] failed to handle scanner record: {e}")
+
+    def send_control(self, msg: Dict[str, Any]) -> bool:
+        stdin = getattr(self.proc, "stdin", None)
+        if stdin is None or self.proc.poll() is not None:
+            return False
+        data = encode_frame(msg) if self.framed else (json.dumps(msg) + "\n").encode()
+        try:
+            with self._lock:
+                stdin.write(data)
+                stdin.flush()
+            return True
+        except (OSError, ValueError) as e:
+            logging.error(f"[SCAN] could not send control message: {e}")
+            return False
@@ -0,0 +1,279 @@
+# functions/spool.py
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# Record framing: magic, payload length, crc32(payload), payload (compact JSON).
+# A zeroed or corrupt header marks the end of the written part of a segment.
+_MAGIC = b"SR"
+_HEADER = struct.Struct("<2sII")
+_SEGMENT_RE = re.compile(r"^(\d{8})\.seg$")
+
+Position = Tuple[int, int]  # (segment id, offset just past the record)
+
+
+class Spool:
+    """
+    Append-only, segmented on-disk spool for telemetry entries.
+
+    Segments are preallocated files of `segment_size` bytes, written and read
+    through mmap. Each record is CRC-framed so a torn write at the tail (crash
+    mid-append) is detected and ignored on restart. Readers always start at the
+    persisted ack cursor; acknowledging a position advances the cursor and
+    deletes segments that are fully consumed.
+
+    When the spool holds `max_segments` segments the oldest one is discarded,
+    acknowledged or not, so disk usage stays bounded during long outages.
+
+    The cursor file is rewritten at most every `cursor_interval` seconds (and
+    whenever a segment is compacted); a crash can therefore replay up to that
+    much already-delivered data, never lose any.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 4 * 1024 * 1024, max_segments: int = 64,
+                 cursor_interval: float = 1.0):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max(2, max_segments)
+        self.cursor_interval = cursor_interval
+        self.cursor_path = os.path.join(directory, "cursor.json")
+        self._cursor_saved_at = 0.0
+
+        self._lock = threading.Lock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._files: Dict[int, Any] = {}
+
+        self.appended = 0
+        self.acked = 0
+        self.dropped_segments = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = self._list_segments()
+        self._cursor = self._load_cursor()
+
+        # Discard segments that were fully consumed before the last shutdown
+        for seg in [s for s in self._segments if s < self._cursor[0]]:
+            self._remove_segment(seg)
+
+        if not self._segments:
+            self._segments = [max(self._cursor[0], 1)]
+            self._open_segment(self._segments[0], create=True)
+            self._cursor = (self._segments[0], 0)
+        if self._cursor[0] < self._segments[0]:
+            self._cursor = (self._segments[0], 0)
+
+        self._write_seg = self._segments[-1]
+        self._write_off = self._scan_end(self._write_seg)
+        if self._cursor[0] == self._write_seg and self._cursor[1] > self._write_off:
+            self._cursor = (self._write_seg, self._write_off)
+
+    # -------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------
+    def append(self, entry: Dict[str, Any]) -> Position:
+        payload = json.dumps(entry, separators=(",", ":"), default=str).encode("utf-8")
+        header = _HEADER.pack(_MAGIC, len(payload), zlib.crc32(payload))
+        size = len(header) + len(payload)
+
+        with self._lock:
+            mm = self._map(self._write_seg)
+            if self._write_off + size > len(mm):
+                mm = self._roll(size)
+            off = self._write_off
+            mm[off:off + len(header)] = header
+            mm[off + len(header):off + size] = payload
+            self._write_off = off + size
+            self.appended += 1
+            return (self._write_seg, self._write_off)
+
+    def read(self, max_records: int = 100, max_bytes: Optional[int] = None,
+             start: Optional[Position] = None) -> List[Tuple[Position, Dict[str, Any]]]:
+        """
+        Returns up to max_records (position, entry) pairs, starting at the ack
+        cursor or at `start` (a position returned by an earlier read).
+        """
+        out = []
+        total = 0
+        with self._lock:
+            seg, off = max(start, self._cursor) if start else self._cursor
+            while len(out) < max_records:
+                if seg not in self._segments:
+                    break
+                mm = self._map(seg)
+                rec = self._read_record(mm, off)
+                if rec is None:
+                    if seg == self._write_seg:
+                        break
+                    # Sealed segment exhausted: continue with the next one
+                    later = [s for s in self._segments if s > seg]
+                    if not later:
+                        break
+                    seg, off = later[0], 0
+                    continue
+                payload, next_off = rec
+                if max_bytes is not None and out and total + len(payload) > max_bytes:
+                    break
+                try:
+                    entry = json.loads(payload)
+                except ValueError:
+                    logging.warning(f"[⚠️] Spool: skipping undecodable record at {seg}:{off}")
+                    entry = None
+                off = next_off
+                if entry is not None:
+                    out.append(((seg, off), entry))
+                    total += len(payload)
+        return out
+
+    def ack(self, position: Position):
+        """Marks everything up to and including `position` as delivered."""
+        with self._lock:
+            if position <= self._cursor:
+                return
+            self._cursor = position
+            self.acked += 1
+            consumed = [s for s in self._segments if s < position[0]]
+            if consumed or time.monotonic() - self._cursor_saved_at >= self.cursor_interval:
+                self._save_cursor()
+            for seg in consumed:
+                self._remove_segment(seg)
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            seg, off = self._cursor
+            return seg != self._write_seg or off < self._write_off
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "cursor": list(self._cursor),
+                "write": [self._write_seg, self._write_off],
+                "appended": self.appended,
+                "acks": self.acked,
+                "dropped_segments": self.dropped_segments,
+            }
+
+    def close(self):
+        with self._lock:
+            self._save_cursor()
+            for seg in list(self._maps):
+                self._unmap(seg)
+
+    # -------------------------------------------------------
+    # Segments
+    # -------------------------------------------------------
+    def _seg_path(self, seg: int) -> str:
+        return os.path.join(self.directory, f"{seg:08d}.seg")
+
+    def _list_segments(self) -> List[int]:
+        segs = []
+        for name in os.listdir(self.directory):
+            m = _SEGMENT_RE.match(name)
+            if m:
+                segs.append(int(m.group(1)))
+        return sorted(segs)
+
+    def _open_segment(self, seg: int, create=False, size=None):
+        path = self._seg_path(seg)
+        if create:
+            with open(path, "wb") as f:
+                f.truncate(size or self.segment_size)
+        elif os.path.getsize(path) == 0:
+            # Crashed between create and truncate
+            with open(path, "r+b") as f:
+                f.truncate(self.segment_size)
+        f = open(path, "r+b")
+        self._files[seg] = f
+        self._maps[seg] = mmap.mmap(f.fileno(), 0)
+        return self._maps[seg]
+
+    def _map(self, seg: int) -> mmap.mmap:
+        mm = self._maps.get(seg)
+        if mm is None:
+            mm = self._open_segment(seg)
+        return mm
+
+    def _unmap(self, seg: int):
+        mm = self._maps.pop(seg, None)
+        if mm is not None:
+            mm.close()
+        f = self._files.pop(seg, None)
+        if f is not None:
+            f.close()
+
+    def _remove_segment(self, seg: int):
+        self._unmap(seg)
+        try:
+            os.remove(self._seg_path(seg))
+        except OSError:
+            pass
+        if seg in self._segments:
+            self._segments.remove(seg)
+
+    def _roll(self, needed: int) -> mmap.mmap:
+        self._maps[self._write_seg].flush()
+        seg = self._write_seg + 1
+        # A record larger than a segment gets a segment of its own size
+        mm = self._open_segment(seg, create=True, size=max(self.segment_size, needed))
+        self._segments.append(seg)
+        self._write_seg, self._write_off = seg, 0
+
+        while len(self._segments) > self.max_segments:
+            oldest = self._segments[0]
+            logging.warning(f"[⚠️] Spool full, discarding segment {oldest}")
+            self.dropped_segments += 1
+            self._remove_segment(oldest)
+            if self._cursor[0] <= oldest:
+                self._cursor = (self._segments[0], 0)
+                self._save_cursor()
+        return mm
+
+    def _scan_end(self, seg: int) -> int:
+        mm = self._map(seg)
+        off = 0
+        while True:
+            rec = self._read_record(mm, off)
+            if rec is None:
+                return off
+            off = rec[1]
+
+    @staticmethod
+    def _read_record(mm: mmap.mmap, off: int):
+        end = off + _HEADER.size
+        if end > len(mm):
+            return None
+        magic, length, crc = _HEADER.unpack_from(mm, off)
+        if magic != _MAGIC or end + length > len(mm):
+            return None
+        payload = mm[end:end + length]
+        if zlib.crc32(payload) != crc:
+            return None
+        return payload, end + length
+
+    # -------------------------------------------------------
+    # Cursor
+    # -------------------------------------------------------
+    def _load_cursor(self) -> Position:
+        try:
+            with open(self.cursor_path, "r") as f:
+                data = json.load(f)
+            return (int(data["segment"]), int(data["offset"]))
+        except Exception:
+            return (self._segments[0], 0) if self._segments else (1, 0)
+
+    def _save_cursor(self):
+        self._cursor_saved_at = time.monotonic()
+        tmp = self.cursor_path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"segment": self._cursor[0], "offset": self._cursor[1]}, f)
+            os.replace(tmp, self.cursor_path)
+        except Exception as e:
+            logging.error(f"[❌] Spool: failed to save cursor: {e}")
@@ -1,7 +1,6 @@
 import time
 import traceback
 import threading
-import pythoncom
 import subprocess
 import json
 import os
@@ -11,10 +10,13 @@ import shutil
 from dotenv import load_dotenv
 
 from functions.system import get_system_info
-from functions.ports import scan_ports
+from functions.ports import ListenerTracker, collect_ports
 from functions.taskmanager import collect_process_info
 from functions.installed_apps import get_installed_apps
-from functions.sender import send_data, send_raw_network_scan
+from functions.oui import fill_vendor
+from functions.sender import get_data_dir, on_snapshot_reset, send_data, send_network_scan_delta, send_raw_network_scan
+from functions.scheduler import CollectorScheduler, interval_from_env
+from functions.scanner_link import ScannerLink, scanner_env
 from functions.usbMonitor import monitor_usb, connect_socket, sio
 
 # Load environment variables
@@ -39,6 +41,8 @@ def resource_path(relative):
 # USB MONITOR THREAD
 # ============================
 def start_usb_monitor():
+    import pythoncom  # loaded on the USB thread, off the startup path
+
     try:
         pythoncom.CoInitialize()
     except:
@@ -77,6 +81,11 @@ def start_usb_monitor():
 # ==========================================================
 def start_visualizer_scanner():
     base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    # Subprocess scanners report changes (events) in length-prefixed frames
+    # and take control messages on stdin (functions/scanner_link.py); they
+    # keep their host tables next to version.json to warm-start after restarts
+    scan_env = scanner_env(dict(os.environ, SCANNER_OUTPUT="events",
+                                SCANNER_STATE_DIR=os.path.join(get_data_dir(), "scanner-state")))
     original_scan = os.path.join(base, "visualizer-scanner", "scanner_service.py")
     if not os.path.exists(original_scan):
         safe_print("[SCAN ERROR] scanner_service.py missing:", original_scan)
@@ -89,11 +98,11 @@ def start_visualizer_scanner():
         try:
             proc = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
+                stderr=subprocess.PIPE,
                 cwd=os.path.dirname(original_scan),
+                env=scan_env,
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
             threading.Thread(target=scanner_output_listener, args=(proc,), daemon=True).start()
@@ -110,11 +119,11 @@ def start_visualizer_scanner():
             cmd = [sys.executable, original_scan]
             proc = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                cwd=os.path.dirname(original_scan)
+                stderr=subprocess.PIPE,
+                cwd=os.path.dirname(original_scan),
+                env=scan_env
             )
             threading.Thread(target=scanner_output_listener, args=(proc,), daemon=True).start()
             safe_print("[SCAN] started via sys.executable")
@@ -144,77 +153,136 @@ def start_visualizer_scanner():
         return None
 
 # ==========================================================
-# SCANNER OUTPUT LISTENER (parses JSON arrays/objects)
+# SCANNER OUTPUT LISTENER (frames, or JSON lines from older scanners)
 # ==========================================================
-def extract_first_json(s):
-    s = s.strip()
-    if not s:
-        return None
-    start = None
-    for i, ch in enumerate(s):
-        if ch in ("[", "{"):
-            start = i
-            break
-    if start is None:
-        return None
-    pairs = {"{": "}", "[": "]"}
-    stack = []
-    for j in range(start, len(s)):
-        c = s[j]
-        if c in ("{", "["):
-            stack.append(c)
-        elif c in ("}", "]"):
-            if not stack:
-                continue
-            top = stack[-1]
-            if pairs.get(top) == c:
-                stack.pop()
-                if not stack:
-                    return s[start:j+1]
-    return None
+SCANNER_DEVICE_EVENTS = {"device_up", "device_down", "mac_changed", "device_updated"}
+
+def handle_scanner_record(record, pending):
+    """
+    One NDJSON record from the scanner in events mode. Device changes are
+    collected until the cycle_end record and sent together; a checkpoint
+    replaces the backend's device list. Vendors are filled in here from
+    the MAC (functions/oui.py).
+    """
+    kind = record.get("event")
+    if kind in SCANNER_DEVICE_EVENTS:
+        pending.append(fill_vendor(record))
+    elif kind == "cycle_end":
+        if pending:
+            send_network_scan_delta(list(pending))
+            pending.clear()
+    elif kind == "checkpoint":
+        pending.clear()
+        send_raw_network_scan([fill_vendor(dev) for dev in record.get("devices") or []])
+    elif kind == "control":
+        safe_print("[SCAN] control:", record)
+    elif "ip" in record:
+        send_raw_network_scan([fill_vendor(record)])
+    # Anything else (e.g. {"scanner": "started"}) is status, not a device
+
+scanner_link = None
 
 def scanner_output_listener(proc):
+    global scanner_link
     if not proc or not getattr(proc, "stdout", None):
         return
+    if getattr(proc, "stderr", None):
+        threading.Thread(target=scanner_stderr_listener, args=(proc,), daemon=True).start()
+
+    pending = []
+
+    def on_record(parsed):
+        if isinstance(parsed, list):
+            send_raw_network_scan([fill_vendor(dev) for dev in parsed])
+        elif isinstance(parsed, dict):
+            handle_scanner_record(parsed, pending)
+
+    link = ScannerLink(proc, on_record)
+    scanner_link = link
     try:
-        for raw in proc.stdout:
-            if not raw:
-                continue
-            line = raw.strip()
-            js = extract_first_json(line)
-            if not js:
-                continue
-            try:
-                parsed = json.loads(js)
-                if isinstance(parsed, list):
-                    send_raw_network_scan(parsed)
-                elif isinstance(parsed, dict):
-                    send_raw_network_scan([parsed])
-            except Exception:
-                pass
+        link.run()
     except Exception as e:
         safe_print("[SCAN STREAM ERROR]", e)
         traceback.print_exc()
+    finally:
+        if scanner_link is link:
+            scanner_link = None
+
+def scanner_stderr_listener(proc):
+    try:
+        for raw in proc.stderr:
+            line = raw.decode("utf-8", "replace").rstrip()
+            if line:
+                safe_print("[SCANNER]", line)
+    except Exception:
+        pass
+
+@sio.on("scanner_control")
+def handle_scanner_control(data=None):
+    """Backend -> scanner: {"cmd": "rescan" | "pause" | "resume" | "config", "values": {...}}"""
+    if not isinstance(data, dict) or not data.get("cmd"):
+        return
+    link = scanner_link
+    if link is None or not link.send_control(data):
+        safe_print("[SCAN] control not delivered (scanner not running):", data.get("cmd"))
 
 # ==========================================================
 # MAIN SYSTEM SCANS
 # ==========================================================
-def run_scans():
-    try:
-        send_data("system_info", get_system_info())
-        send_data("port_scan", scan_ports("127.0.0.1", "1-1024"))
-        send_data("task_info", collect_process_info())
-        apps = get_installed_apps()
-        send_data("installed_apps", {"apps": apps, "count": len(apps)})
-    except Exception as e:
-        safe_print("[SCAN ERROR]", e)
-        traceback.print_exc()
+def collect_installed_apps():
+    apps = get_installed_apps()
+    return {"apps": apps, "count": len(apps)}
+
+
+port_tracker = ListenerTracker()
+
+
+def collect_port_changes():
+    """
+    port_scan collector: a full snapshot on startup, reconnect or request,
+    otherwise only port_opened / port_closed events (nothing if unchanged).
+    """
+    for data_type, payload in port_tracker.update(collect_ports()):
+        send_data(data_type, payload)
+
+
+def build_scheduler(is_licensed):
+    """
+    Each collector runs on its own interval (override with
+    AGENT_INTERVAL_<NAME>) on a small worker pool; a collector that misses
+    its timeout is skipped for that cycle. The backend can request immediate
+    runs with a "run_collectors" event: {"collectors": ["task_info", ...]}
+    or {} for all.
+    """
+    scheduler = CollectorScheduler(send_data, enabled=is_licensed,
+                                   max_workers=int(os.getenv("AGENT_COLLECTOR_WORKERS", "3")))
+    scheduler.add("system_info", get_system_info, interval_from_env("system_info", 15), timeout=10)
+    # Unchanged cycles send nothing, so listeners can be checked often
+    scheduler.add("port_scan", collect_port_changes, interval_from_env("port_scan", 15), timeout=30)
+    scheduler.add("task_info", collect_process_info, interval_from_env("task_info", 10), timeout=10)
+    scheduler.add("installed_apps", collect_installed_apps,
+                  interval_from_env("installed_apps", 900), timeout=60)
+
+    @sio.on("run_collectors")
+    def handle_run_collectors(data=None):
+        names = data.get("collectors") if isinstance(data, dict) else None
+        started = scheduler.run_now(names)
+        if "port_scan" in started:
+            port_tracker.request_full()
+        safe_print("[SCHEDULER] run now:", ", ".join(started) or "nothing")
+
+    @on_snapshot_reset
+    def resync_ports(types=None):
+        if not types or "port_scan" in types:
+            port_tracker.request_full()
+            scheduler.run_now(["port_scan"])
+
+    return scheduler
 
 # ============================
 # UPDATE CHECKER
 # ============================
 import hashlib
-import requests
 
 def calculate_hash(file_path):
     sha256_hash = hashlib.sha256()
@@ -228,6 +296,8 @@ def check_for_updates():
     """
     Checks for updates every 60 minutes.
     """
+    import requests
+
     while True:
         try:
             time.sleep(60) # Wait 60s before first check
@@ -413,13 +483,7 @@ if __name__ == "__main__":
     # update checker
     threading.Thread(target=check_for_updates, daemon=True).start()
 
-    # main loop
-    # main loop
+    # main loop: per-collector schedule, idle until licensed
     import functions.sender as sender
-    while True:
-        if sender.IS_LICENSED:
-            run_scans()
-        else:
-            # Maybe run minimal heartbeat if not licensed
-            pass
-        time.sleep(3)
+    scheduler = build_scheduler(lambda: sender.IS_LICENSED)
+    scheduler.run_forever()
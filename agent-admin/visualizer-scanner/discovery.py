@@ -0,0 +1,338 @@
+"""
+Passive discovery for scanner_service.py: mDNS (5353), SSDP (1900) and
+NetBIOS name service (137).
+
+One UDP socket per port, bound to the port (shared with other responders
+through SO_REUSEADDR) and joined to the mDNS / SSDP multicast groups on
+every scanned interface. The same socket sends the scanner's wake-up
+datagrams, so unicast replies come back to it too. When a port cannot be
+bound (e.g. Windows owns 137) the socket falls back to an ephemeral port
+and only sends and reads replies.
+
+A listener thread parses what arrives into {ip: {"hostname",
+"device_type", "source"}}; the scanner drains it once per cycle and
+counts those hosts as seen without probing them. query_names() asks one
+host for its names (NetBIOS node status, mDNS reverse lookup); the
+answers arrive through the same listener.
+"""
+
+import select
+import selectors
+import socket
+import struct
+import threading
+
+MDNS_GROUP = "224.0.0.251"
+SSDP_GROUP = "239.255.255.250"
+PROTOCOLS = {5353: ("mdns", MDNS_GROUP), 1900: ("ssdp", SSDP_GROUP), 137: ("netbios", None)}
+
+_DNS_HEADER = struct.Struct(">HHHHHH")
+_RR = struct.Struct(">HHIH")
+TYPE_A, TYPE_PTR, TYPE_SRV = 1, 12, 33
+NBSTAT = 0x21
+SEND_BUFFER = 4 * 1024 * 1024   # the kernel caps it at its own maximum
+
+# DNS-SD service types -> device type
+MDNS_SERVICES = {
+    "_ipp": "printer", "_ipps": "printer", "_printer": "printer", "_pdl-datastream": "printer",
+    "_scanner": "printer", "_uscan": "printer",
+    "_airplay": "media", "_raop": "media", "_googlecast": "media", "_spotify-connect": "media",
+    "_hap": "smart-home", "_homekit": "smart-home", "_matter": "smart-home", "_hue": "smart-home",
+    "_smb": "file-server", "_afpovertcp": "file-server", "_adisk": "file-server", "_nfs": "file-server",
+    "_workstation": "computer", "_rfb": "computer", "_ssh": "computer", "_sftp-ssh": "computer",
+    "_companion-link": "phone", "_apple-mobdev2": "phone",
+}
+
+# UPnP device types (urn:schemas-upnp-org:device:<type>:<v>) -> device type
+SSDP_DEVICES = {
+    "internetgatewaydevice": "router", "wandevice": "router", "wanconnectiondevice": "router",
+    "mediarenderer": "media", "mediaserver": "media", "printer": "printer",
+    "wlanaccesspointdevice": "access-point", "digitalsecuritycamera": "camera",
+}
+
+
+# -------------------------------------------------------
+# Parsers: bytes from `src` -> [(ip, info)]
+# -------------------------------------------------------
+def _read_name(data, pos):
+    """DNS name at `pos` (with compression); returns (name, position after it)."""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[pos]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = pos + 2
+            pos = ((length & 0x3F) << 8) | data[pos + 1]
+            continue
+        pos += 1
+        if length == 0:
+            break
+        labels.append(data[pos:pos + length].decode("utf-8", "replace"))
+        pos += length
+    return ".".join(labels), (end if end is not None else pos)
+
+
+def _service_type(name):
+    for label in name.lower().split("."):
+        if label in MDNS_SERVICES:
+            return MDNS_SERVICES[label]
+    return None
+
+
+def _local_host(name):
+    """'Living-Room-TV.local' -> 'Living-Room-TV'."""
+    host = name[:-6] if name.lower().endswith(".local") else name
+    return host or None
+
+
+def parse_mdns(data, src):
+    try:
+        _, flags, qd, an, ns, ar = _DNS_HEADER.unpack_from(data)
+        if not flags & 0x8000:
+            return []  # queries say nothing about the sender
+        pos = _DNS_HEADER.size
+        for _ in range(qd):
+            _, pos = _read_name(data, pos)
+            pos += 4
+        found = {}
+        sender = {}
+        for _ in range(an + ns + ar):
+            name, pos = _read_name(data, pos)
+            rtype, _, _, rdlen = _RR.unpack_from(data, pos)
+            pos += _RR.size
+            rdata = pos
+            pos += rdlen
+            if rtype == TYPE_A and rdlen == 4:
+                ip = socket.inet_ntoa(data[rdata:rdata + 4])
+                found.setdefault(ip, {})["hostname"] = _local_host(name)
+            elif rtype == TYPE_PTR and name.lower().endswith(".in-addr.arpa"):
+                # Answer to a reverse lookup (mdns_reverse_query)
+                labels = name.split(".")[:4]
+                target, _ = _read_name(data, rdata)
+                found.setdefault(".".join(reversed(labels)), {})["hostname"] = _local_host(target)
+            elif rtype == TYPE_PTR:
+                kind = _service_type(name)
+                if kind:
+                    sender.setdefault("device_type", kind)
+            elif rtype == TYPE_SRV:
+                target, _ = _read_name(data, rdata + 6)
+                sender.setdefault("hostname", _local_host(target))
+    except (IndexError, struct.error):
+        return []
+    # Service records carry no address: they describe the sender (its SRV
+    # target only names it when no address record says otherwise)
+    if found and src not in found:
+        sender.pop("hostname", None)
+    merged = found.setdefault(src, {})
+    for key, value in sender.items():
+        merged.setdefault(key, value)
+    return [(ip, dict(info, source="mdns")) for ip, info in found.items() if info]
+
+
+def parse_ssdp(data, src):
+    try:
+        lines = data.decode("utf-8", "replace").split("\r\n")
+    except Exception:
+        return []
+    first = lines[0].upper()
+    if not (first.startswith("NOTIFY") or first.startswith("HTTP/")):
+        return []  # M-SEARCH from another control point
+    headers = {}
+    for line in lines[1:]:
+        key, sep, value = line.partition(":")
+        if sep:
+            headers[key.strip().lower()] = value.strip()
+    if headers.get("nts", "").lower() == "ssdp:byebye":
+        return []
+    info = {"source": "ssdp"}
+    kind = headers.get("nt") or headers.get("st") or ""
+    parts = kind.lower().split(":")
+    if len(parts) >= 4 and parts[2] == "device":
+        info["device_type"] = SSDP_DEVICES.get(parts[3])
+    elif "dial-multiscreen" in kind.lower():
+        info["device_type"] = "media"
+    return [(src, info)]
+
+
+def decode_netbios_name(encoded):
+    """First-level encoded 32-byte name -> (name, suffix)."""
+    raw = bytes(((encoded[i] - 65) << 4) | (encoded[i + 1] - 65) for i in range(0, 32, 2))
+    return raw[:15].decode("ascii", "replace").rstrip(), raw[15]
+
+
+def parse_netbios(data, src):
+    try:
+        _, flags, qd, an, ns, ar = _DNS_HEADER.unpack_from(data)
+        opcode = (flags >> 11) & 0xF
+        pos = _DNS_HEADER.size
+        if flags & 0x8000 and an:
+            # Node status response: the host's own name table
+            if data[pos] != 0x20:
+                return []
+            pos += 34
+            rtype, _, _, _ = _RR.unpack_from(data, pos)
+            pos += _RR.size
+            if rtype != NBSTAT:
+                return []
+            for i in range(data[pos]):
+                entry = data[pos + 1 + 18 * i: pos + 19 + 18 * i]
+                name_flags = struct.unpack(">H", entry[16:18])[0]
+                if entry[15] == 0x00 and not name_flags & 0x8000:
+                    return [(src, {"hostname": entry[:15].decode("ascii", "replace").rstrip(),
+                                   "source": "netbios"})]
+            return []
+        if not flags & 0x8000 and opcode in (5, 8, 9) and qd and data[pos] == 0x20:
+            # Name registration / refresh broadcast for the sender's own name
+            name, suffix = decode_netbios_name(data[pos + 1:pos + 33])
+            if suffix == 0x00:
+                return [(src, {"hostname": name, "source": "netbios"})]
+    except (IndexError, struct.error):
+        pass
+    return []
+
+
+PARSERS = {"mdns": parse_mdns, "ssdp": parse_ssdp, "netbios": parse_netbios}
+
+
+# -------------------------------------------------------
+# Queries
+# -------------------------------------------------------
+def _encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\0"
+
+
+def mdns_reverse_query(ip):
+    """PTR query for <ip>.in-addr.arpa with the unicast-response bit (QU) set."""
+    name = ".".join(reversed(ip.split("."))) + ".in-addr.arpa"
+    return _DNS_HEADER.pack(0, 0, 1, 0, 0, 0) + _encode_name(name) + struct.pack(">HH", TYPE_PTR, 0x8001)
+
+
+def nbstat_query():
+    """NetBIOS node status request for the wildcard name "*"."""
+    raw = b"*" + bytes(15)
+    encoded = bytes(c for b in raw for c in (65 + (b >> 4), 65 + (b & 15)))
+    return (_DNS_HEADER.pack(0x4E42, 0, 1, 0, 0, 0) + bytes([0x20]) + encoded + b"\0"
+            + struct.pack(">HH", NBSTAT, 1))
+
+
+# -------------------------------------------------------
+# Listener
+# -------------------------------------------------------
+class PassiveDiscovery:
+    def __init__(self, ports, send_timeout=0.01):
+        self.ports = list(ports)
+        self.send_timeout = send_timeout
+        self.sockets = {}          # port -> socket (sends and receives)
+        self.listening = set()     # ports actually bound
+        self._found = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        for port in self.ports:
+            sock = self._open(port)
+            if sock is not None:
+                self.sockets[port] = sock
+
+    def _open(self, port):
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        except OSError:
+            return None
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        except OSError:
+            pass
+        try:
+            sock.bind(("", port))
+            self.listening.add(port)
+        except OSError:
+            try:
+                sock.bind(("", 0))
+            except OSError:
+                sock.close()
+                return None
+        try:
+            # Datagrams to hosts still being ARPed are charged to this buffer
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        except OSError:
+            pass
+        sock.setblocking(False)
+        return sock
+
+    def join(self, local_ips):
+        """Joins the multicast groups on the interfaces with these addresses."""
+        for port, sock in self.sockets.items():
+            group = PROTOCOLS.get(port, (None, None))[1]
+            if not group or port not in self.listening:
+                continue
+            for ip in local_ips:
+                if not ip:
+                    continue
+                try:
+                    mreq = socket.inet_aton(group) + socket.inet_aton(ip)
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+                except OSError:
+                    pass
+
+    def start(self, local_ips=()):
+        self.join(local_ips)
+        if self._thread is None and self.sockets:
+            self._thread = threading.Thread(target=self._listen, name="scanner-discovery", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _listen(self):
+        sel = selectors.DefaultSelector()
+        for port, sock in self.sockets.items():
+            sel.register(sock, selectors.EVENT_READ, PARSERS.get(PROTOCOLS.get(port, ("",))[0]))
+        while True:
+            for key, _ in sel.select(1.0):
+                try:
+                    data, (src, _) = key.fileobj.recvfrom(9000)
+                except OSError:
+                    continue
+                if key.data is None:
+                    continue
+                for ip, info in key.data(data, src):
+                    self._record(ip, info)
+
+    def _record(self, ip, info):
+        with self._lock:
+            known = self._found.setdefault(ip, {})
+            for k, v in info.items():
+                if v is not None:
+                    known[k] = v
+
+    def drain(self):
+        """{ip: info} heard since the last call."""
+        with self._lock:
+            found, self._found = self._found, {}
+        return found
+
+    def query_names(self, ip):
+        """Asks `ip` for its NetBIOS and mDNS names; replies are parsed by the listener."""
+        for port, payload in ((137, nbstat_query()), (5353, mdns_reverse_query(ip))):
+            sock = self.sockets.get(port)
+            if sock is None:
+                continue
+            try:
+                sock.sendto(payload, (ip, port))
+            except OSError:
+                pass
+
+    def wake(self, ips):
+        """An empty datagram to every port of every address (fills the neighbor table)."""
+        for port, sock in self.sockets.items():
+            for ip in ips:
+                try:
+                    sock.sendto(b"", (ip, port))
+                except BlockingIOError:
+                    # Send buffer full: give it up to send_timeout to drain, then retry once
+                    select.select([], [sock], [], self.send_timeout)
+                    try:
+                        sock.sendto(b"", (ip, port))
+                    except OSError:
+                        pass
+                except OSError:
+                    pass
@@ -0,0 +1,83 @@
+"""
+Change events for scanner_service.py (SCANNER_OUTPUT=events).
+
+Instead of the whole device array every cycle, one record per change
+(a JSON line, or a frame in framed mode):
+  {"event": "device_up",   "ip", "mac", "vendor", "ts"}
+  {"event": "device_down", "ip", "mac", "ts"}
+  {"event": "mac_changed", "ip", "mac", "old_mac", "vendor", "ts"}
+  {"event": "device_updated", "ip", "mac", "vendor", "ts"}   (new hostname / device type)
+  {"event": "cycle_end",   "alive", "changes", "ts"}        (only after changes)
+  {"event": "checkpoint",  "devices": [...], "ts"}          (full list)
+Device records also carry the "iface" and "cidr" they were found on and,
+once heard, the "hostname" and "device_type" passive discovery found.
+A checkpoint is written first and then every `checkpoint_interval`
+seconds, so a consumer can always resynchronise. `write(record)` gets
+each record as a dict; the caller serializes it (framing.py).
+"""
+
+import time
+
+
+def ip_sort_key(ip):
+    return tuple(map(int, ip.split(".")))
+
+
+def device_list(alive, tags=None):
+    """{ip: mac} -> the device array of the array output mode."""
+    tags = tags or {}
+    return [dict({"ip": ip, "mac": alive[ip], "vendor": None}, **tags.get(ip, {}))
+            for ip in sorted(alive, key=ip_sort_key)]
+
+
+def diff_devices(previous, current, ts, tags=None, previous_tags=None):
+    tags = tags or {}
+    previous_tags = previous_tags or {}
+    events = []
+    for ip in sorted(previous.keys() - current.keys(), key=ip_sort_key):
+        events.append(dict({"event": "device_down", "ip": ip, "mac": previous[ip], "ts": ts},
+                           **previous_tags.get(ip, {})))
+    for ip in sorted(current, key=ip_sort_key):
+        mac = current[ip]
+        if ip not in previous:
+            events.append(dict({"event": "device_up", "ip": ip, "mac": mac, "vendor": None, "ts": ts},
+                               **tags.get(ip, {})))
+        elif mac and mac != previous[ip]:
+            # A host that was only seen by TCP (mac None) gaining its MAC counts too
+            events.append(dict({"event": "mac_changed", "ip": ip, "mac": mac,
+                                "old_mac": previous[ip], "vendor": None, "ts": ts}, **tags.get(ip, {})))
+        elif tags.get(ip, {}) != previous_tags.get(ip, {}):
+            events.append(dict({"event": "device_updated", "ip": ip, "mac": mac or previous[ip],
+                                "vendor": None, "ts": ts}, **tags.get(ip, {})))
+    return events
+
+
+class EventWriter:
+    def __init__(self, write, checkpoint_interval=60.0):
+        self.write = write
+        self.checkpoint_interval = checkpoint_interval
+        self.previous = None
+        self.previous_tags = {}
+        self.last_checkpoint = 0.0
+
+    def checkpoint(self, alive, tags=None, now=None):
+        now = now or time.time()
+        self.write({"event": "checkpoint", "devices": device_list(alive, tags), "ts": round(now, 3)})
+        self.previous = dict(alive)
+        self.previous_tags = dict(tags or {})
+        self.last_checkpoint = now
+
+    def update(self, alive, tags=None, now=None):
+        """Writes this cycle's changes (or a checkpoint when one is due)."""
+        now = now or time.time()
+        if self.previous is None or now - self.last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint(alive, tags, now)
+            return
+        events = diff_devices(self.previous, alive, round(now, 3), tags, self.previous_tags)
+        for record in events:
+            self.write(record)
+        if events:
+            self.write({"event": "cycle_end", "alive": len(alive), "changes": len(events), "ts": round(now, 3)})
+        # Keep a known MAC if this cycle only saw the host by TCP
+        self.previous = {ip: mac or self.previous.get(ip) for ip, mac in alive.items()}
+        self.previous_tags = dict(tags or {})
@@ -0,0 +1,121 @@
+"""
+Pipe protocol between scanner_service.py and agent-admin
+(mirrored by agent-admin/functions/scanner_link.py).
+
+Framed mode (SCANNER_PROTOCOL=framed), both directions:
+    4-byte big-endian body length | 1-byte codec ("j" JSON, "m" msgpack) | body
+Frames are far below 16 MiB, so a framed stream always starts with a zero
+byte and the agent can tell it apart from JSON lines ("{" / "[").
+
+Line mode (the fallback, and what older agents read): one JSON document
+per line.
+
+The agent sends control messages the same way on the scanner's stdin:
+    {"cmd": "rescan"} | {"cmd": "pause"} | {"cmd": "resume"}
+    {"cmd": "config", "values": {"CYCLE_INTERVAL": 5, ...}}
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+
+HEADER = struct.Struct(">IB")
+MAX_FRAME = 16 * 1024 * 1024
+JSON = ord("j")
+MSGPACK = ord("m")
+
+
+def _msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except Exception:
+        return None
+
+
+def encode_frame(obj, codec=JSON):
+    if codec == MSGPACK:
+        body = _msgpack().packb(obj, use_bin_type=True)
+    else:
+        body = json.dumps(obj, separators=(",", ":")).encode()
+    return HEADER.pack(len(body), codec) + body
+
+
+def _read_exact(stream, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def read_frame(stream):
+    """Next decoded frame from a binary stream, or None at EOF."""
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+    length, codec = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"frame too large ({length} bytes)")
+    body = _read_exact(stream, length)
+    if body is None:
+        return None
+    if codec == MSGPACK:
+        return _msgpack().unpackb(body, raw=False)
+    return json.loads(body)
+
+
+class ScannerChannel:
+    """
+    The scanner's end of the pipe. Protocol and codec come from the agent
+    (SCANNER_PROTOCOL, SCANNER_CODECS); without them it prints JSON lines.
+    """
+
+    def __init__(self, protocol=None, codecs=None):
+        self.protocol = protocol or os.getenv("SCANNER_PROTOCOL", "lines")
+        accepted = (codecs or os.getenv("SCANNER_CODECS", "json")).split(",")
+        self.codec = MSGPACK if "msgpack" in accepted and _msgpack() else JSON
+        self._lock = threading.Lock()
+
+    @property
+    def controlled(self):
+        """An agent is on the other end of stdin (it set SCANNER_PROTOCOL)."""
+        return "SCANNER_PROTOCOL" in os.environ
+
+    def send(self, obj):
+        with self._lock:
+            if self.protocol == "framed":
+                sys.stdout.buffer.write(encode_frame(obj, self.codec))
+                sys.stdout.buffer.flush()
+            else:
+                print(json.dumps(obj), flush=True)
+
+    def start_control(self, handle):
+        """Reads control messages from stdin on a daemon thread."""
+        if not self.controlled or sys.stdin is None:
+            return None
+
+        def reader():
+            try:
+                if self.protocol == "framed":
+                    while True:
+                        msg = read_frame(sys.stdin.buffer)
+                        if msg is None:
+                            break
+                        handle(msg)
+                else:
+                    for line in sys.stdin:
+                        try:
+                            handle(json.loads(line))
+                        except ValueError:
+                            continue
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=reader, name="scanner-control", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,303 @@
+"""
+Compact per-subnet host state for scanner_service.py.
+
+Every address of the subnet has a slot, indexed by its offset from the
+network address, in flat arrays:
+    last_seen   array("d")  epoch seconds the host last answered (0: never)
+    mac_index   array("I")  index into `macs` (0: unknown)
+    backoff     bytearray   probe backoff level
+    hits/misses bytearray   consecutive answered / unanswered probes
+    flaps       bytearray   up/down changes within ProbePolicy.flap_window
+    changed_at  array("d")  when the host last went up or down
+    last_probed array("d")  when the host was last probed
+    next_probe  array("d")  when the host is due again
+Hosts currently alive are a set of offsets; names and device types heard
+passively (discovery.py) are a sparse {offset: info} dict. Neighbor expansion and random
+sampling work on offsets, so a cycle never builds per-host strings or
+ipaddress objects; only the hosts actually probed or reported are
+converted to dotted strings.
+
+Liveness: hosts that keep answering (or keep not answering) back off
+exponentially, hosts that flap are probed every cycle, and an alive host
+is only declared down after `miss_limit` consecutive misses. The backoff
+is capped so that leaves are noticed within `leave_slo` seconds, and the
+hosts never seen are swept in random order, least recently probed first,
+fast enough to notice joins within `join_slo` (ProbePolicy).
+
+to_state() / restore() carry the known hosts (MAC, last seen, backoff,
+names) across scanner restarts as a JSON-ready dict.
+"""
+
+import ipaddress
+import math
+import random
+from array import array
+
+
+STATE_VERSION = 1
+
+
+class ProbePolicy:
+    """Probe intervals for HostTable, derived from the cycle length and the detection SLOs."""
+
+    miss_limit = 2          # consecutive misses before an alive host is down
+    flap_threshold = 3      # changes within flap_window that make a host "flapping"
+    flap_window = 300.0
+    max_backoff = 6         # interval doubles up to cycle * 2**6
+
+    def __init__(self, cycle=2.0, join_slo=120.0, leave_slo=30.0, max_sample=30):
+        self.cycle = cycle
+        self.join_slo = join_slo
+        self.leave_slo = leave_slo
+        self.max_sample = max_sample
+
+    def interval(self, table, offset, up):
+        """Seconds until `offset` is probed again, given its state after this cycle."""
+        if up and table.misses[offset]:
+            return 0.0  # suspect: confirm next cycle
+        if table.flaps[offset] >= self.flap_threshold:
+            return self.cycle
+        # Leave: probe interval + miss_limit confirming cycles; join: probe interval + one cycle
+        if up:
+            cap = self.leave_slo - self.miss_limit * self.cycle
+        else:
+            cap = self.join_slo - self.cycle
+        return max(self.cycle, min(self.cycle * 2 ** table.backoff[offset], cap))
+
+    def sample_size(self, unknown):
+        """Never-seen hosts to sweep per cycle so all of them are covered within join_slo."""
+        if unknown <= 0:
+            return 0
+        # A host is found in the cycle that probes it, so a pass gets join_slo - cycle
+        need = math.ceil(unknown * self.cycle / max(self.join_slo - self.cycle, self.cycle))
+        return max(1, min(need, self.max_sample))
+
+    def sweep_seconds(self, unknown):
+        """Worst-case time to sweep `unknown` hosts (above join_slo when max_sample caps it)."""
+        k = self.sample_size(unknown)
+        return math.ceil(unknown / k) * self.cycle if k else 0.0
+
+
+def _ip_str(n):
+    return f"{n >> 24}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+class HostTable:
+    def __init__(self, cidr, policy=None):
+        net = ipaddress.ip_network(cidr, False)
+        self.cidr = str(net)
+        self.network = int(net.network_address)
+        self.netmask = int(net.netmask)
+        self.size = net.num_addresses
+        # Usable host offsets (no network/broadcast address below /31)
+        if self.size > 2:
+            self.first, self.last = 1, self.size - 2
+        else:
+            self.first, self.last = 0, self.size - 1
+
+        self.last_seen = array("d", bytes(8 * self.size))
+        self.mac_index = array("I", bytes(4 * self.size))
+        self.backoff = bytearray(self.size)
+        self.hits = bytearray(self.size)
+        self.misses = bytearray(self.size)
+        self.flaps = bytearray(self.size)
+        self.changed_at = array("d", bytes(8 * self.size))
+        self.last_probed = array("d", bytes(8 * self.size))
+        self.next_probe = array("d", bytes(8 * self.size))
+        self.macs = [None]
+        self._mac_ids = {}
+        self.alive = set()
+        self.known = set()      # every host that has answered at least once
+        self.info = {}          # offset -> {"hostname", "device_type", "source"}
+        self.policy = policy or ProbePolicy()
+        self._sweep = None
+        self._cursor = 0
+
+    # -------------------------------------------------------
+    # Addresses
+    # -------------------------------------------------------
+    @property
+    def host_count(self):
+        return self.last - self.first + 1
+
+    def is_host(self, offset):
+        return self.first <= offset <= self.last
+
+    def offset_of(self, ip):
+        """Offset of a dotted or int address, or None if outside the subnet."""
+        n = ip if isinstance(ip, int) else int(ipaddress.IPv4Address(ip))
+        offset = n - self.network
+        return offset if self.is_host(offset) else None
+
+    def ip_of(self, offset):
+        return _ip_str(self.network + offset)
+
+    def host_offsets(self):
+        return range(self.first, self.last + 1)
+
+    # -------------------------------------------------------
+    # Target selection
+    # -------------------------------------------------------
+    def neighbors(self, offset, rng):
+        lo = max(self.first, offset - rng)
+        hi = min(self.last, offset + rng)
+        return [o for o in range(lo, hi + 1) if o != offset]
+
+    def sample(self, k, exclude):
+        """Up to k random host offsets not in `exclude`."""
+        free = self.host_count - sum(1 for o in exclude if self.is_host(o))
+        k = min(k, max(0, free))
+        if k == 0:
+            return []
+        if free <= 4 * k:
+            # Small or crowded subnet: pick from the explicit remainder
+            return random.sample([o for o in self.host_offsets() if o not in exclude], k)
+        picked = set()
+        while len(picked) < k:
+            o = random.randint(self.first, self.last)
+            if o not in exclude:
+                picked.add(o)
+        return list(picked)
+
+    def due(self, now, rng):
+        """Known hosts and neighbors of alive hosts whose next probe time has come."""
+        candidates = self.alive | self.known
+        for offset in self.alive:
+            candidates.update(self.neighbors(offset, rng))
+        next_probe = self.next_probe
+        return {o for o in candidates if next_probe[o] <= now}
+
+    def sweep(self, k, exclude):
+        """
+        Up to k never-seen hosts not in `exclude`, walking one fixed random
+        order of the whole subnet round and round. Every host comes up once
+        per pass, so the hosts picked are those the sweep reached least
+        recently and no host waits longer than a pass.
+        """
+        picked = []
+        if k <= 0:
+            return picked
+        steps = 0
+        while len(picked) < k and steps < self.host_count:
+            if self._sweep is None:
+                order = list(self.host_offsets())
+                random.shuffle(order)
+                self._sweep = array("I", order)
+            if self._cursor >= len(self._sweep):
+                self._cursor = 0
+            offset = self._sweep[self._cursor]
+            self._cursor += 1
+            steps += 1
+            if offset not in exclude and offset not in self.known:
+                picked.append(offset)
+        return picked
+
+    def unknown_count(self):
+        return self.host_count - len(self.known)
+
+    # -------------------------------------------------------
+    # State
+    # -------------------------------------------------------
+    def _mac_id(self, mac):
+        idx = self._mac_ids.get(mac)
+        if idx is None:
+            idx = len(self.macs)
+            self.macs.append(mac)
+            self._mac_ids[mac] = idx
+        return idx
+
+    def mac_of(self, offset):
+        return self.macs[self.mac_index[offset]]
+
+    def record_cycle(self, found, now, probed=()):
+        """
+        `found` is {offset: mac bytes or None} for every host seen this
+        cycle, `probed` the offsets probed. A None MAC keeps the known one.
+        Probed hosts that did not answer count a miss; alive hosts neither
+        probed nor seen stay alive.
+        """
+        policy = self.policy
+        alive = set(self.alive)
+        for offset in set(probed):
+            self.last_probed[offset] = now
+        for offset in found.keys() | set(probed):
+            was_up = offset in self.alive
+            if offset in found:
+                self.last_seen[offset] = now
+                mac = found[offset]
+                if mac is not None:
+                    mac_id = self._mac_id(mac)
+                    if self.mac_index[offset] not in (0, mac_id):
+                        self.info.pop(offset, None)  # another device took the address
+                    self.mac_index[offset] = mac_id
+                self.hits[offset] = min(255, self.hits[offset] + 1)
+                self.misses[offset] = 0
+                up = True
+            else:
+                self.misses[offset] = min(255, self.misses[offset] + 1)
+                self.hits[offset] = 0
+                up = was_up and self.misses[offset] < policy.miss_limit
+
+            if self.flaps[offset] and now - self.changed_at[offset] > policy.flap_window:
+                self.flaps[offset] = 0
+            if up != was_up:
+                self.changed_at[offset] = now
+                self.flaps[offset] = min(255, self.flaps[offset] + 1)
+                self.backoff[offset] = 0
+                (alive.add if up else alive.discard)(offset)
+            elif not (up and self.misses[offset]):
+                # Same settled state again: back off
+                self.backoff[offset] = min(policy.max_backoff, self.backoff[offset] + 1)
+            self.next_probe[offset] = now + policy.interval(self, offset, up)
+        self.alive = alive
+        self.known.update(found)
+
+    def set_info(self, offset, info):
+        """Merges what discovery learned about a host."""
+        current = self.info.setdefault(offset, {})
+        current.update((k, v) for k, v in info.items() if v is not None)
+
+    # -------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------
+    def to_state(self, now):
+        hosts = [[o, self.last_seen[o], self.mac_index[o], self.backoff[o], self.flaps[o],
+                  self.changed_at[o], int(o in self.alive)] for o in sorted(self.known)]
+        return {"version": STATE_VERSION, "cidr": self.cidr, "saved_at": now,
+                "macs": [mac.hex() for mac in self.macs[1:]], "hosts": hosts,
+                "info": {str(o): info for o, info in self.info.items() if o in self.known}}
+
+    def restore(self, state):
+        """
+        Loads to_state() output saved for this same subnet. Known hosts come
+        back with their MAC, history and names but not alive, and due for a
+        probe; returns the offsets that were alive when saved (None if the
+        state does not fit this table).
+        """
+        if state.get("version") != STATE_VERSION or state.get("cidr") != self.cidr:
+            return None
+        mac_ids = [0] + [self._mac_id(bytes.fromhex(mac)) for mac in state.get("macs", [])]
+        was_alive = []
+        for o, seen, mac_idx, backoff, flaps, changed, alive in state.get("hosts", []):
+            if not self.is_host(o) or not 0 <= mac_idx < len(mac_ids):
+                continue
+            self.last_seen[o] = seen
+            self.mac_index[o] = mac_ids[mac_idx]
+            self.backoff[o] = min(backoff, self.policy.max_backoff)
+            self.flaps[o] = min(flaps, 255)
+            self.changed_at[o] = changed
+            self.known.add(o)
+            if alive:
+                was_alive.append(o)
+        for o, info in state.get("info", {}).items():
+            if int(o) in self.known and isinstance(info, dict):
+                self.info[int(o)] = info
+        return was_alive
+
+    def alive_devices(self):
+        """{ip: mac} (dotted strings) for the alive hosts."""
+        out = {}
+        for offset in self.alive:
+            mac = self.mac_of(offset)
+            out[self.ip_of(offset)] = mac.hex(":") if mac is not None else None
+        return out
@@ -0,0 +1,156 @@
+"""
+Neighbor (ARP) table readers for scanner_service.py.
+
+Entries are {ip: mac} with the IPv4 address as an int and the MAC as
+6 bytes. Sources, best first:
+ - Linux: /proc/net/arp
+ - Windows: GetIpNetTable (iphlpapi) through ctypes
+ - anywhere: `arp -a` output (Windows and BSD/Linux formats)
+Only resolved entries are returned; incomplete/invalid ones are skipped.
+"""
+
+import os
+import re
+import socket
+import struct
+import subprocess
+import sys
+
+# Windows "  10.0.0.1    aa-bb-cc-dd-ee-ff   dynamic" and
+# BSD/Linux "? (10.0.0.1) at aa:bb:cc:dd:ee:ff [ether] on eth0" (macOS drops leading zeros)
+ARP_LINE = re.compile(
+    r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\)?\s+(?:at\s+)?"
+    r"([0-9A-Fa-f]{1,2}(?:[:-][0-9A-Fa-f]{1,2}){5})(?![0-9A-Fa-f:-])"
+)
+
+ATF_COM = 0x2               # /proc/net/arp flag: entry resolved
+MIB_IPNET_TYPE_INVALID = 2  # GetIpNetTable dwType
+_IPNETROW = struct.Struct("<II8s4sI")
+
+_ZERO_MAC = bytes(6)
+_BROADCAST_MAC = b"\xff" * 6
+
+
+def ip_to_int(ip):
+    return int.from_bytes(socket.inet_aton(ip), "big")
+
+
+def int_to_ip(n):
+    return f"{n >> 24}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def mac_to_str(mac):
+    return mac.hex(":") if mac is not None else None
+
+
+def _usable(mac):
+    return mac != _ZERO_MAC and mac != _BROADCAST_MAC
+
+
+def parse_proc_arp(text):
+    table = {}
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 4 or not int(fields[2], 16) & ATF_COM:
+            continue
+        mac = bytes.fromhex(fields[3].replace(":", " "))
+        if len(mac) == 6 and _usable(mac):
+            table[ip_to_int(fields[0])] = mac
+    return table
+
+
+def parse_arp_output(text):
+    table = {}
+    for ip, mac_text in ARP_LINE.findall(text):
+        if len(mac_text) == 17:
+            mac = bytes.fromhex(mac_text[:2] + mac_text[3:5] + mac_text[6:8]
+                                + mac_text[9:11] + mac_text[12:14] + mac_text[15:])
+        else:
+            mac = bytes(int(part, 16) for part in re.split("[:-]", mac_text))
+        if _usable(mac):
+            try:
+                table[ip_to_int(ip)] = mac
+            except OSError:
+                continue  # not a valid address (e.g. 300.1.1.1)
+    return table
+
+
+def parse_ipnettable(buf):
+    """MIB_IPNETTABLE: DWORD count, then MIB_IPNETROW rows (24 bytes each)."""
+    table = {}
+    (count,) = struct.unpack_from("<I", buf, 0)
+    for index in range(count):
+        _, phys_len, phys, addr, row_type = _IPNETROW.unpack_from(buf, 4 + index * _IPNETROW.size)
+        if row_type == MIB_IPNET_TYPE_INVALID or phys_len != 6:
+            continue
+        mac = phys[:6]
+        if _usable(mac):
+            table[int.from_bytes(addr, "big")] = mac
+    return table
+
+
+def read_proc_arp(path="/proc/net/arp"):
+    with open(path, "r") as f:
+        return parse_proc_arp(f.read())
+
+
+def read_ipnettable():
+    import ctypes
+    from ctypes import wintypes
+
+    get_table = ctypes.windll.iphlpapi.GetIpNetTable
+    size = wintypes.ULONG(0)
+    get_table(None, ctypes.byref(size), False)
+    for _ in range(3):
+        # The table may grow between the size query and the read
+        buf = ctypes.create_string_buffer(size.value + 16 * _IPNETROW.size)
+        size = wintypes.ULONG(len(buf))
+        rc = get_table(buf, ctypes.byref(size), False)
+        if rc == 0:
+            return parse_ipnettable(buf.raw)
+        if rc != 122:  # ERROR_INSUFFICIENT_BUFFER
+            break
+    raise OSError(f"GetIpNetTable failed ({rc})")
+
+
+def read_arp_command():
+    out = subprocess.check_output("arp -a", shell=True, text=True)
+    return parse_arp_output(out)
+
+
+class NeighborTable:
+    """Picks the native source for this platform and falls back to `arp -a`."""
+
+    def __init__(self):
+        if os.path.exists("/proc/net/arp"):
+            self.source = "proc"
+        elif sys.platform == "win32":
+            self.source = "iphlpapi"
+        else:
+            self.source = "arp"
+
+    def read(self):
+        try:
+            if self.source == "proc":
+                return read_proc_arp()
+            if self.source == "iphlpapi":
+                return read_ipnettable()
+        except Exception:
+            # Native source unusable here; stay on the command from now on
+            self.source = "arp"
+        try:
+            return read_arp_command()
+        except Exception:
+            return {}
+
+    def in_subnet(self, network, netmask):
+        """
+        Neighbors inside network/netmask (ints), leaving out the broadcast
+        address, multicast and loopback.
+        """
+        broadcast = network | (~netmask & 0xFFFFFFFF)
+        return {
+            ip: mac for ip, mac in self.read().items()
+            if ip & netmask == network and ip != broadcast
+            and ip >> 28 != 0xE and ip >> 24 != 127
+        }
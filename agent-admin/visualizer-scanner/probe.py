@@ -0,0 +1,117 @@
+"""
+Selector-driven TCP liveness probes for scanner_service.py.
+
+One thread, non-blocking connects to every (host, port) pair, at most
+`max_inflight` at a time across all hosts. A host is alive on its first
+completed connect or its first RST (something answered); its remaining
+connects are dropped. Timeouts and unreachable errors say nothing.
+"""
+
+import errno
+import selectors
+import socket
+import sys
+import time
+from collections import OrderedDict
+
+# connect_ex() results meaning "still connecting" (10035 is WSAEWOULDBLOCK)
+CONNECTING = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN, errno.EALREADY, 10035}
+# The host answered with a RST (10061 is WSAECONNREFUSED)
+REFUSED = {errno.ECONNREFUSED, 10061}
+
+# select() on Windows is limited to 512 sockets per call
+MAX_INFLIGHT = 500 if sys.platform == "win32" else 4096
+
+
+class ProbeEngine:
+    def __init__(self, ports, timeout=0.12, max_inflight=512):
+        self.ports = list(ports)
+        self.timeout = timeout
+        self.max_inflight = max(1, min(max_inflight, MAX_INFLIGHT))
+        self.last_stats = {}
+
+    def _pairs(self, ips, alive):
+        # Port-major: a host that answers on the first port is never tried on the rest
+        for port in self.ports:
+            for ip in ips:
+                if ip not in alive:
+                    yield ip, port
+
+    def probe(self, ips):
+        """Returns the subset of `ips` that answered on any port."""
+        ips = list(ips)
+        alive = set()
+        inflight = OrderedDict()   # socket -> (ip, deadline), in launch order
+        by_host = {}               # ip -> set of its in-flight sockets
+        pending = self._pairs(ips, alive)
+        launched = 0
+        started = time.monotonic()
+
+        def close(s):
+            ip, _ = inflight.pop(s)
+            by_host[ip].discard(s)
+            try:
+                sel.unregister(s)
+            except (KeyError, ValueError):
+                pass
+            s.close()
+
+        def mark_alive(ip):
+            alive.add(ip)
+            for other in list(by_host.get(ip, ())):
+                close(other)
+
+        with selectors.DefaultSelector() as sel:
+            exhausted = False
+            while True:
+                while not exhausted and len(inflight) < self.max_inflight:
+                    pair = next(pending, None)
+                    if pair is None:
+                        exhausted = True
+                        break
+                    ip, port = pair
+                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    s.setblocking(False)
+                    launched += 1
+                    try:
+                        res = s.connect_ex((ip, port))
+                    except OSError:
+                        s.close()
+                        continue
+                    if res in CONNECTING:
+                        inflight[s] = (ip, time.monotonic() + self.timeout)
+                        by_host.setdefault(ip, set()).add(s)
+                        sel.register(s, selectors.EVENT_WRITE)
+                    else:
+                        s.close()
+                        if res == 0 or res in REFUSED:
+                            mark_alive(ip)
+
+                if not inflight:
+                    break
+
+                first_deadline = next(iter(inflight.values()))[1]
+                for key, _ in sel.select(max(0.0, first_deadline - time.monotonic())):
+                    s = key.fileobj
+                    if s not in inflight:
+                        continue  # closed earlier in this batch
+                    ip = inflight[s][0]
+                    err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    close(s)
+                    if err == 0 or err in REFUSED:
+                        mark_alive(ip)
+
+                now = time.monotonic()
+                while inflight:
+                    s, (_, deadline) = next(iter(inflight.items()))
+                    if deadline > now:
+                        break
+                    close(s)
+
+        self.last_stats = {
+            "hosts": len(ips),
+            "alive": len(alive),
+            "connects": launched,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+        return alive
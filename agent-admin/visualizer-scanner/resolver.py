@@ -0,0 +1,92 @@
+"""
+Background name resolution for scanner_service.py.
+
+request(ip, mac) queues a host unless the cache already has a fresh
+answer for that (ip, mac) pair or it is being resolved. Up to
+`max_concurrent` worker threads take hosts off the queue; each one
+sends the NetBIOS node status and mDNS reverse queries through the
+discovery sockets (their answers come back through the discovery
+listener) and then does the reverse DNS lookup itself. Answers are
+collected for drain(), so the scan cycle never waits on a lookup.
+
+The cache keeps names for `ttl` seconds and "no name" for
+`negative_ttl`; names heard passively are put in it with remember().
+A new MAC at an address is a new key, so the host is resolved again.
+"""
+
+import queue
+import socket
+import threading
+import time
+
+
+class NameResolver:
+    def __init__(self, discovery=None, max_concurrent=16, ttl=3600.0, negative_ttl=600.0):
+        self.discovery = discovery
+        self.max_concurrent = max(1, max_concurrent)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = {}        # (ip, mac) -> (name or None, expires)
+        self._inflight = set()
+        self._results = {}      # ip -> (mac, info)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def _fresh(self, key, now):
+        entry = self._cache.get(key)
+        return entry is not None and entry[1] > now
+
+    def request(self, ip, mac, now=None):
+        """Queues `ip` unless its name for this MAC is cached or already being resolved."""
+        key = (ip, mac)
+        now = now or time.time()
+        with self._lock:
+            if key in self._inflight or self._fresh(key, now):
+                return False
+            self._inflight.add(key)
+            if len(self._workers) < self.max_concurrent and len(self._workers) < len(self._inflight):
+                worker = threading.Thread(target=self._work, name="scanner-resolver", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        self._queue.put(key)
+        return True
+
+    def remember(self, ip, mac, name, now=None):
+        """Caches a name learned elsewhere (passive discovery)."""
+        with self._lock:
+            self._cache[(ip, mac)] = (name, (now or time.time()) + self.ttl)
+
+    def drain(self):
+        """{ip: (mac, {"hostname", "source"})} resolved since the last call."""
+        now = time.time()
+        with self._lock:
+            results, self._results = self._results, {}
+            if len(self._cache) > 4096:
+                self._cache = {k: v for k, v in self._cache.items() if v[1] > now}
+        return results
+
+    def _work(self):
+        while True:
+            ip, mac = self._queue.get()
+            name = None
+            try:
+                name = self.resolve(ip)
+            except Exception:
+                pass
+            now = time.time()
+            with self._lock:
+                self._inflight.discard((ip, mac))
+                self._cache[(ip, mac)] = (name, now + (self.ttl if name else self.negative_ttl))
+                if name:
+                    self._results[ip] = (mac, {"hostname": name, "source": "dns"})
+
+    def resolve(self, ip):
+        """Reverse DNS name of `ip` (blocking); also asks it over NetBIOS and mDNS."""
+        if self.discovery is not None:
+            self.discovery.query_names(ip)
+        try:
+            name = socket.gethostbyaddr(ip)[0]
+        except (OSError, UnicodeError):
+            return None
+        return name if name and name != ip else None
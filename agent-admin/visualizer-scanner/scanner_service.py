@@ -1,249 +1,415 @@
 #!/usr/bin/env python3
 """
-Fast scanner_service.py — prints exactly one JSON array per cycle (no extra logs).
+Fast scanner_service.py — prints exactly one JSON array per cycle (no extra logs),
+or with SCANNER_OUTPUT=events one change record at a time (events.py).
+Output is JSON lines, or length-prefixed frames when agent-admin asks for
+them; agent-admin can also send control messages on stdin (framing.py).
 Hybrid method:
- - UDP nudges to common discovery ports
- - Read arp -a
- - Fast TCP connect probes for common ports
+ - UDP nudges to common discovery ports, whose announcements are also
+   listened for passively (discovery.py)
+ - Read the neighbor (ARP) table (neighbor_table.py)
+ - Fast TCP connect probes for common ports (one selector loop, probe.py)
+ - Names resolved in the background (reverse DNS, NetBIOS, mDNS; resolver.py)
  - Print JSON array of devices each cycle
+Every IPv4 network the machine is on is scanned (or the SCANNER_CIDRS
+list), each with its own host table, under one shared probe budget.
+With SCANNER_STATE_DIR set the host tables are saved there periodically;
+on the next start a subnet with saved state only re-checks its known
+hosts instead of sweeping the whole subnet.
 """
 
 import ipaddress
 import json
+import os
+import queue
+import sys
 import time
-import socket
-import subprocess
-import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import netifaces
 
+# Sibling modules (also when run in-thread through runpy)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from discovery import PassiveDiscovery
+from events import EventWriter, device_list
+from framing import ScannerChannel
+from hosttable import HostTable, ProbePolicy
+from neighbor_table import NeighborTable
+from probe import ProbeEngine
+from resolver import NameResolver
+
 # CONFIG (tune for speed)
 UDP_PORTS = [5353, 1900, 137]        # mDNS, SSDP, NetBIOS
 TCP_PORTS = [80, 443, 22, 139, 445]  # quick TCP probes
 TCP_TIMEOUT = 0.12
 UDP_SEND_TIMEOUT = 0.01
-THREADS = 200
+PROBE_INFLIGHT = 512                 # connects in flight across all hosts
 INITIAL_DELAY = 0.8
 FAST_DELAY = 0.35
 CYCLE_INTERVAL = 2.0
-RANDOM_SAMPLE_PER_CYCLE = 30
+RANDOM_SAMPLE_PER_CYCLE = 30         # cap on never-seen hosts swept per subnet per cycle
 NEIGHBOR_RANGE = 2
+JOIN_SLO = 120.0                     # seconds to notice a new host (hosttable.ProbePolicy)
+LEAVE_SLO = 30.0                     # seconds to notice a host leaving
+MIN_PREFIX = 16                      # larger subnets: scan the /16 around the local address
+SCAN_CIDRS = os.getenv("SCANNER_CIDRS", "")          # e.g. "10.0.0.0/24,10.0.8.0/22"; empty: all interfaces
+RESOLVE_CONCURRENCY = 16             # name lookups in flight
+NAME_TTL = 3600.0                    # seconds a resolved name is kept per (ip, mac)
+NAME_NEGATIVE_TTL = 600.0            # seconds before a host without a name is asked again
+STATE_DIR = os.getenv("SCANNER_STATE_DIR", "")      # host tables saved here; empty: not saved
+STATE_INTERVAL = 60.0                # seconds between saves
+STATE_MAX_AGE = 24 * 3600.0          # older saved state: full initial sweep instead
+OUTPUT_MODE = os.getenv("SCANNER_OUTPUT", "array")   # "array" or "events"
+CHECKPOINT_INTERVAL = 60.0           # events mode: full device list every N seconds
+
+# Settings the agent may change at runtime with {"cmd": "config", "values": {...}}
+CONFIGURABLE = {"CYCLE_INTERVAL": float, "FAST_DELAY": float, "TCP_TIMEOUT": float,
+                "RANDOM_SAMPLE_PER_CYCLE": int, "NEIGHBOR_RANGE": int, "CHECKPOINT_INTERVAL": float,
+                "JOIN_SLO": float, "LEAVE_SLO": float, "STATE_INTERVAL": float}
+
+# Shared by every subnet's HostTable; apply_config() keeps it in step with the settings above
+probe_policy = ProbePolicy(CYCLE_INTERVAL, JOIN_SLO, LEAVE_SLO, RANDOM_SAMPLE_PER_CYCLE)
+
+class Subnet:
+    """One scanned network: its interface, our address on it and its host table."""
+
+    def __init__(self, iface, local_ip, cidr):
+        self.iface = iface
+        self.local_ip = local_ip
+        self.table = HostTable(cidr, probe_policy)
+        self.cidr = self.table.cidr
+        self.warm = False       # table restored from saved state (load_state)
+        self.was_alive = []     # offsets alive when that state was saved
 
-def detect_network():
+    def targets(self, now):
+        """Offsets to probe this cycle: known hosts and neighbors that are due, plus a sweep sample."""
+        table = self.table
+        target = table.due(now, NEIGHBOR_RANGE)
+        target.update(table.sweep(probe_policy.sample_size(table.unknown_count()), target))
+        return target
+
+    def tags(self):
+        return {"iface": self.iface, "cidr": self.cidr}
+
+    def info(self):
+        return dict(self.tags(), ip=self.local_ip, warm=self.warm,
+                    join_sweep=probe_policy.sweep_seconds(self.table.unknown_count()))
+
+def interface_addresses():
+    """(iface, ip, netmask) for every IPv4 address, default-gateway interface first."""
+    ifaces = list(netifaces.interfaces())
     try:
         gws = netifaces.gateways()
         if netifaces.AF_INET in gws:
-            entry = gws[netifaces.AF_INET][0]
-            iface = entry[1]
-            addrs = netifaces.ifaddresses(iface).get(netifaces.AF_INET, [])
-            for a in addrs:
-                ip = a.get("addr")
-                nm = a.get("netmask")
-                if ip and nm:
-                    cidr = str(ipaddress.IPv4Network(f"{ip}/{nm}", False))
-                    return iface, ip, nm, cidr
+            default = gws[netifaces.AF_INET][0][1]
+            if default in ifaces:
+                ifaces.remove(default)
+                ifaces.insert(0, default)
     except:
         pass
-    # fallback any interface
-    for iface in netifaces.interfaces():
-        addrs = netifaces.ifaddresses(iface).get(netifaces.AF_INET, [])
+    out = []
+    for iface in ifaces:
+        try:
+            addrs = netifaces.ifaddresses(iface).get(netifaces.AF_INET, [])
+        except ValueError:
+            continue
         for a in addrs:
             ip = a.get("addr")
             nm = a.get("netmask")
             if ip and nm:
-                cidr = str(ipaddress.IPv4Network(f"{ip}/{nm}", False))
-                return iface, ip, nm, cidr
-    return None, None, None, None
+                out.append((iface, ip, nm))
+    return out
 
-def udp_wake_ips(ips):
-    def _send(ip):
-        for port in UDP_PORTS:
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.settimeout(UDP_SEND_TIMEOUT)
-                s.sendto(b"", (ip, port))
-                s.close()
-            except:
-                pass
-    with ThreadPoolExecutor(max_workers=THREADS) as ex:
-        ex.map(_send, ips)
-
-def tcp_probe(ip):
-    for port in TCP_PORTS:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(TCP_TIMEOUT)
-        try:
-            if s.connect_ex((ip, port)) == 0:
-                s.close()
-                return True
-        except:
-            pass
-        finally:
-            try:
-                s.close()
-            except:
-                pass
-    return False
+def clamp_cidr(cidr, local_ip):
+    net = ipaddress.ip_network(cidr, False)
+    if net.prefixlen >= MIN_PREFIX or not local_ip:
+        return str(net)
+    return str(ipaddress.ip_network(f"{local_ip}/{MIN_PREFIX}", False))
 
-def read_arp_table(cidr):
-    try:
-        # Run arp -a
-        out = subprocess.check_output("arp -a", shell=True, text=True)
-    except Exception:
-        return {}
+def detect_networks():
+    """Subnets to scan: SCANNER_CIDRS if set, else every interface network."""
+    addresses = interface_addresses()
+    candidates = []
+    if SCAN_CIDRS.strip():
+        for item in SCAN_CIDRS.split(","):
+            try:
+                net = ipaddress.ip_network(item.strip(), False)
+            except ValueError:
+                continue
+            # Our own address on that network, if we have one
+            local = next(((iface, ip) for iface, ip, _ in addresses
+                          if ipaddress.IPv4Address(ip) in net), (None, None))
+            candidates.append((local[0], local[1], str(net)))
+    else:
+        for iface, ip, nm in addresses:
+            net = ipaddress.IPv4Network(f"{ip}/{nm}", False)
+            if net.is_loopback or net.is_link_local or net.prefixlen >= 31:
+                continue
+            candidates.append((iface, ip, str(net)))
 
-    net = ipaddress.ip_network(cidr, False)
-    res = {}
-    
-    # Simple regex for MAC address (Windows/Linux variants)
-    # Matches XX-XX-XX-XX-XX-XX or XX:XX:XX:XX:XX:XX
-    import re
-    mac_regex = re.compile(r"([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})")
-
-    for line in out.splitlines():
-        parts = line.strip().split()
-        if not parts:
+    subnets = []
+    for iface, ip, cidr in candidates:
+        net = ipaddress.ip_network(clamp_cidr(cidr, ip), False)
+        if net.num_addresses > 2 ** (32 - MIN_PREFIX):
+            continue  # configured without a local address to centre it on
+        if any(net.overlaps(ipaddress.ip_network(sub.cidr)) for sub in subnets):
             continue
-            
-        ip_str = parts[0]
+        subnets.append(Subnet(iface, ip, str(net)))
+    return subnets
+
+# One socket per UDP port: sends the wake-up datagrams and hears announcements
+discovery = PassiveDiscovery(UDP_PORTS, UDP_SEND_TIMEOUT)
+
+resolver = NameResolver(discovery, RESOLVE_CONCURRENCY, NAME_TTL, NAME_NEGATIVE_TTL)
+
+probe_engine = ProbeEngine(TCP_PORTS, timeout=TCP_TIMEOUT, max_inflight=PROBE_INFLIGHT)
+
+neighbor_table = NeighborTable()
+
+def read_arp_tables(subnets):
+    """{subnet: {offset: mac bytes}} from one read of the neighbor table."""
+    found = {sub: {} for sub in subnets}
+    for ip, mac in neighbor_table.read().items():
+        for sub in subnets:
+            offset = sub.table.offset_of(ip)
+            if offset is not None:
+                found[sub][offset] = mac
+                break
+    return found
+
+def resolvable(table, offset):
+    """No name yet, or only one from DNS (re-resolved when its cache entry expires)."""
+    info = table.info.get(offset, {})
+    return "hostname" not in info or info.get("source") == "dns"
+
+def record_results(subnets, arp_alive, alive_tcp, probed):
+    """
+    Merges ARP (offset->mac), TCP (ip, no MAC) and passive discovery
+    results plus our own address into each table.
+    """
+    now = time.time()
+    heard = discovery.drain()
+    named = resolver.drain()
+    for sub in subnets:
+        table = sub.table
+        combined = dict(arp_alive.get(sub, {}))
+        for ip in alive_tcp:
+            offset = table.offset_of(ip)
+            if offset is not None:
+                combined.setdefault(offset, None)
+        for ip, info in heard.items():
+            offset = table.offset_of(ip)
+            if offset is not None:
+                combined.setdefault(offset, None)
+                table.set_info(offset, info)
+                if info.get("hostname"):
+                    resolver.remember(ip, combined[offset] or table.mac_of(offset), info["hostname"], now)
+        if sub.local_ip:
+            local = table.offset_of(sub.local_ip)
+            if local is not None:
+                combined.setdefault(local, None)
+        table.record_cycle(combined, now, probed.get(sub, ()))
+
+        # Names resolved in the background; the device's own (passive) name wins
+        for ip, (mac, info) in named.items():
+            offset = table.offset_of(ip)
+            if offset is not None and table.mac_of(offset) == mac and resolvable(table, offset):
+                table.set_info(offset, info)
+        for offset in table.alive:
+            if resolvable(table, offset):
+                resolver.request(table.ip_of(offset), table.mac_of(offset), now)
+
+def initial_full_scan(subnets, warm=()):
+    """
+    Every host of every subnet, except in warm-started subnets: there only
+    the known hosts are verified (those alive at the last save first) and
+    the rest of the subnet is left to the sweep.
+    """
+    probed = {}
+    for sub in subnets:
+        if sub in warm:
+            probed[sub] = sub.was_alive + sorted(sub.table.known.difference(sub.was_alive))
+        else:
+            probed[sub] = sub.table.host_offsets()
+    ips = [sub.table.ip_of(o) for sub in subnets for o in probed[sub]]
+    discovery.wake(ips)
+    time.sleep(FAST_DELAY if len(warm) == len(subnets) else INITIAL_DELAY)
+    arp_alive = read_arp_tables(subnets)
+    # TCP probe (all hosts of all subnets at once)
+    alive_tcp = probe_engine.probe(ips)
+    record_results(subnets, arp_alive, alive_tcp, probed)
+
+def incremental_scan(subnets):
+    now = time.time()
+    probed = {sub: sub.targets(now) for sub in subnets}
+    ips = [sub.table.ip_of(o) for sub in subnets for o in probed[sub]]
+    if ips:
+        discovery.wake(ips)
+        time.sleep(FAST_DELAY)
+    arp_alive = read_arp_tables(subnets)
+    alive_tcp = probe_engine.probe(ips)
+    record_results(subnets, arp_alive, alive_tcp, probed)
+
+def alive_devices(subnets):
+    """({ip: mac}, {ip: {"iface", "cidr", "hostname", ...}}) over all subnets."""
+    alive, tags = {}, {}
+    for sub in subnets:
+        table = sub.table
+        for ip, mac in table.alive_devices().items():
+            alive[ip] = mac
+            tags[ip] = dict(sub.tags(), **table.info.get(table.offset_of(ip), {}))
+    return alive, tags
+
+def state_path(sub):
+    return os.path.join(STATE_DIR, "hosts-" + sub.cidr.replace("/", "_") + ".json")
+
+def load_state(subnets):
+    """Restores each subnet's host table from its saved state; returns the subnets that were restored."""
+    if not STATE_DIR:
+        return []
+    warm = []
+    now = time.time()
+    for sub in subnets:
         try:
-            # Check if valid IP in our subnet
-            a = ipaddress.IPv4Address(ip_str)
-            if a in net and not a.is_multicast and not a.is_loopback and a != net.broadcast_address:
-                # Search for MAC in the line
-                mac_match = mac_regex.search(line)
-                if mac_match:
-                    # Normalize MAC to xx:xx:xx:xx:xx:xx
-                    mac = mac_match.group(0).replace("-", ":").lower()
-                    res[str(a)] = mac
-                else:
-                    # IP found but no MAC? (rare in arp -a, but store as None)
-                    res[str(a)] = None
-        except:
+            with open(state_path(sub), "r") as f:
+                state = json.load(f)
+            if now - float(state.get("saved_at", 0)) > STATE_MAX_AGE:
+                continue
+            was_alive = sub.table.restore(state)
+        except (OSError, ValueError, TypeError, AttributeError):
+            sub.table = HostTable(sub.cidr, probe_policy)  # drop a half-restored table
+            continue
+        if was_alive is None:
             continue
-            
-    return res
+        sub.warm, sub.was_alive = True, was_alive
+        warm.append(sub)
+    return warm
 
-def neighbors_of(ip_str, cidr, rng=NEIGHBOR_RANGE):
+def save_state(subnets):
+    """Writes every subnet's host table (tmp file + rename, so a crash never leaves half a file)."""
+    if not STATE_DIR:
+        return
+    now = time.time()
     try:
-        ip = ipaddress.IPv4Address(ip_str)
-        net = ipaddress.ip_network(cidr, False)
-    except:
-        return []
-    base = int(ip)
-    out = []
-    for d in range(-rng, rng+1):
-        if d == 0:
-            continue
-        cand = ipaddress.IPv4Address(base + d)
-        if cand in net:
-            out.append(str(cand))
-    return out
+        os.makedirs(STATE_DIR, exist_ok=True)
+    except OSError:
+        return
+    for sub in subnets:
+        path = state_path(sub)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(sub.table.to_state(now), f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            pass
 
-def initial_full_scan(cidr, local_ip):
-    net = ipaddress.ip_network(cidr, False)
-    ips = [str(h) for h in net.hosts()]
-    udp_wake_ips(ips)
-    time.sleep(INITIAL_DELAY)
-    arp_alive = read_arp_table(cidr)
-    # TCP probe (concurrent)
-    alive_tcp = set()
-    with ThreadPoolExecutor(max_workers=THREADS) as ex:
-        futures = {ex.submit(tcp_probe, ip): ip for ip in ips}
-        for fut in as_completed(futures):
-            try:
-                if fut.result():
-                    alive_tcp.add(futures[fut])
-            except:
-                pass
-    # Merge ARP (ip->mac) and TCP (ip->None)
-    # Result: {ip: mac or None}
-    combined = {}
-    for ip, mac in arp_alive.items():
-        combined[ip] = mac
-    for ip in alive_tcp:
-        if ip not in combined:
-            combined[ip] = None
-    
-    # Add local
-    if local_ip not in combined:
-        combined[local_ip] = None
-        
-    return combined
+def wait_commands(control, timeout):
+    """Control messages that arrive within `timeout` seconds (None: wait for one)."""
+    try:
+        commands = [control.get(timeout=timeout)]
+    except queue.Empty:
+        return []
+    while True:
+        try:
+            commands.append(control.get_nowait())
+        except queue.Empty:
+            return commands
 
-def incremental_scan(previous_alive, cidr, local_ip):
-    net = ipaddress.ip_network(cidr, False)
-    all_hosts = [str(h) for h in net.hosts()]
-    target = set(previous_alive)
-    for ip in list(previous_alive):
-        for n in neighbors_of(ip, cidr):
-            target.add(n)
-    remaining = [h for h in all_hosts if h not in target]
-    if remaining:
-        sample = random.sample(remaining, min(RANDOM_SAMPLE_PER_CYCLE, len(remaining)))
-        target.update(sample)
-    udp_wake_ips(list(target))
-    time.sleep(FAST_DELAY)
-    arp_alive = read_arp_table(cidr)
-    alive_tcp = set()
-    with ThreadPoolExecutor(max_workers=THREADS) as ex:
-        futures = {ex.submit(tcp_probe, ip): ip for ip in target}
-        for fut in as_completed(futures):
-            try:
-                if fut.result():
-                    alive_tcp.add(futures[fut])
-            except:
-                pass
-    # Merge
-    combined = {}
-    for ip, mac in arp_alive.items():
-        combined[ip] = mac
-    for ip in alive_tcp:
-        if ip not in combined:
-            combined[ip] = None
-            
-    if local_ip not in combined:
-        combined[local_ip] = None
-        
-    return combined
+def apply_config(values, events):
+    applied = {}
+    for name, value in values.items():
+        cast = CONFIGURABLE.get(name)
+        if cast is None:
+            continue
+        try:
+            globals()[name] = cast(value)
+        except (TypeError, ValueError):
+            continue
+        applied[name] = globals()[name]
+    probe_engine.timeout = TCP_TIMEOUT
+    probe_policy.cycle = CYCLE_INTERVAL
+    probe_policy.join_slo = JOIN_SLO
+    probe_policy.leave_slo = LEAVE_SLO
+    probe_policy.max_sample = RANDOM_SAMPLE_PER_CYCLE
+    if events:
+        events.checkpoint_interval = CHECKPOINT_INTERVAL
+    return applied
 
 def main():
-    iface, local_ip, netmask, cidr = detect_network()
-    if not cidr:
-        # print empty JSON to indicate no network
-        print(json.dumps([]), flush=True)
+    channel = ScannerChannel()
+    subnets = detect_networks()
+    if not subnets:
+        # send empty JSON to indicate no network
+        channel.send([])
         return
+    discovery.start([sub.local_ip for sub in subnets])
+    warm = load_state(subnets)
     # initial
-    print(json.dumps({"scanner":"started","cidr":cidr}), flush=True)
+    channel.send({"scanner": "started", "cidr": subnets[0].cidr,
+                  "subnets": [sub.info() for sub in subnets]})
     try:
-        prev = initial_full_scan(cidr, local_ip)
+        initial_full_scan(subnets, warm)
     except:
-        prev = {local_ip: None}
-        
-    # emit first list (prev is {ip: mac})
-    # sort by IP
-    sorted_ips = sorted(prev.keys(), key=lambda s: tuple(map(int, s.split('.'))))
-    devices = [{"ip": ip, "mac": prev[ip], "vendor": None} for ip in sorted_ips]
-    
-    print(json.dumps(devices), flush=True)
+        record_results(subnets, {}, (), {})
+    prev, tags = alive_devices(subnets)
+    save_state(subnets)
+    last_saved = time.time()
+
+    events = EventWriter(channel.send, CHECKPOINT_INTERVAL) if OUTPUT_MODE == "events" else None
+    control = queue.Queue()
+    channel.start_control(control.put)
+
+    # emit first list (prev is {ip: mac}), sorted by IP
+    if events:
+        events.checkpoint(prev, tags)
+    else:
+        channel.send(device_list(prev, tags))
     
     # loop
+    paused = False
+    commands = []
     while True:
+        rescan = False
+        for msg in commands:
+            cmd = msg.get("cmd") if isinstance(msg, dict) else None
+            reply = {"event": "control", "cmd": cmd, "ok": True}
+            if cmd == "pause":
+                paused = True
+            elif cmd == "resume":
+                paused = False
+            elif cmd == "rescan":
+                rescan, paused = True, False
+            elif cmd == "config":
+                reply["applied"] = apply_config(msg.get("values") or {}, events)
+            else:
+                reply["ok"] = False
+            channel.send(reply)
+
+        if paused:
+            commands = wait_commands(control, None)
+            continue
+
         start = time.time()
         try:
-            # alive is {ip: mac}
-            alive = incremental_scan(prev.keys(), cidr, local_ip)
+            if rescan:
+                initial_full_scan(subnets)
+            else:
+                incremental_scan(subnets)
         except:
-            alive = prev
-            
-        sorted_ips = sorted(alive.keys(), key=lambda s: tuple(map(int, s.split('.'))))
-        devs = [{"ip": ip, "mac": alive[ip], "vendor": None} for ip in sorted_ips]
-        
-        print(json.dumps(devs), flush=True)
-        prev = alive
+            pass
+        # alive is {ip: mac}
+        alive, tags = alive_devices(subnets)
+
+        if events and rescan:
+            events.checkpoint(alive, tags)
+        elif events:
+            events.update(alive, tags)
+        else:
+            channel.send(device_list(alive, tags))
+        if time.time() - last_saved >= STATE_INTERVAL:
+            save_state(subnets)
+            last_saved = time.time()
         elapsed = time.time() - start
-        to_wait = max(0, CYCLE_INTERVAL - elapsed)
-        time.sleep(to_wait)
+        commands = wait_commands(control, max(0, CYCLE_INTERVAL - elapsed))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+# functions/codec.py
+"""
+Packed (binary) payloads for large Socket.IO emits.
+
+A packed emit goes out as the "agent_packed" event:
+
+    {"event": "<original event>", "fmt": "json" | "msgpack", "z": true | false, "body": <bytes>}
+
+`body` is the original event data serialized with `fmt` and zlib-compressed
+(z = true). Socket.IO sends the bytes as a binary attachment, so nothing is
+base64- or JSON-escaped. Payloads smaller than `min_compress` bytes are not
+worth the wrapper and are left for the caller to emit plain.
+"""
+import json
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+SUPPORTED_FORMATS = ("msgpack", "json") if msgpack else ("json",)
+
+
+def _dumps(fmt: str, data: Any) -> bytes:
+    if fmt == "msgpack":
+        return msgpack.packb(data, default=str, use_bin_type=True)
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _loads(fmt: str, body: bytes) -> Any:
+    if fmt == "msgpack":
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def unpack(packed: Dict[str, Any]) -> Any:
+    """Decodes an "agent_packed" payload back into the original event data."""
+    body = packed["body"]
+    if packed.get("z"):
+        body = zlib.decompress(body)
+    return _loads(packed.get("fmt", "json"), body)
+
+
+def stats_key(event: str, data: Any) -> str:
+    if event == "agent_data" and isinstance(data, dict):
+        return data.get("type", event)
+    return event
+
+
+class PayloadCodec:
+    """
+    Packs event data and keeps per-type counters: serialized size, bytes on
+    the wire and encode CPU time.
+    """
+
+    def __init__(self, fmt: str = "json", min_compress: int = 1024, level: int = 6):
+        if fmt not in SUPPORTED_FORMATS:
+            fmt = "json"
+        self.fmt = fmt
+        self.min_compress = min_compress
+        self.level = level
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def pack(self, event: str, data: Any, fmt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Returns the "agent_packed" payload, or None if data is below min_compress."""
+        fmt = fmt or self.fmt
+        t0 = time.thread_time()
+        body = _dumps(fmt, data)
+        raw_len = len(body)
+        packed = None
+        if raw_len >= self.min_compress:
+            body = zlib.compress(body, self.level)
+            packed = {"event": event, "fmt": fmt, "z": True, "body": body}
+        cpu = time.thread_time() - t0
+
+        self._record(stats_key(event, data), raw_len, len(body), cpu)
+        return packed
+
+    def _record(self, key, raw_len, wire_len, cpu):
+        with self._lock:
+            s = self._stats.setdefault(key, {"count": 0, "raw_bytes": 0, "wire_bytes": 0, "cpu_s": 0.0})
+            s["count"] += 1
+            s["raw_bytes"] += raw_len
+            s["wire_bytes"] += wire_len
+            s["cpu_s"] += cpu
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for key, s in self._stats.items():
+                out[key] = dict(s)
+                out[key]["ratio"] = round(s["raw_bytes"] / s["wire_bytes"], 2) if s["wire_bytes"] else None
+                out[key]["cpu_us_per_emit"] = round(s["cpu_s"] * 1e6 / s["count"], 1) if s["count"] else None
+            return out
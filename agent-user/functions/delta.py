@@ -0,0 +1,116 @@
+# functions/delta.py
+"""
+Structural diff/patch for snapshot payloads (system_info, installed_apps,
+task_info). Mirrored by backend/src/utils/snapshotDelta.js.
+
+Patch nodes:
+  {"op": "none"}                                  (top level only: nothing changed)
+  {"op": "replace", "value": v}
+  {"op": "dict", "added": {k: v}, "removed": [k], "changed": {k: node}}
+  {"op": "list", "key": field, "added": [item], "removed": [id], "changed": [{"id": id, "patch": node}]}
+
+Lists are diffed item-by-item only when every item is a dict carrying a
+unique value for one of KEY_FIELDS; any other list that changed is replaced.
+List patches keep surviving items in their previous order and append new ones.
+"""
+from typing import Any, Dict, List, Optional
+
+KEY_FIELDS = ("pid", "registry_key", "mountpoint", "device")
+NO_CHANGE = {"op": "none"}
+
+
+def _list_key(items: List[Any]) -> Optional[str]:
+    if not items or not all(isinstance(i, dict) for i in items):
+        return None
+    for field in KEY_FIELDS:
+        ids = [i.get(field) for i in items]
+        if None not in ids and len(set(map(repr, ids))) == len(ids):
+            return field
+    return None
+
+
+def _node(op: str, **fields) -> Dict[str, Any]:
+    """Builds a patch node, leaving out empty collections."""
+    node = {"op": op}
+    node.update((k, v) for k, v in fields.items() if v or not isinstance(v, (dict, list)))
+    return node
+
+
+def diff(old: Any, new: Any) -> Optional[Dict[str, Any]]:
+    """Returns a patch turning `old` into `new`, or None if they are equal."""
+    if old == new:
+        return None
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        added = {k: v for k, v in new.items() if k not in old}
+        removed = [k for k in old if k not in new]
+        changed = {}
+        for k, v in new.items():
+            if k in old:
+                sub = diff(old[k], v)
+                if sub is not None:
+                    changed[k] = sub
+        return _node("dict", added=added, removed=removed, changed=changed)
+
+    if isinstance(old, list) and isinstance(new, list):
+        key = _list_key(old) if old else None
+        if key and _list_key(new) == key:
+            old_by_id = {repr(i[key]): i for i in old}
+            new_ids = {repr(i[key]) for i in new}
+            added, changed = [], []
+            for item in new:
+                prev = old_by_id.get(repr(item[key]))
+                if prev is None:
+                    added.append(item)
+                else:
+                    sub = diff(prev, item)
+                    if sub is not None:
+                        changed.append({"id": item[key], "patch": sub})
+            removed = [i[key] for i in old if repr(i[key]) not in new_ids]
+            return _node("list", key=key, added=added, removed=removed, changed=changed)
+
+    return {"op": "replace", "value": new}
+
+
+def apply(old: Any, patch: Optional[Dict[str, Any]]) -> Any:
+    """Applies a patch produced by diff(); returns a new object."""
+    if is_empty(patch):
+        return old
+    op = patch.get("op")
+
+    if op == "replace":
+        return patch.get("value")
+
+    if op == "dict":
+        out = dict(old or {})
+        for k in patch.get("removed", []):
+            out.pop(k, None)
+        for k, sub in patch.get("changed", {}).items():
+            out[k] = apply(out.get(k), sub)
+        out.update(patch.get("added", {}))
+        return out
+
+    if op == "list":
+        key = patch["key"]
+        removed = {repr(i) for i in patch.get("removed", [])}
+        changed = {repr(c["id"]): c["patch"] for c in patch.get("changed", [])}
+        out = []
+        for item in old or []:
+            ident = repr(item.get(key))
+            if ident in removed:
+                continue
+            out.append(apply(item, changed[ident]) if ident in changed else item)
+        out.extend(patch.get("added", []))
+        return out
+
+    raise ValueError(f"unknown patch op: {op}")
+
+
+def make_patch(old: Any, new: Any) -> Dict[str, Any]:
+    """Like diff(), but always returns a patch object (NO_CHANGE if equal)."""
+    patch = diff(old, new)
+    return NO_CHANGE if patch is None else patch
+
+
+def is_empty(patch: Optional[Dict[str, Any]]) -> bool:
+    return patch is None or patch.get("op") == "none"
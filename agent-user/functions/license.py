@@ -1,12 +1,14 @@
 import os
 import logging
-import winreg
 import hashlib
 import subprocess
 import json
+import threading
+import time
 
 def get_machine_guid():
     try:
+        import winreg
         registry = winreg.ConnectRegistry(None, winreg.HKEY_LOCAL_MACHINE)
         key = winreg.OpenKey(registry, r"SOFTWARE\Microsoft\Cryptography")
         value, regtype = winreg.QueryValueEx(key, "MachineGuid")
@@ -38,17 +40,154 @@ def get_system_drive_serial():
         logging.error(f"Error getting Drive Serial: {e}")
         return "UnknownDrive"
 
-def generate_fingerprint():
-    machine_guid = get_machine_guid()
-    cpu_id = get_cpu_id()
-    drive_serial = get_system_drive_serial()
-    
+FINGERPRINT_SALT = "GCA_VISUS_NT_2025"
+
+def hash_fingerprint(machine_guid, cpu_id, drive_serial):
     # Salted hash
-    salt = "GCA_VISUS_NT_2025"
-    raw_id = f"{machine_guid}|{cpu_id}|{drive_serial}|{salt}"
-    
+    raw_id = f"{machine_guid}|{cpu_id}|{drive_serial}|{FINGERPRINT_SALT}"
     return hashlib.sha256(raw_id.encode()).hexdigest()
 
+class WindowsFingerprintProvider:
+    """
+    Fingerprint inputs on Windows. MachineGuid is a single registry read;
+    the CPU id and drive serial each shell out to wmic and are the slow part.
+    """
+    name = "windows"
+
+    def machine_guid(self):
+        return get_machine_guid()
+
+    def hardware_ids(self):
+        return get_cpu_id(), get_system_drive_serial()
+
+def _read_id_file(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+class LinuxFingerprintProvider:
+    """
+    Fingerprint inputs on Linux: /etc/machine-id stands in for MachineGuid
+    and the DMI ids (/sys/class/dmi/id) for the CPU id and drive serial.
+    `root` lets the same files be read from another tree.
+    """
+    name = "linux"
+
+    def __init__(self, root="/"):
+        self.root = root
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def machine_guid(self):
+        return (_read_id_file(self._path("etc", "machine-id"))
+                or _read_id_file(self._path("var", "lib", "dbus", "machine-id"))
+                or "UnknownGuid")
+
+    def hardware_ids(self):
+        dmi = self._path("sys", "class", "dmi", "id")
+        cpu_id = _read_id_file(os.path.join(dmi, "product_uuid")) or "UnknownCPU"
+        drive_serial = (_read_id_file(os.path.join(dmi, "board_serial"))
+                        or _read_id_file(os.path.join(dmi, "product_serial"))
+                        or "UnknownDrive")
+        return cpu_id, drive_serial
+
+def default_fingerprint_provider():
+    if os.name == "nt":
+        return WindowsFingerprintProvider()
+    return LinuxFingerprintProvider()
+
+def generate_fingerprint(provider=None):
+    provider = provider or default_fingerprint_provider()
+    machine_guid = provider.machine_guid()
+    cpu_id, drive_serial = provider.hardware_ids()
+    return hash_fingerprint(machine_guid, cpu_id, drive_serial)
+
+FINGERPRINT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fingerprint.cache")
+
+class FingerprintCache:
+    """
+    Computed fingerprint kept on disk next to the cheap input it was derived
+    from (a hash of MachineGuid / machine-id), so startup does not wait on wmic.
+
+    get() returns the cached fingerprint while the cheap input still matches
+    and re-verifies it in full on a background thread; on_change(new) is
+    called if the hardware ids moved under the same MachineGuid. Without a
+    usable cache entry it computes in full and writes the cache.
+    """
+
+    def __init__(self, path=FINGERPRINT_CACHE_FILE, provider=None):
+        self.path = path
+        self.provider = provider or default_fingerprint_provider()
+
+    @staticmethod
+    def _guid_hash(machine_guid):
+        return hashlib.sha256(machine_guid.encode()).hexdigest()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, machine_guid, fingerprint):
+        data = {
+            "provider": self.provider.name,
+            "guid_hash": self._guid_hash(machine_guid),
+            "fingerprint": fingerprint,
+            "verified_at": int(time.time()),
+        }
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write fingerprint cache: {e}")
+
+    def lookup(self):
+        """Cached fingerprint if the cheap input still matches, else None."""
+        data = self._load()
+        if not data or data.get("provider") != self.provider.name:
+            return None
+        if data.get("guid_hash") != self._guid_hash(self.provider.machine_guid()):
+            return None
+        return data.get("fingerprint")
+
+    def compute(self):
+        """Full (slow) computation; refreshes the cache."""
+        machine_guid = self.provider.machine_guid()
+        cpu_id, drive_serial = self.provider.hardware_ids()
+        fingerprint = hash_fingerprint(machine_guid, cpu_id, drive_serial)
+        self._save(machine_guid, fingerprint)
+        return fingerprint
+
+    def get(self, on_change=None):
+        cached = self.lookup()
+        if not cached:
+            return self.compute()
+        self.start_verification(cached, on_change)
+        return cached
+
+    def start_verification(self, cached, on_change=None):
+        def verify():
+            try:
+                fresh = self.compute()
+            except Exception as e:
+                logging.error(f"Fingerprint re-verification failed: {e}")
+                return
+            if fresh != cached:
+                logging.warning("Hardware fingerprint changed since it was cached")
+                if on_change:
+                    on_change(fresh)
+
+        thread = threading.Thread(target=verify, name="fingerprint-verify", daemon=True)
+        thread.start()
+        return thread
+
 TOKEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "license.token")
 
 def save_license_token(token):
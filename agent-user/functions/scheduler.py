@@ -0,0 +1,207 @@
+# functions/scheduler.py
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def interval_from_env(name: str, default: float) -> float:
+    """Interval override for a collector: AGENT_INTERVAL_<NAME> (seconds)."""
+    try:
+        return float(os.getenv(f"AGENT_INTERVAL_{name.upper()}", default))
+    except ValueError:
+        return default
+
+
+class Collector:
+    """
+    One periodic collector. `fn()` returns the payload that is sent as
+    `data_type`, or None when there is nothing to send. Runs are spaced `interval` seconds apart (measured from the
+    end of the previous run) with +/- `jitter` (fraction of the interval)
+    so collectors do not fire in lockstep.
+    """
+
+    def __init__(self, name: str, fn: Callable[[], Any], interval: float,
+                 jitter: float = 0.1, timeout: Optional[float] = None, data_type: Optional[str] = None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout if timeout is not None else interval
+        self.data_type = data_type or name
+
+        self.next_run = 0.0
+        self.future: Optional[Future] = None
+        self.started = 0.0
+        self.timed_out = False
+
+        self.runs = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+
+    @property
+    def deadline(self) -> float:
+        return self.started + self.timeout
+
+    def busy(self) -> bool:
+        """Running and still within its deadline."""
+        return self.future is not None and not self.timed_out
+
+    def schedule_next(self, now: float):
+        spread = self.interval * self.jitter
+        self.next_run = now + self.interval + random.uniform(-spread, spread)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "timeout": self.timeout,
+            "runs": self.runs,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "running": self.future is not None,
+            "last_run": self.last_run,
+            "last_duration": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "next_in": round(max(0.0, self.next_run - time.time()), 1),
+        }
+
+
+class CollectorScheduler:
+    """
+    Runs each collector on its own interval, on a bounded worker pool.
+
+    All collectors are due at startup. While `enabled()` is False (e.g. the
+    agent is not licensed yet) nothing runs and pending runs are kept.
+    run_now() is thread-safe and moves collectors to the front, so backend
+    requests are served without waiting for the next interval.
+
+    Results are sent from the worker as each collector finishes. A run that
+    passes its collector's `timeout` is counted as a timeout and its result,
+    if it ever arrives, is dropped; the next run is scheduled right away.
+    A collector never runs twice at once: while a timed-out run is still
+    stuck, its later cycles are skipped (and counted) instead of tying up
+    more workers.
+    """
+
+    def __init__(self, send: Callable[[str, Any], None], enabled: Callable[[], bool] = lambda: True,
+                 idle: float = 5.0, max_workers: int = 3):
+        self._send = send
+        self._enabled = enabled
+        self._idle = idle
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="collector")
+        self._collectors: Dict[str, Collector] = {}
+        self._pending = set()
+        # Reentrant: a future that is already done runs its callback inside submit's caller
+        self._cond = threading.Condition(threading.RLock())
+        self._stopped = False
+
+    def add(self, name: str, fn: Callable[[], Any], interval: float, jitter: float = 0.1,
+            timeout: Optional[float] = None, data_type: Optional[str] = None) -> Collector:
+        collector = Collector(name, fn, interval, jitter, timeout, data_type)
+        with self._cond:
+            self._collectors[name] = collector
+            self._cond.notify()
+        return collector
+
+    def run_now(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Requests an immediate run; returns the collector names that were scheduled."""
+        with self._cond:
+            targets = [n for n in (names or self._collectors) if n in self._collectors]
+            self._pending.update(targets)
+            self._cond.notify()
+        return targets
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {name: c.stats() for name, c in self._collectors.items()}
+
+    def timeout_counts(self) -> Dict[str, int]:
+        with self._cond:
+            return {name: c.timeouts for name, c in self._collectors.items()}
+
+    def run_forever(self):
+        """Blocks, starting collectors as they come due, until stop()."""
+        try:
+            with self._cond:
+                while not self._stopped:
+                    now = time.time()
+                    self._expire(now)
+                    for collector in self._take_due(now):
+                        self._start(collector, now)
+                    self._cond.wait(self._wait_time())
+        finally:
+            self._pool.shutdown(wait=False)
+
+    # -------------------------------------------------------
+    # Internals (caller holds self._cond unless noted)
+    # -------------------------------------------------------
+    def _take_due(self, now: float) -> List[Collector]:
+        if not self._enabled():
+            return []
+        due = [c for c in self._collectors.values()
+               if not c.busy() and (c.name in self._pending or c.next_run <= now)]
+        due.sort(key=lambda c: (c.name not in self._pending, c.next_run))
+        self._pending.difference_update(c.name for c in due)
+        return due
+
+    def _wait_time(self) -> float:
+        if not self._collectors or not self._enabled():
+            return self._idle
+        wake = [c.deadline if c.busy() else c.next_run for c in self._collectors.values()]
+        return min(self._idle, max(0.0, min(wake) - time.time()))
+
+    def _start(self, collector: Collector, now: float):
+        if collector.future is not None:
+            # Previous (timed-out) run is still stuck in a worker
+            collector.skipped += 1
+            collector.schedule_next(now)
+            return
+        collector.started = now
+        collector.timed_out = False
+        collector.future = self._pool.submit(collector.fn)
+        collector.future.add_done_callback(lambda f, c=collector: self._finish(c, f))
+
+    def _expire(self, now: float):
+        for c in self._collectors.values():
+            if c.busy() and now >= c.deadline:
+                c.timed_out = True
+                c.timeouts += 1
+                c.schedule_next(now)
+                logging.warning(f"[⏱️] Collector {c.name} timed out after {c.timeout:.1f}s "
+                                f"({c.timeouts} timeout(s) so far)")
+
+    def _finish(self, collector: Collector, future: Future):
+        """Runs on the worker thread (without the lock held)."""
+        now = time.time()
+        with self._cond:
+            collector.future = None
+            collector.last_run = collector.started
+            collector.last_duration = now - collector.started
+            timed_out = collector.timed_out
+            if not timed_out:
+                collector.schedule_next(now)
+            self._cond.notify()
+
+        if timed_out:
+            logging.info(f"[⏱️] Dropping late result of {collector.name} "
+                         f"({collector.last_duration:.1f}s)")
+            return
+        try:
+            payload = future.result()
+            if payload is not None:
+                self._send(collector.data_type, payload)
+            collector.runs += 1
+        except Exception as e:
+            collector.errors += 1
+            logging.error(f"[❌] Collector {collector.name} failed: {e}")
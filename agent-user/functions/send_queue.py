@@ -0,0 +1,197 @@
+# functions/send_queue.py
+import itertools
+import threading
+import time
+from collections import deque
+from queue import Empty
+from typing import Any, Dict, Optional
+
+# Full-state snapshots: only the newest pending entry per type is worth sending.
+SNAPSHOT_TYPES = frozenset({"system_info", "port_scan", "task_info", "installed_apps"})
+
+# Per-type caps for event streams. Types not listed use the default cap.
+EVENT_CAPS = {
+    "app_usage": 2000,
+    "event_logs": 1000,
+    "usb_devices": 200,
+}
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+class TelemetryQueue:
+    """
+    Bounded, type-aware replacement for queue.Queue used by sender.py.
+
+    - Snapshot types are coalesced: a newer snapshot replaces the pending
+      one in place (latest wins) and keeps its position in the send order.
+    - Event types are kept in FIFO order, capped per type and overall.
+      On overflow the configured policy drops either the oldest pending
+      event or the incoming one.
+
+    Ordering across types follows insertion order.
+    """
+
+    def __init__(self,
+                 max_events: int = 5000,
+                 default_event_cap: int = 1000,
+                 overflow: str = DROP_OLDEST,
+                 event_caps: Optional[Dict[str, int]] = None,
+                 snapshot_types=SNAPSHOT_TYPES):
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"unknown overflow policy: {overflow}")
+        self.max_events = max_events
+        self.default_event_cap = default_event_cap
+        self.overflow = overflow
+        self.event_caps = dict(EVENT_CAPS if event_caps is None else event_caps)
+        self.snapshot_types = frozenset(snapshot_types)
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._front_seq = itertools.count(-1, -1)
+        self._snapshots: Dict[str, list] = {}    # type -> [seq, entry]
+        self._events: Dict[str, deque] = {}      # type -> deque of (seq, entry)
+        self._event_count = 0
+
+        self.enqueued: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+        self.high_water = 0
+
+    # -------------------------------------------------------
+    # Queue-compatible API
+    # -------------------------------------------------------
+    def put(self, entry: Dict[str, Any], block=True, timeout=None) -> bool:
+        """Adds an entry. Returns False if the entry itself was dropped."""
+        with self._cond:
+            accepted = self._put(entry, next(self._seq))
+            if accepted:
+                self._cond.notify()
+            return accepted
+
+    def put_front(self, entry: Dict[str, Any]) -> bool:
+        """Re-queues an entry ahead of everything pending (used for send retries)."""
+        with self._cond:
+            accepted = self._put(entry, next(self._front_seq), retry=True)
+            if accepted:
+                self._cond.notify()
+            return accepted
+
+    def get(self, block=True, timeout=None) -> Dict[str, Any]:
+        with self._cond:
+            if block:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._qsize():
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Empty
+                    self._cond.wait(remaining)
+            elif not self._qsize():
+                raise Empty
+            return self._pop()
+
+    def get_nowait(self) -> Dict[str, Any]:
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        with self._cond:
+            return not self._qsize()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = {t: len(q) for t, q in self._events.items() if q}
+            for t in self._snapshots:
+                depth[t] = 1
+            return {
+                "depth": self._qsize(),
+                "depth_by_type": depth,
+                "high_water": self.high_water,
+                "enqueued": dict(self.enqueued),
+                "coalesced": dict(self.coalesced),
+                "dropped": dict(self.dropped),
+                "dropped_total": sum(self.dropped.values()),
+            }
+
+    # -------------------------------------------------------
+    # Internals (caller holds self._cond)
+    # -------------------------------------------------------
+    def _qsize(self) -> int:
+        return self._event_count + len(self._snapshots)
+
+    def _count(self, counter, data_type, n=1):
+        counter[data_type] = counter.get(data_type, 0) + n
+
+    def _put(self, entry, seq, retry=False) -> bool:
+        data_type = entry.get("type", "unknown")
+        if not retry:
+            self._count(self.enqueued, data_type)
+
+        if data_type in self.snapshot_types:
+            slot = self._snapshots.get(data_type)
+            if slot is None:
+                self._snapshots[data_type] = [seq, entry]
+            elif retry:
+                # A newer snapshot is already pending; the retried one is stale.
+                self._count(self.coalesced, data_type)
+                slot[0] = min(slot[0], seq)
+            else:
+                self._count(self.coalesced, data_type)
+                slot[1] = entry
+            self._track_high_water()
+            return True
+
+        lane = self._events.setdefault(data_type, deque())
+        cap = self.event_caps.get(data_type, self.default_event_cap)
+        if len(lane) >= cap or self._event_count >= self.max_events:
+            if self.overflow == DROP_NEWEST and not retry:
+                self._count(self.dropped, data_type)
+                return False
+            victim = lane if len(lane) >= cap else self._oldest_event_lane()
+            # Retried entries are the oldest by definition; make room at the back.
+            victim_type, _ = self._drop_from(victim, newest=retry)
+            self._count(self.dropped, victim_type)
+
+        if retry:
+            lane.appendleft((seq, entry))
+        else:
+            lane.append((seq, entry))
+        self._event_count += 1
+        self._track_high_water()
+        return True
+
+    def _drop_from(self, lane, newest=False):
+        seq, entry = lane.pop() if newest else lane.popleft()
+        self._event_count -= 1
+        return entry.get("type", "unknown"), entry
+
+    def _oldest_event_lane(self):
+        oldest = None
+        for lane in self._events.values():
+            if lane and (oldest is None or lane[0][0] < oldest[0][0]):
+                oldest = lane
+        return oldest
+
+    def _pop(self):
+        best_type, best_seq, is_snapshot = None, None, False
+        for data_type, slot in self._snapshots.items():
+            if best_seq is None or slot[0] < best_seq:
+                best_type, best_seq, is_snapshot = data_type, slot[0], True
+        for data_type, lane in self._events.items():
+            if lane and (best_seq is None or lane[0][0] < best_seq):
+                best_type, best_seq, is_snapshot = data_type, lane[0][0], False
+
+        if is_snapshot:
+            return self._snapshots.pop(best_type)[1]
+        _, entry = self._events[best_type].popleft()
+        self._event_count -= 1
+        return entry
+
+    def _track_high_water(self):
+        size = self._qsize()
+        if size > self.high_water:
+            self.high_water = size
@@ -1,29 +1,62 @@
 import os
+import asyncio
+import atexit
 import logging
 import platform
 from datetime import datetime
 from dotenv import load_dotenv
-import socketio
 import time
 import threading
-from queue import Queue
+import functools
+import itertools
 import subprocess
 import json
 import sys
-from .license import generate_fingerprint, load_license_token, save_license_token, verify_license_locally
-import requests
+from .send_queue import TelemetryQueue, SNAPSHOT_TYPES
+from .spool import Spool
+from . import delta
+from .codec import PayloadCodec, SUPPORTED_FORMATS
+from .delivery import InflightWindow
+from .transport import AsyncTransport
+from .license import FingerprintCache, load_license_token, save_license_token, verify_license_locally
 
 logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
 SERVER_URL = os.getenv("SERVER_URL")
 AGENT_ID = os.getenv("AGENT_ID", platform.node())
-FINGERPRINT = generate_fingerprint()
 IS_LICENSED = False
 
-def get_local_version():
+_fingerprint = None
+_fingerprint_lock = threading.Lock()
+_fingerprint_cache = FingerprintCache()
+
+
+def get_fingerprint():
+    """
+    Hardware fingerprint, computed on first use rather than at import.
+    Served from the on-disk cache while MachineGuid is unchanged (the full
+    computation shells out to wmic) and re-verified in the background.
+    start_sender_loop() warms it up.
+    """
+    global _fingerprint
+    with _fingerprint_lock:
+        if _fingerprint is None:
+            _fingerprint = _fingerprint_cache.get(on_change=_fingerprint_changed)
+        return _fingerprint
+
+
+def _fingerprint_changed(fingerprint):
+    """Background re-verification found new hardware ids: register again."""
+    global _fingerprint
+    with _fingerprint_lock:
+        _fingerprint = fingerprint
+    if sio.connected:
+        sio.submit(_register_agent())
+
+def _base_dirs():
     """
-    Finds version.json in EXE dir, Script dir, or CWD.
+    Candidate install dirs: EXE dir, Script dir, CWD.
     """
     candidates = []
     
@@ -45,7 +78,26 @@ def get_local_version():
         candidates.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
     except: pass
 
+    return candidates
+
+
+def get_data_dir():
+    """
+    Directory holding version.json (falls back to the first candidate).
+    """
+    candidates = _base_dirs()
     for base in candidates:
+        if os.path.exists(os.path.join(base, "version.json")):
+            return base
+    return candidates[0]
+
+
+@functools.lru_cache(maxsize=None)
+def get_local_version():
+    """
+    Finds version.json in EXE dir, Script dir, or CWD (resolved once).
+    """
+    for base in _base_dirs():
         v_path = os.path.join(base, "version.json")
         if os.path.exists(v_path):
             try:
@@ -60,45 +112,378 @@ def get_local_version():
     logging.warning("[⚠️] Could not resolve local version. Defaulting to 0.0.0")
     return "0.0.0"
 
-LOCAL_VERSION = get_local_version()
-
 
 # -----------------------------------------------------------
 # SOCKET.IO CLIENT
 # -----------------------------------------------------------
-sio = socketio.Client(
+# socketio.AsyncClient on a single event loop thread (functions/transport.py).
+# Producers on any thread hand data over through send_data(); one flusher
+# task on the loop does all emitting.
+sio = AsyncTransport(
     reconnection=True,
     reconnection_attempts=0,
     reconnection_delay=3
 )
 
-send_queue = Queue()
+# Backpressure: stop emitting while engine.io still has this many packets queued
+SEND_HIGH_WATER = int(os.getenv("AGENT_SEND_HIGH_WATER", "64"))
+
+# Bounded and type-aware: snapshots coalesce (latest wins), event streams
+# are capped with an explicit overflow policy. See functions/send_queue.py.
+send_queue = TelemetryQueue(
+    max_events=int(os.getenv("AGENT_QUEUE_MAX_EVENTS", "5000")),
+    default_event_cap=int(os.getenv("AGENT_QUEUE_EVENT_CAP", "1000")),
+    overflow=os.getenv("AGENT_QUEUE_OVERFLOW", "drop_oldest"),
+)
 
 
 # -----------------------------------------------------------
-# SOCKET EVENTS
+# DURABLE SPOOL (event types only)
 # -----------------------------------------------------------
-@sio.event
-def connect():
-    logging.info(f"[🔌] Connected to backend Socket.IO at {SERVER_URL}")
+# Event entries are appended to an on-disk spool next to version.json so
+# they survive disconnects and restarts; flush_queue() replays it in order.
+# Snapshots stay in send_queue: a fresh one is collected after a restart.
+SPOOL_ENABLED = os.getenv("AGENT_SPOOL", "0") == "1"
+SPOOL_DRAIN_CHUNK = int(os.getenv("AGENT_SPOOL_DRAIN_CHUNK", "200"))
 
-    # ⭐ REGISTER AGENT WITH FINGERPRINT
+spool = None
+_spool_read_pos = None   # spool position of the newest entry already handed to an emit
+
+if SPOOL_ENABLED:
+    try:
+        spool = Spool(
+            os.path.join(get_data_dir(), "spool"),
+            segment_size=int(os.getenv("AGENT_SPOOL_SEGMENT_BYTES", str(4 * 1024 * 1024))),
+            max_segments=int(os.getenv("AGENT_SPOOL_MAX_SEGMENTS", "64")),
+        )
+    except Exception as e:
+        logging.error(f"[❌] Spool unavailable, using memory queue only: {e}")
+        spool = None
+    else:
+        atexit.register(spool.close)
+
+
+def get_queue_stats():
+    """Queue depth, high-water mark and per-type coalesce/drop counters."""
+    stats = send_queue.stats()
+    if spool:
+        stats["spool"] = spool.stats()
+    return stats
+
+# -----------------------------------------------------------
+# BATCHING (agent_data_batch)
+# -----------------------------------------------------------
+# When enabled, queued entries are combined into one "agent_data_batch"
+# emit instead of one "agent_data" frame each. A batch is flushed when it
+# reaches BATCH_MAX_ENTRIES, BATCH_MAX_BYTES or BATCH_MAX_AGE seconds.
+BATCH_ENABLED = os.getenv("AGENT_BATCH", "0") == "1"
+BATCH_MAX_ENTRIES = int(os.getenv("AGENT_BATCH_MAX_ENTRIES", "100"))
+BATCH_MAX_BYTES = int(os.getenv("AGENT_BATCH_MAX_BYTES", str(256 * 1024)))
+BATCH_MAX_AGE = float(os.getenv("AGENT_BATCH_MAX_AGE", "1.0"))
+
+_batch = []
+_batch_bytes = 0
+_batch_started = None
+_batch_spool_pos = None   # spool position of the newest spooled entry in _batch
+
+
+# -----------------------------------------------------------
+# SNAPSHOT DELTAS
+# -----------------------------------------------------------
+# Once the backend has acknowledged a snapshot of a type, later snapshots of
+# that type are sent as a structural diff against it (functions/delta.py).
+# A full snapshot is sent again every DELTA_RESYNC_INTERVAL seconds, after a
+# reconnect, or when the backend asks for it. Backends that never ack keep
+# receiving full snapshots.
+DELTA_ENABLED = os.getenv("AGENT_DELTA", "0") == "1"
+DELTA_TYPES = {"system_info", "installed_apps", "task_info"}
+DELTA_RESYNC_INTERVAL = float(os.getenv("AGENT_DELTA_RESYNC", "900"))
+
+_delta_acked = {}   # type -> {"seq", "data", "full_at"} last snapshot the backend holds
+_delta_sent = {}    # type -> (seq, data, full_at) last snapshot emitted
+_delta_lock = threading.Lock()
+_snapshot_reset_hooks = []
+
+# Per-process sequence numbers. (STREAM_ID, seq) increases monotonically
+# for this agent, also across restarts.
+STREAM_ID = int(time.time() * 1000)
+_seq = itertools.count(1)
+
+
+def _encode_entry(entry):
+    """
+    Returns the wire form of a queued entry. With acknowledged delivery every
+    entry carries "stream" and "seq"; snapshot types additionally get an
+    "encoding" of "full" or "delta". Otherwise entries are sent unchanged.
+    """
+    data_type = entry.get("type")
+    acked = _acks_active()
+    is_delta_type = DELTA_ENABLED and data_type in DELTA_TYPES
+    if not acked and not is_delta_type:
+        return entry
+
+    with _delta_lock:
+        seq = next(_seq)
+        wire = dict(entry, seq=seq)
+        if acked:
+            wire["stream"] = STREAM_ID
+        if not is_delta_type:
+            return wire
+        base = _delta_acked.get(data_type)
+        if base and time.time() - base["full_at"] < DELTA_RESYNC_INTERVAL:
+            wire["encoding"] = "delta"
+            wire["base"] = base["seq"]
+            wire["data"] = delta.make_patch(base["data"], entry["data"])
+            full_at = base["full_at"]
+        else:
+            wire["encoding"] = "full"
+            full_at = time.time()
+        _delta_sent[data_type] = (seq, entry["data"], full_at)
+    return wire
+
+
+def _ack_callback(wires):
+    """
+    Builds a Socket.IO ack callback for emitted wire entries, or None when
+    none of them needs an acknowledgement.
+    """
+    tracked = [(i, w["type"], w["seq"]) for i, w in enumerate(wires) if w.get("encoding")]
+    if not tracked:
+        return None
+
+    def on_ack(res=None, *args):
+        # agent_data acks with one result, agent_data_batch with one per entry
+        if isinstance(res, dict) and isinstance(res.get("results"), list):
+            results = res["results"]
+        else:
+            results = [res]
+        with _delta_lock:
+            for i, data_type, seq in tracked:
+                r = results[i] if i < len(results) else None
+                if not isinstance(r, dict) or r.get("resync"):
+                    _delta_acked.pop(data_type, None)
+                    continue
+                sent = _delta_sent.get(data_type)
+                if r.get("success") and sent and sent[0] == seq:
+                    _delta_acked[data_type] = {"seq": seq, "data": sent[1], "full_at": sent[2]}
+
+    return on_ack
+
+
+# -----------------------------------------------------------
+# PACKED (BINARY) PAYLOADS
+# -----------------------------------------------------------
+# Opt-in: data emits are serialized (msgpack if installed, else compact JSON),
+# zlib-compressed and sent as one binary "agent_packed" event
+# (functions/codec.py). Payloads under PACKED_MIN_COMPRESS bytes stay plain,
+# as does everything when the backend did not advertise support in
+# registration_status.
+PACKED_ENABLED = os.getenv("AGENT_PACKED", "0") == "1"
+PACKED_FORMAT = os.getenv("AGENT_PACKED_FORMAT", SUPPORTED_FORMATS[0])
+PACKED_MIN_COMPRESS = int(os.getenv("AGENT_PACKED_MIN_COMPRESS", "1024"))
+
+codec = PayloadCodec(PACKED_FORMAT, min_compress=PACKED_MIN_COMPRESS)
+BACKEND_CAPS = {}
+
+
+def _packed_format():
+    """Format to pack with, or None to emit plain."""
+    if not PACKED_ENABLED:
+        return None
+    offered = (BACKEND_CAPS.get("packed") or [])
+    for fmt in (codec.fmt, "json"):
+        if fmt in offered and fmt in SUPPORTED_FORMATS:
+            return fmt
+    return None
+
+
+async def _transport_room():
+    """Waits while the engine.io send queue is above SEND_HIGH_WATER."""
+    queue = getattr(sio.client.eio, "queue", None)
+    while queue is not None and queue.qsize() >= SEND_HIGH_WATER and sio.connected:
+        await asyncio.sleep(0.005)
+
+
+async def _emit(event, data, callback=None):
+    """Emit for data events, packing the payload when negotiated. Runs on the sender loop."""
+    fmt = _packed_format()
+    packed = codec.pack(event, data, fmt) if fmt else None
+    await _transport_room()
+    if packed:
+        await sio.client.emit("agent_packed", packed, callback=callback)
+    else:
+        await sio.client.emit(event, data, callback=callback)
+
+
+def get_codec_stats():
+    """Per-type serialized/wire bytes, compression ratio and encode CPU cost."""
+    return codec.stats()
+
+
+def reset_snapshot_deltas(types=None):
+    """Forces the next snapshot of the given types (default: all) to be sent in full."""
+    with _delta_lock:
+        for data_type in list(types or _delta_acked.keys()):
+            _delta_acked.pop(data_type, None)
+    for hook in _snapshot_reset_hooks:
+        try:
+            hook(types)
+        except Exception as e:
+            logging.error(f"[❌] Snapshot reset hook failed: {e}")
+
+
+def on_snapshot_reset(hook):
+    """
+    Registers hook(types) to run on every full-snapshot reset (reconnect or
+    backend snapshot_resync; types is None for all). For collectors that
+    keep their own change tracking; runs on the sender loop, keep it cheap.
+    """
+    _snapshot_reset_hooks.append(hook)
+    return hook
+
+
+# -----------------------------------------------------------
+# ACKNOWLEDGED DELIVERY
+# -----------------------------------------------------------
+# Opt-in, and only used when the backend advertises "ack" in its
+# registration_status capabilities. Data frames stay in a sliding in-flight
+# window (functions/delivery.py) until the backend's Socket.IO ack arrives;
+# emitting never waits for a round trip. Frames not acked within
+# ACK_TIMEOUT seconds, and everything in flight after a reconnect, are
+# retransmitted unchanged and deduplicated by the backend on (stream, seq).
+# Spooled entries are only released from the spool once acked.
+ACK_ENABLED = os.getenv("AGENT_ACK", "0") == "1"
+ACK_WINDOW = int(os.getenv("AGENT_ACK_WINDOW", "256"))
+ACK_TIMEOUT = float(os.getenv("AGENT_ACK_TIMEOUT", "15"))
+
+inflight = InflightWindow(max_entries=ACK_WINDOW, timeout=ACK_TIMEOUT)
+_window_room = asyncio.Event()   # set by ack callbacks on the sender loop
+
+
+def _acks_active():
+    return ACK_ENABLED and bool(BACKEND_CAPS.get("ack"))
+
+
+async def _wait_window():
+    """
+    Backpressure: waits until the in-flight window has room, retransmitting
+    timed-out frames meanwhile. Returns False if the connection dropped.
+    """
+    while _acks_active() and not inflight.has_room():
+        if not sio.connected:
+            return False
+        _window_room.clear()
+        try:
+            await asyncio.wait_for(_window_room.wait(), timeout=min(1.0, ACK_TIMEOUT))
+        except asyncio.TimeoutError:
+            await _retransmit_inflight()
+    return sio.connected
+
+
+def _frame_callback(frame_id, wires):
+    snapshot_ack = _ack_callback(wires)
+
+    def on_ack(res=None, *args):
+        if snapshot_ack:
+            snapshot_ack(res, *args)
+        for pos in inflight.ack(frame_id):
+            spool.ack(pos)
+        _window_room.set()
+
+    return on_ack
+
+
+async def _send_frame(event, payload, wires, spool_pos=None):
+    """
+    Emits one data frame carrying the given wire entries. Without acks the
+    frame counts as delivered once emitted; with acks it is held in the
+    in-flight window. Raises if the emit fails.
+    """
+    if not _acks_active():
+        await _emit(event, payload, callback=_ack_callback(wires))
+        if spool and spool_pos is not None:
+            spool.ack(spool_pos)
+        return
+
+    frame = inflight.add(event, payload, len(wires), spool_pos if spool else None)
+    frame["on_ack"] = _frame_callback(frame["id"], wires)
     try:
-        sio.emit("register_agent", {
+        await _emit(event, payload, callback=frame["on_ack"])
+    except Exception:
+        inflight.discard(frame["id"])
+        raise
+
+
+async def _retransmit_inflight(everything=False):
+    """
+    Re-emits timed-out frames (or all unacked frames, after a reconnect).
+    If the backend stopped offering acks, each frame is sent once more and
+    then treated as delivered.
+    """
+    if not sio.connected:
+        return
+    frames = inflight.due(everything)
+    for frame in frames:
+        try:
+            await _emit(frame["event"], frame["payload"], callback=frame["on_ack"])
+        except Exception as e:
+            logging.error(f"[❌] Failed to retransmit frame {frame['id']}: {e}")
+            return
+        if not _acks_active():
+            frame["on_ack"]()
+    if frames:
+        logging.warning(f"[🔁] Retransmitted {len(frames)} unacknowledged frame(s)")
+
+
+def get_delivery_stats():
+    """In-flight window usage, ack and retransmit counters."""
+    stats = inflight.stats()
+    stats["active"] = _acks_active()
+    return stats
+
+
+# -----------------------------------------------------------
+# SOCKET EVENTS
+# -----------------------------------------------------------
+async def _register_agent():
+    try:
+        loop = asyncio.get_running_loop()
+        fingerprint = await loop.run_in_executor(None, get_fingerprint)
+        await sio.client.emit("register_agent", {
             "agentId": AGENT_ID,
-            "fingerprint": FINGERPRINT,
-            "version": LOCAL_VERSION
+            "fingerprint": fingerprint,
+            "version": get_local_version()
         })
-        logging.info(f"[🆔] Registered agent: {AGENT_ID} (FP: {FINGERPRINT[:8]}...)")
+        logging.info(f"[🆔] Registered agent: {AGENT_ID} (FP: {fingerprint[:8]}...)")
     except Exception as e:
         logging.error(f"[❌] Failed to register agent: {e}")
 
+
+@sio.event
+async def connect():
+    logging.info(f"[🔌] Connected to backend Socket.IO at {SERVER_URL}")
+
+    # ⭐ REGISTER AGENT WITH FINGERPRINT
+    await _register_agent()
+
+    # The backend may have lost its snapshot bases while we were away
+    reset_snapshot_deltas()
+
+    # Acks for frames sent on the previous connection will never arrive
+    await _retransmit_inflight(everything=True)
+
+    stats = get_queue_stats()
+    if stats["depth"] or stats["dropped_total"]:
+        logging.info(f"[📦] Queue on connect: depth={stats['depth']} dropped={stats['dropped']}")
+
     flush_queue()
 
 
 @sio.event
 def disconnect():
     logging.warning("[⚠️] Disconnected from backend server.")
+    # BACKEND_CAPS is kept until the next registration_status so unacked
+    # frames stay in flight and are retransmitted after reconnecting
 
 
 @sio.event
@@ -106,6 +491,13 @@ def connect_error(data):
     logging.error(f"[❌] Socket connection error: {data}")
 
 
+@sio.on("snapshot_resync")
+def on_snapshot_resync(data=None):
+    types = (data or {}).get("types") if isinstance(data, dict) else None
+    logging.info(f"[🔄] Backend requested full snapshot resync: {types or 'all'}")
+    reset_snapshot_deltas(types)
+
+
 @sio.on("license_approved")
 def on_license_approved(data):
     logging.info(f"[🔓] {data.get('message')}")
@@ -120,10 +512,12 @@ def handle_registration_status(data):
     logging.info(f"[ℹ️] Registration status received: {data}")
     global IS_LICENSED
     IS_LICENSED = data.get("isLicensed", False)
+    # Swapped on the sender loop so a flush never sees a half-updated dict
+    sio.call_soon(_set_backend_caps, data.get("capabilities") or {})
     
     if IS_LICENSED:
         token = load_license_token()
-        valid, msg = verify_license_locally(token, FINGERPRINT)
+        valid, msg = verify_license_locally(token, get_fingerprint())
         if not valid:
             logging.warning(f"[🔑] License token invalid: {msg}. Requesting activation...")
             activate_license()
@@ -133,6 +527,11 @@ def handle_registration_status(data):
         logging.warning("[⚠️] Agent not licensed. Requesting activation...")
         activate_license()
 
+def _set_backend_caps(caps):
+    BACKEND_CAPS.clear()
+    BACKEND_CAPS.update(caps)
+
+
 def activate_license():
     def on_activation_response(res):
         global IS_LICENSED
@@ -145,7 +544,7 @@ def activate_license():
 
     sio.emit("license_activate", {
         "agentId": AGENT_ID,
-        "fingerprint": FINGERPRINT
+        "fingerprint": get_fingerprint()
     }, callback=on_activation_response)
 
 
@@ -156,10 +555,12 @@ def bootstrap_license():
     """
     Attempts to find the TENANT_KEY via hardware fingerprint or license.key file.
     """
+    import requests  # only needed when TENANT_KEY is missing
+
     try:
         # 1. Try Hardware Lookup first (Success if machine was already registered)
         logging.info("[🔍] Attempting zero-touch hardware identification...")
-        res = requests.post(f"{SERVER_URL}/api/license/verify-hardware", json={"fingerprint": FINGERPRINT}, timeout=10)
+        res = requests.post(f"{SERVER_URL}/api/license/verify-hardware", json={"fingerprint": get_fingerprint()}, timeout=10)
         if res.status_code == 200:
             data = res.json()
             if data.get("success"):
@@ -176,7 +577,7 @@ def bootstrap_license():
                     logging.info(f"[🔑] Found license.key! Bootstrapping...")
                     res = requests.post(f"{SERVER_URL}/api/license/bootstrap", json={
                         "licenseKey": license_key,
-                        "fingerprint": FINGERPRINT,
+                        "fingerprint": get_fingerprint(),
                         "agentId": AGENT_ID
                     }, timeout=10)
                     if res.status_code == 200:
@@ -243,18 +644,177 @@ def connect_socket():
 # -----------------------------------------------------------
 # QUEUE FLUSHING
 # -----------------------------------------------------------
-def flush_queue():
-    while not send_queue.empty() and sio.connected:
-        entry = send_queue.get()
+# All emitting happens in one flusher task on the sender loop. flush_queue()
+# and send_data() only wake it, so concurrent producers never flush twice.
+FLUSH_IDLE_INTERVAL = 2.0   # retry tick for failed emits when nothing wakes the flusher
+
+_wakeup = asyncio.Event()
+_force_flush = False
+
+
+def flush_queue(force=False):
+    """
+    Wakes the flusher; safe from any thread. `force` also emits a partially
+    filled batch right away.
+    """
+    global _force_flush
+    if force:
+        _force_flush = True
+    sio.call_soon(_wakeup.set)
+
+
+def _flush_timeout():
+    if BATCH_ENABLED and _batch:
+        return max(0.0, BATCH_MAX_AGE - (time.time() - _batch_started))
+    if _acks_active():
+        return min(FLUSH_IDLE_INTERVAL, ACK_TIMEOUT)
+    return FLUSH_IDLE_INTERVAL
+
+
+async def _flusher():
+    global _force_flush
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=_flush_timeout())
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        force, _force_flush = _force_flush, False
+        if not sio.connected:
+            continue
+        try:
+            if inflight.sent:
+                await _retransmit_inflight()
+            await _flush(force)
+        except Exception as e:
+            logging.error(f"[❌] Flush failed: {e}")
+
+
+async def _flush(force=False):
+    if BATCH_ENABLED:
+        await _flush_batched(force)
+        return
+
+    if spool:
+        await _drain_spool()
+
+    while not send_queue.empty() and await _wait_window():
+        entry = send_queue.get_nowait()
         try:
-            sio.emit("agent_data", entry)
+            wire = _encode_entry(entry)
+            await _send_frame("agent_data", wire, [wire])
             logging.info(f"[📡] Sent queued data: {entry['type']}")
         except Exception as e:
             logging.error(f"[❌] Failed to send queued data: {e}")
-            send_queue.put(entry)
+            send_queue.put_front(entry)
             break
 
 
+async def _drain_spool():
+    """
+    Replays spooled entries in order, a chunk at a time. Each entry is
+    released from the spool once delivered. Stops at the first failed emit.
+    """
+    global _spool_read_pos
+    while await _wait_window():
+        records = spool.read(SPOOL_DRAIN_CHUNK, start=_spool_read_pos)
+        if not records:
+            return
+        sent = 0
+        for pos, entry in records:
+            if not await _wait_window():
+                return
+            try:
+                wire = _encode_entry(entry)
+                await _send_frame("agent_data", wire, [wire], spool_pos=pos)
+            except Exception as e:
+                logging.error(f"[❌] Failed to send spooled data: {e}")
+                return
+            _spool_read_pos = pos
+            sent += 1
+        logging.info(f"[📡] Sent spooled data: {sent} entries")
+
+
+def _entry_size(entry):
+    try:
+        return len(json.dumps(entry, default=str))
+    except Exception:
+        return 0
+
+
+async def _emit_batch():
+    """
+    Emits the pending batch.
+    On failure the batch is kept so the next flush retries it in order.
+    """
+    global _batch, _batch_bytes, _batch_started, _batch_spool_pos
+    if not _batch:
+        return True
+    try:
+        await _send_frame("agent_data_batch", {
+            "agentId": AGENT_ID,
+            "count": len(_batch),
+            "entries": _batch,
+        }, _batch, spool_pos=_batch_spool_pos)
+        logging.info(f"[📡] Sent batch: {len(_batch)} entries, {_batch_bytes} bytes")
+    except Exception as e:
+        logging.error(f"[❌] Failed to send batch: {e}")
+        return False
+    _batch_spool_pos = None
+    _batch = []
+    _batch_bytes = 0
+    _batch_started = None
+    return True
+
+
+async def _add_to_batch(entry, spool_pos=None):
+    """
+    Appends an entry to the pending batch, emitting the batch as the limits
+    require. Returns False if the entry could not be added because an emit
+    failed.
+    """
+    global _batch_bytes, _batch_started, _batch_spool_pos, _spool_read_pos
+    wire = _encode_entry(entry)
+    size = _entry_size(wire)
+
+    # Never let a single append push the batch over the byte limit
+    if _batch and _batch_bytes + size > BATCH_MAX_BYTES:
+        if not await _emit_batch():
+            return False
+
+    if not _batch:
+        _batch_started = time.time()
+    _batch.append(wire)
+    _batch_bytes += size
+    if spool_pos is not None:
+        _batch_spool_pos = _spool_read_pos = spool_pos
+
+    if len(_batch) >= BATCH_MAX_ENTRIES or _batch_bytes >= BATCH_MAX_BYTES:
+        await _emit_batch()
+    return True
+
+
+async def _flush_batched(force=False):
+    # Spooled entries first so replay keeps the original order
+    while spool and await _wait_window():
+        records = spool.read(BATCH_MAX_ENTRIES, start=_spool_read_pos)
+        if not records:
+            break
+        for pos, entry in records:
+            if not await _wait_window() or not await _add_to_batch(entry, pos):
+                return
+
+    while not send_queue.empty() and await _wait_window():
+        entry = send_queue.get_nowait()
+        if not await _add_to_batch(entry):
+            send_queue.put_front(entry)
+            return
+
+    if _batch and sio.connected:
+        if force or time.time() - _batch_started >= BATCH_MAX_AGE:
+            await _emit_batch()
+
+
 # -----------------------------------------------------------
 # SEND AGENT DATA
 # -----------------------------------------------------------
@@ -271,7 +831,11 @@ def send_data(data_type, payload):
             "data": payload,
         }
 
-        send_queue.put(entry)
+        if spool and data_type not in SNAPSHOT_TYPES:
+            spool.append(entry)
+        elif not send_queue.put(entry):
+            logging.warning(f"[⚠️] Queue full, dropped {data_type}")
+            return
 
         if sio.connected:
             flush_queue()
@@ -283,17 +847,14 @@ def send_data(data_type, payload):
 
 
 # -----------------------------------------------------------
-# BACKGROUND QUEUE WORKER
+# SENDER LOOP
 # -----------------------------------------------------------
-def start_queue_worker():
-    def worker():
-        while True:
-            if sio.connected:
-                flush_queue()
-            time.sleep(2)
-
-    threading.Thread(target=worker, daemon=True).start()
+def start_sender_loop():
+    sio.submit(_flusher())
+    # Have the fingerprint ready (cached or computed) by the time we register
+    threading.Thread(target=get_fingerprint, name="fingerprint", daemon=True).start()
 
 
-start_queue_worker()
-connect_socket()
+# Connecting is left to the caller (main.py's socket thread) so importing
+# this module never blocks on the network.
+start_sender_loop()
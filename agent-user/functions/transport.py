@@ -0,0 +1,126 @@
+# functions/transport.py
+import asyncio
+import functools
+import logging
+import threading
+
+
+class AsyncTransport:
+    """
+    socketio.AsyncClient running on one private asyncio event loop thread.
+
+    Exposes the blocking, thread-safe surface the rest of the agent already
+    uses on a socketio.Client (connected, connect, emit, call, on/event,
+    wait, disconnect), so callers on any thread keep working unchanged.
+
+    Coroutine handlers run on the loop. Plain function handlers run in the
+    loop's default executor so a slow handler (USB checks, vuln scans)
+    cannot stall the socket; Socket.IO ack callbacks run on the loop and
+    must stay cheap.
+
+    socketio (with aiohttp and engineio) is most of the agent's import time,
+    so it is imported on the loop thread; handlers registered before the
+    client exists are attached once it does.
+    """
+
+    def __init__(self, name="agent-sender", **client_kwargs):
+        self._client_kwargs = client_kwargs
+        self._client = None
+        self._handlers = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            import socketio
+            client = socketio.AsyncClient(**self._client_kwargs)
+            with self._lock:
+                for event, handler in self._handlers:
+                    client.on(event, handler)
+                self._client = client
+        except Exception as e:
+            logging.error(f"[❌] Socket.IO client unavailable: {e}")
+        finally:
+            self._ready.set()
+        self.loop.run_forever()
+
+    @property
+    def client(self):
+        """The socketio.AsyncClient; waits for the loop thread to create it."""
+        self._ready.wait()
+        if self._client is None:
+            raise RuntimeError("Socket.IO client unavailable")
+        return self._client
+
+    # -------------------------------------------------------
+    # Loop helpers
+    # -------------------------------------------------------
+    def in_loop(self) -> bool:
+        return threading.get_ident() == self._thread.ident
+
+    def call_soon(self, fn, *args):
+        """Schedules fn(*args) on the loop; safe from any thread."""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def submit(self, coro):
+        """Schedules a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Runs a coroutine on the loop and blocks for its result (not from the loop thread)."""
+        if self.in_loop():
+            raise RuntimeError("AsyncTransport.run() called from the event loop thread")
+        return self.submit(coro).result(timeout)
+
+    # -------------------------------------------------------
+    # socketio.Client-compatible surface
+    # -------------------------------------------------------
+    @property
+    def connected(self) -> bool:
+        return self._client is not None and self._client.connected
+
+    def on(self, event, handler=None):
+        def register(fn):
+            if not asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def offloaded(*args):
+                    return await self.loop.run_in_executor(None, functools.partial(fn, *args))
+                target = offloaded
+            else:
+                target = fn
+            with self._lock:
+                if self._client is None:
+                    self._handlers.append((event, target))
+                else:
+                    self._client.on(event, target)
+            return fn
+
+        if handler is None:
+            return register
+        return register(handler)
+
+    def event(self, handler):
+        return self.on(handler.__name__, handler)
+
+    def connect(self, url, **kwargs):
+        return self.run(self.client.connect(url, **kwargs))
+
+    def disconnect(self):
+        return self.run(self.client.disconnect())
+
+    def emit(self, event, data=None, callback=None):
+        if self.in_loop():
+            self.loop.create_task(self.client.emit(event, data, callback=callback))
+            return None
+        return self.run(self.client.emit(event, data, callback=callback))
+
+    def call(self, event, data=None, timeout=60):
+        return self.run(self.client.call(event, data, timeout=timeout))
+
+    def wait(self):
+        """Blocks until the connection ends and no reconnection is pending."""
+        return self.run(self.client.wait())
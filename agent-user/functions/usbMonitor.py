@@ -1,6 +1,5 @@
 import ctypes
 from ctypes import wintypes
-import wmi
 import subprocess
 import time
 import logging
@@ -111,6 +110,7 @@ def eject_usb_device(usb):
 def list_usb_drives():
     out = []
     try:
+        import wmi  # COM/WMI bindings are slow to load; only the USB thread needs them
         c = wmi.WMI()
 
         for disk in c.Win32_DiskDrive(InterfaceType="USB"):
@@ -3,7 +3,6 @@ import traceback
 import threading
 import subprocess
 import shutil
-import pythoncom
 import json
 import os
 import sys
@@ -13,6 +12,7 @@ from functions.system import get_system_info
 from functions.taskmanager import collect_process_info
 from functions.installed_apps import get_installed_apps
 from functions.sender import send_data
+from functions.scheduler import CollectorScheduler, interval_from_env
 from functions.usbMonitor import monitor_usb, connect_socket, sio
 from functions.fileMonitor import start_file_monitor
 from dotenv import load_dotenv
@@ -45,6 +45,8 @@ def resource_path(relative_path):
 # USB MONITOR THREAD
 # ============================
 def start_usb_monitor():
+    import pythoncom  # loaded on the USB thread, off the startup path
+
     try:
         pythoncom.CoInitialize()
     except:
@@ -97,31 +99,41 @@ def start_socket():
 # ============================
 # MAIN SYSTEM SCANS
 # ============================
-def run_scans():
-    try:
-        # 1. System Info
-        sysinfo = get_system_info()
-        send_data("system_info", sysinfo)
+def collect_installed_apps():
+    apps = get_installed_apps()
+    return {
+        "apps": apps,
+        "count": len(apps)
+    }
 
-        # 2. Task Info
-        send_data("task_info", collect_process_info())
 
-        # 3. Installed Apps
-        apps = get_installed_apps()
-        send_data("installed_apps", {
-            "apps": apps,
-            "count": len(apps)
-        })
+def build_scheduler(is_licensed):
+    """
+    Each collector runs on its own interval (override with
+    AGENT_INTERVAL_<NAME>) on a small worker pool; a collector that misses
+    its timeout is skipped for that cycle. The backend can request immediate
+    runs with a "run_collectors" event: {"collectors": ["task_info", ...]}
+    or {} for all.
+    """
+    scheduler = CollectorScheduler(send_data, enabled=is_licensed,
+                                   max_workers=int(os.getenv("AGENT_COLLECTOR_WORKERS", "3")))
+    scheduler.add("system_info", get_system_info, interval_from_env("system_info", 30), timeout=10)
+    scheduler.add("task_info", collect_process_info, interval_from_env("task_info", 30), timeout=10)
+    scheduler.add("installed_apps", collect_installed_apps,
+                  interval_from_env("installed_apps", 900), timeout=60)
 
-    except Exception as e:
-        pass
+    @sio.on("run_collectors")
+    def handle_run_collectors(data=None):
+        names = data.get("collectors") if isinstance(data, dict) else None
+        scheduler.run_now(names)
+
+    return scheduler
 
 
 # ============================
 # UPDATE CHECKER
 # ============================
 import hashlib
-import requests
 
 def calculate_hash(file_path):
     sha256_hash = hashlib.sha256()
@@ -135,6 +147,8 @@ def check_for_updates():
     """
     Checks for updates every 60 minutes.
     """
+    import requests
+
     while True:
         try:
             time.sleep(60) # Wait 60s before first check, then every hour? Or just loop. 
@@ -281,12 +295,7 @@ if __name__ == "__main__":
     # update checker
     threading.Thread(target=check_for_updates, daemon=True).start()
 
-    # main loop
+    # main loop: per-collector schedule, idle until licensed
     import functions.sender as sender
-    while True:
-        if sender.IS_LICENSED:
-            run_scans()
-        else:
-            # Wait for licensing...
-            pass
-        time.sleep(30) # Scans every 30s instead of loop-hammering
+    scheduler = build_scheduler(lambda: sender.IS_LICENSED)
+    scheduler.run_forever()
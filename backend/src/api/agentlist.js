@@ -2,6 +2,7 @@ import express from "express";
 import Agent from "../models/Agent.js";
 import Dashboard from "../models/Dashboard.js";
 import { authMiddleware } from "../middleware/authMiddleware.js";
+import { getIO } from "../socket-nvs.js";
 
 const router = express.Router();
 
@@ -37,4 +38,65 @@ router.get("/", authMiddleware, async (req, res) => {
   }
 });
 
+/**
+ * POST /api/agents/:agentId/collect
+ * Asks a connected agent to run collectors now instead of waiting for
+ * their next interval. Body: { collectors: ["task_info", ...] } (omit for all).
+ */
+router.post("/:agentId/collect", authMiddleware, async (req, res) => {
+  try {
+    const { agentId } = req.params;
+    const agent = await Agent.findOne({ agentId, tenantId: req.user.tenantId }).lean();
+    if (!agent) {
+      return res.status(404).json({ error: "Agent not found" });
+    }
+
+    const socketId = global.ACTIVE_AGENTS?.[agentId];
+    if (!socketId) {
+      return res.status(409).json({ error: "Agent not connected" });
+    }
+
+    const collectors = Array.isArray(req.body?.collectors) ? req.body.collectors : undefined;
+    getIO().to(socketId).emit("run_collectors", { collectors });
+    res.status(202).json({ ok: true, agentId, collectors: collectors || "all" });
+  } catch (err) {
+    console.error("Error triggering collectors:", err);
+    res.status(500).json({ error: "Internal server error" });
+  }
+});
+
+const SCANNER_COMMANDS = new Set(["rescan", "pause", "resume", "config"]);
+
+/**
+ * POST /api/agents/:agentId/scanner
+ * Sends a control message to the agent's network scanner.
+ * Body: { cmd: "rescan" | "pause" | "resume" | "config", values: { CYCLE_INTERVAL: 5, ... } }
+ */
+router.post("/:agentId/scanner", authMiddleware, async (req, res) => {
+  try {
+    const { agentId } = req.params;
+    const { cmd, values } = req.body || {};
+    if (!SCANNER_COMMANDS.has(cmd)) {
+      return res.status(400).json({ error: "Unknown scanner command" });
+    }
+
+    const agent = await Agent.findOne({ agentId, tenantId: req.user.tenantId }).lean();
+    if (!agent) {
+      return res.status(404).json({ error: "Agent not found" });
+    }
+
+    const socketId = global.ACTIVE_AGENTS?.[agentId];
+    if (!socketId) {
+      return res.status(409).json({ error: "Agent not connected" });
+    }
+
+    const message = cmd === "config" ? { cmd, values: values || {} } : { cmd };
+    getIO().to(socketId).emit("scanner_control", message);
+    res.status(202).json({ ok: true, agentId, cmd });
+  } catch (err) {
+    console.error("Error sending scanner control:", err);
+    res.status(500).json({ error: "Internal server error" });
+  }
+});
+
 export default router;
@@ -31,6 +31,16 @@ const portScanSchema = new mongoose.Schema(
       target: String,
       open_ports: [Number],
       scanned_range: String,
+      source: String,
+      listeners: [
+        {
+          port: Number,
+          address: String,
+          family: Number,
+          pid: Number,
+          process: String,
+        },
+      ],
     },
   },
   { timestamps: true }
@@ -34,6 +34,8 @@ const visualizerDataSchema = new mongoose.Schema(
       default: "Unknown",
     },
 
+    deviceType: { type: String, default: null },
+
     noAgent: {
       type: Boolean,
       default: false,
@@ -22,6 +22,14 @@ const scannerDeviceSchema = new mongoose.Schema(
     vendor: { type: String, default: null },
     ping_only: { type: Boolean, default: true },
 
+    // Interface / subnet the scanner found the device on (multi-subnet scans)
+    iface: { type: String, default: null },
+    cidr: { type: String, default: null },
+
+    // Heard passively by the scanner (mDNS / SSDP / NetBIOS)
+    hostname: { type: String, default: null },
+    device_type: { type: String, default: null },
+
     lastSeen: { type: Date, default: Date.now },
   },
   { timestamps: true }
@@ -39,6 +39,46 @@ async function resolveAgent(payload) {
   return agent;
 }
 
+// =====================================================
+// 🔌 PORT CHANGE EVENTS
+// =====================================================
+// Patches the stored port_scan snapshot with one port_opened/port_closed
+// event. Events without an address come from the connect-scan mode and
+// only touch open_ports.
+async function applyPortEvent(tenantId, agentId, type, data, timestamp) {
+  const filter = { tenantId, agentId };
+  const port = Number(data.port);
+  const listener = data.address !== undefined
+    ? { port, address: data.address, family: data.family }
+    : null;
+
+  if (listener) {
+    await PortScanData.updateOne(filter, { $pull: { "data.listeners": listener } });
+  }
+
+  if (type === "port_opened") {
+    const update = {
+      $set: { tenantId, agentId, timestamp, type: "port_scan" },
+      $addToSet: { "data.open_ports": port },
+    };
+    if (listener) {
+      update.$push = { "data.listeners": { ...listener, pid: data.pid, process: data.process } };
+    }
+    await PortScanData.updateOne(filter, update, { upsert: true });
+    return;
+  }
+
+  const doc = await PortScanData.findOneAndUpdate(
+    filter,
+    { $set: { timestamp } },
+    { new: true }
+  );
+  const stillOpen = doc?.data?.listeners?.some((l) => l.port === port);
+  if (!stillOpen) {
+    await PortScanData.updateOne(filter, { $pull: { "data.open_ports": port } });
+  }
+}
+
 // =====================================================
 // ⭐ SAVE AGENT DATA (TENANT ENFORCED)
 // =====================================================
@@ -122,6 +162,12 @@ export async function saveAgentData(payload, tenantId) {
     // 4️⃣ USB handled elsewhere
     if (type === "usb_devices") return;
 
+    // Listener changes between full port_scan snapshots
+    if (type === "port_opened" || type === "port_closed") {
+      await applyPortEvent(finalTenantId, agentId, type, data, timestamp);
+      return;
+    }
+
     // 4️⃣ Resolve model
     let Model;
     switch (type) {
@@ -193,6 +239,10 @@ export async function saveNetworkScan(devicesList, tenantId) {
             mac: dev.mac || null,
             vendor: dev.vendor || null,
             ping_only: dev.ping_only ?? true,
+            iface: dev.iface || null,
+            cidr: dev.cidr || null,
+            hostname: dev.hostname || null,
+            device_type: dev.device_type || null,
             lastSeen: new Date(),
           },
         },
@@ -204,6 +254,56 @@ export async function saveNetworkScan(devicesList, tenantId) {
   }
 }
 
+// =====================================================
+// ⭐ NETWORK SCAN CHANGES (SCANNER EVENTS MODE)
+// =====================================================
+// device_up / mac_changed / device_updated upsert the device, device_down removes it (as a
+// full scan that no longer lists it would). Full lists still arrive through
+// saveNetworkScan as periodic checkpoints.
+export async function applyNetworkScanDelta(events, tenantId) {
+  try {
+    if (!Array.isArray(events) || !tenantId) return;
+
+    for (const ev of events) {
+      const ip = ev?.ip?.trim();
+      if (!ip) continue;
+
+      if (ev.event === "device_down") {
+        await VisualizerScanner.deleteOne({ tenantId, ip });
+        continue;
+      }
+
+      if (
+        ev.event !== "device_up" &&
+        ev.event !== "mac_changed" &&
+        ev.event !== "device_updated"
+      )
+        continue;
+
+      await VisualizerScanner.findOneAndUpdate(
+        { tenantId, ip },
+        {
+          $set: {
+            tenantId,
+            ip,
+            mac: ev.mac || null,
+            vendor: ev.vendor || null,
+            ping_only: ev.ping_only ?? true,
+            iface: ev.iface || null,
+            cidr: ev.cidr || null,
+            hostname: ev.hostname || null,
+            device_type: ev.device_type || null,
+            lastSeen: new Date(),
+          },
+        },
+        { upsert: true }
+      );
+    }
+  } catch (err) {
+    console.error("❌ applyNetworkScanDelta failed:", err);
+  }
+}
+
 // =====================================================
 // ⭐ VULNERABILITY SCAN (TENANT SAFE)
 // =====================================================
@@ -15,6 +15,7 @@ import { connectMongo } from "./db.js";
 import {
   saveAgentData,
   saveNetworkScan,
+  applyNetworkScanDelta,
   saveVulnerabilityScan,
 } from "./save.js";
 
@@ -24,6 +25,8 @@ import { seedUsers } from "./seed.js";
 import * as GetData from "./get.js";
 import { checkUsbStatus } from "./controllers/usbhandler.js";
 import { activateLicense } from "./utils/licenseManager.js";
+import { applyPatch, isEmptyPatch } from "./utils/snapshotDelta.js";
+import { PACKED_FORMATS, unpackPayload } from "./utils/packedPayload.js";
 
 import usbRoutes from "./api/usb.js";
 import visualizerDataRoute from "./api/visualizerData.js";
@@ -124,6 +127,10 @@ const logPath = path.join(process.cwd(), "agent_data_log.json");
 
 global.ACTIVE_AGENTS = {};
 global.ACTIVE_TENANTS = new Set(); // Track active tenants for visualizer updates
+global.SNAPSHOT_CACHE = new Map(); // "tenant:agent:type" -> { seq, data } for delta-encoded snapshots
+global.DELIVERY_SEEN = new Map(); // "tenant:agent" -> { stream, seqs } recently processed acked entries
+
+const DELIVERY_SEEN_MAX = 4096; // seqs remembered per agent for duplicate detection
 
 // -----------------------------------------------------
 // SOCKET EVENTS
@@ -233,7 +240,8 @@ io.on("connection", (socket) => {
     // If using the new licensing model, inform agent of status
     socket.emit("registration_status", {
       isLicensed: agent.isLicensed,
-      fingerprintMatched: agent.fingerprint === fingerprint
+      fingerprintMatched: agent.fingerprint === fingerprint,
+      capabilities: { packed: PACKED_FORMATS, ack: true },
     });
   });
 
@@ -258,15 +266,24 @@ io.on("connection", (socket) => {
   // -------------------------------
   // RAW NETWORK SCAN (TENANT SCOPED)
   // -------------------------------
-  socket.on("network_scan_raw", async (devicesList) => {
+  const handleNetworkScan = async (devicesList) => {
     if (!socket.tenantId) return;
     await saveNetworkScan(devicesList, socket.tenantId);
-  });
+  };
 
-  socket.on("network_vulnscan_raw", async (scanObject) => {
+  const handleNetworkScanDelta = async (events) => {
+    if (!socket.tenantId) return;
+    await applyNetworkScanDelta(events, socket.tenantId);
+  };
+
+  const handleVulnScan = async (scanObject) => {
     if (!socket.tenantId) return;
     await saveVulnerabilityScan(scanObject, socket.tenantId);
-  });
+  };
+
+  socket.on("network_scan_raw", handleNetworkScan);
+  socket.on("network_scan_delta", handleNetworkScanDelta);
+  socket.on("network_vulnscan_raw", handleVulnScan);
 
   // -----------------------------------------------------
   // ⭐ FRONTEND GET_DATA — TENANT AWARE (STEP 6G)
@@ -304,15 +321,65 @@ io.on("connection", (socket) => {
   // -------------------------------
   // AGENT DATA
   // -------------------------------
-  socket.on("agent_data", async (payload) => {
+  // Returns a result object; it is also the Socket.IO ack when the agent asked for one.
+  // Entries carrying (stream, seq) may be retransmitted; repeats are acked without reprocessing.
+  const handleAgentData = async (payload) => {
+    if (!payload?.type || !payload?.data || !payload?.agentId) {
+      return { success: false, message: "Invalid payload" };
+    }
+
+    let seen = null;
+    if (payload.stream && payload.seq) {
+      const deliveryKey = `${socket.tenantId}:${payload.agentId}`;
+      seen = global.DELIVERY_SEEN.get(deliveryKey);
+      if (!seen || seen.stream !== payload.stream) {
+        // New agent process: its sequence numbers start over
+        seen = { stream: payload.stream, seqs: new Set() };
+        global.DELIVERY_SEEN.set(deliveryKey, seen);
+      }
+      if (seen.seqs.has(payload.seq)) {
+        return { success: true, duplicate: true, seq: payload.seq };
+      }
+      seen.seqs.add(payload.seq);
+      if (seen.seqs.size > DELIVERY_SEEN_MAX) {
+        seen.seqs.delete(seen.seqs.values().next().value);
+      }
+    }
+
+    const result = await processAgentData(payload);
+    // Only successfully processed entries count as seen; a retransmit of a
+    // failed one (or one that needs a resync) is handled again
+    if (seen && !result.success) {
+      seen.seqs.delete(payload.seq);
+    }
+    return result;
+  };
+
+  const processAgentData = async (payload) => {
     try {
-      if (!payload?.type || !payload?.data || !payload?.agentId) return;
 
       global.ACTIVE_AGENTS[payload.agentId] = socket.id;
       payload.ip = ip;
       // Inject tenantId for verification
       payload.tenantId = socket.tenantId;
 
+      // ⭐ SNAPSHOT DELTAS: rebuild the full snapshot from the cached base
+      let snapshotKey = null;
+      let unchanged = false;
+      if (payload.encoding) {
+        snapshotKey = `${socket.tenantId}:${payload.agentId}:${payload.type}`;
+        if (payload.encoding === "delta") {
+          const base = global.SNAPSHOT_CACHE.get(snapshotKey);
+          if (!base || base.seq !== payload.base) {
+            return { success: false, resync: true, type: payload.type };
+          }
+          unchanged = isEmptyPatch(payload.data);
+          payload.data = applyPatch(base.data, payload.data);
+        }
+        delete payload.encoding;
+        delete payload.base;
+      }
+
       try {
         const logs = fs.existsSync(logPath)
           ? JSON.parse(fs.readFileSync(logPath, "utf8"))
@@ -332,38 +399,108 @@ io.on("connection", (socket) => {
         // Let's rely on the return value or modify checking.
 
         socket.emit("usb_validation", { devices: status });
-        return;
+        return { success: true };
       }
 
       // 🔐 TENANT & LICENSE ENFORCEMENT
       const tenant = await Tenant.findById(socket.tenantId);
       if (!tenant || !tenant.isActive) {
         console.warn(`[DENIED] Blocked data from inactive tenant: ${socket.tenantId}`);
-        return socket.emit("agent_response", {
+        const denied = {
           success: false,
           message: "Tenant membership deactivated. Operation canceled.",
-        });
+        };
+        socket.emit("agent_response", denied);
+        return denied;
       }
 
       const agent = await Agent.findOne({ agentId: payload.agentId, tenantId: socket.tenantId });
       if (!agent || !agent.isLicensed) {
         console.warn(`[DENIED] Data from unlicensed/revoked agent: ${payload.agentId} (Tenant: ${socket.tenantId})`);
-        return socket.emit("agent_response", {
+        const denied = {
           success: false,
           message: "Agent license revoked or not found. Please reactivate.",
           code: "LICENSE_REVOKED"
-        });
+        };
+        socket.emit("agent_response", denied);
+        return denied;
       }
 
-      await saveAgentData(payload, socket.tenantId);
+      // Unchanged snapshots skip the database write entirely
+      if (!unchanged) {
+        await saveAgentData(payload, socket.tenantId);
+      }
+      if (snapshotKey) {
+        global.SNAPSHOT_CACHE.set(snapshotKey, { seq: payload.seq, data: payload.data });
+      }
 
       socket.emit("agent_response", {
         success: true,
         message: `${payload.type} saved`,
       });
+      return { success: true, seq: payload.seq };
     } catch (err) {
       console.error("❌ agent_data error:", err);
+      return { success: false, message: "Failed to save agent data" };
+    }
+  };
+
+  socket.on("agent_data", async (payload, ack) => {
+    const result = await handleAgentData(payload);
+    if (typeof ack === "function") ack(result);
+  });
+
+  // -------------------------------
+  // AGENT DATA (BATCHED)
+  // -------------------------------
+  // Entries are processed in order so per-agent event ordering is kept.
+  const handleAgentBatch = async (batch) => {
+    const entries = Array.isArray(batch?.entries) ? batch.entries : [];
+    const results = [];
+    for (const entry of entries) {
+      results.push(await handleAgentData(entry));
     }
+    return { success: true, results };
+  };
+
+  socket.on("agent_data_batch", async (batch, ack) => {
+    const result = await handleAgentBatch(batch);
+    if (typeof ack === "function") ack(result);
+  });
+
+  // -------------------------------
+  // PACKED (BINARY) AGENT PAYLOADS
+  // -------------------------------
+  // Compressed/msgpack wrapper around the events above, negotiated through
+  // registration_status capabilities.
+  socket.on("agent_packed", async (packed, ack) => {
+    let result;
+    try {
+      const data = unpackPayload(packed);
+      switch (packed.event) {
+        case "agent_data":
+          result = await handleAgentData(data);
+          break;
+        case "agent_data_batch":
+          result = await handleAgentBatch(data);
+          break;
+        case "network_scan_raw":
+          await handleNetworkScan(data);
+          break;
+        case "network_scan_delta":
+          await handleNetworkScanDelta(data);
+          break;
+        case "network_vulnscan_raw":
+          await handleVulnScan(data);
+          break;
+        default:
+          result = { success: false, message: `Unknown packed event: ${packed.event}` };
+      }
+    } catch (err) {
+      console.error("❌ agent_packed error:", err.message);
+      result = { success: false, message: "Failed to decode packed payload" };
+    }
+    if (typeof ack === "function") ack(result);
   });
 
   // -------------------------------
@@ -373,6 +510,10 @@ io.on("connection", (socket) => {
     for (const [agentId, sid] of Object.entries(global.ACTIVE_AGENTS)) {
       if (sid === socket.id) {
         delete global.ACTIVE_AGENTS[agentId];
+        // Agents resend full snapshots after reconnecting
+        for (const key of global.SNAPSHOT_CACHE.keys()) {
+          if (key.startsWith(`${socket.tenantId}:${agentId}:`)) global.SNAPSHOT_CACHE.delete(key);
+        }
         await Agent.findOneAndUpdate(
           { agentId },
           { $set: { status: "offline", lastSeen: new Date() } }
@@ -0,0 +1,26 @@
+// utils/packedPayload.js
+// Decodes "agent_packed" emits (agent functions/codec.py):
+//   { event, fmt: "json" | "msgpack", z: boolean, body: Buffer }
+import zlib from "zlib";
+
+// msgpack is optional; agents fall back to JSON when it is not advertised
+let msgpackDecode = null;
+try {
+  ({ decode: msgpackDecode } = await import("@msgpack/msgpack"));
+} catch { }
+
+export const PACKED_FORMATS = msgpackDecode ? ["json", "msgpack"] : ["json"];
+
+export function unpackPayload(packed) {
+  if (!packed?.event || !packed?.body) {
+    throw new Error("Invalid packed payload");
+  }
+  let body = Buffer.from(packed.body);
+  if (packed.z) body = zlib.inflateSync(body);
+
+  if (packed.fmt === "msgpack") {
+    if (!msgpackDecode) throw new Error("msgpack not supported");
+    return msgpackDecode(body);
+  }
+  return JSON.parse(body.toString("utf8"));
+}
@@ -0,0 +1,48 @@
+// utils/snapshotDelta.js
+// Applies structural snapshot patches sent by agents (agent functions/delta.py).
+//
+// Patch nodes:
+//   { op: "none" }                                   (top level: nothing changed)
+//   { op: "replace", value }
+//   { op: "dict", added: {k: v}, removed: [k], changed: {k: node} }
+//   { op: "list", key, added: [item], removed: [id], changed: [{ id, patch }] }
+
+export function isEmptyPatch(patch) {
+  return !patch || patch.op === "none";
+}
+
+export function applyPatch(old, patch) {
+  if (isEmptyPatch(patch)) return old;
+
+  switch (patch.op) {
+    case "replace":
+      return patch.value;
+
+    case "dict": {
+      const out = { ...(old || {}) };
+      for (const k of patch.removed || []) delete out[k];
+      for (const [k, sub] of Object.entries(patch.changed || {})) {
+        out[k] = applyPatch(out[k], sub);
+      }
+      return Object.assign(out, patch.added || {});
+    }
+
+    case "list": {
+      const key = patch.key;
+      const removed = new Set((patch.removed || []).map((id) => JSON.stringify(id)));
+      const changed = new Map(
+        (patch.changed || []).map((c) => [JSON.stringify(c.id), c.patch])
+      );
+      const out = [];
+      for (const item of old || []) {
+        const id = JSON.stringify(item?.[key]);
+        if (removed.has(id)) continue;
+        out.push(changed.has(id) ? applyPatch(item, changed.get(id)) : item);
+      }
+      return out.concat(patch.added || []);
+    }
+
+    default:
+      throw new Error(`Unknown patch op: ${patch.op}`);
+  }
+}
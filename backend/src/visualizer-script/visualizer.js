@@ -75,7 +75,8 @@ export async function runVisualizerUpdate(tenantId) {
         ip,
         mac: dev.mac || "Unknown",
         vendor: dev.vendor || "Unknown",
-        hostname: hasAgent ? ipToHostname.get(ip) : "Unknown",
+        hostname: hasAgent ? ipToHostname.get(ip) : dev.hostname || "Unknown",
+        deviceType: dev.device_type || null,
         noAgent: !hasAgent,
       };
     });
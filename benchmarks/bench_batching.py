@@ -0,0 +1,108 @@
+"""
+Frames/bytes benchmark for batched agent_data emission.
+
+Points the agent sender at an in-process stand-in receiver, pushes a burst
+of small app_usage events through send_data() and reports frames, bytes and
+frames/sec with batching off and on.
+
+    python benchmarks/bench_batching.py --agent agent-user --events 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from standin_receiver import StandinReceiver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _event(i):
+    return {
+        "eventType": "OPEN",
+        "appName": f"proc{i % 50}.exe",
+        "pid": 1000 + i,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "title": "",
+    }
+
+
+def run(sender, receiver, batched, events, counter):
+    sender.BATCH_ENABLED = batched
+    receiver.reset()
+    counter["n"] = 0
+
+    t0 = time.time()
+    for i in range(events):
+        sender.send_data("app_usage", _event(i))
+    sender.flush_queue(force=True)
+
+    deadline = time.time() + 30
+    while counter["n"] < events and time.time() < deadline:
+        time.sleep(0.01)
+    elapsed = time.time() - t0
+
+    rep = receiver.report(elapsed)
+    rep["entries"] = counter["n"]
+    rep["elapsed_s"] = round(elapsed, 3)
+    return rep
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-user", choices=["agent-user", "agent-admin"])
+    ap.add_argument("--events", type=int, default=2000)
+    args = ap.parse_args()
+
+    logging.disable(logging.INFO)
+
+    receiver = StandinReceiver().start()
+    counter = {"n": 0}
+    lock = threading.Lock()
+
+    def on_single(data):
+        with lock:
+            counter["n"] += 1
+
+    def on_batch(data):
+        with lock:
+            counter["n"] += len((data or {}).get("entries", []))
+
+    receiver.on("agent_data", on_single)
+    receiver.on("agent_data_batch", on_batch)
+
+    os.environ["SERVER_URL"] = receiver.url
+    os.environ.setdefault("TENANT_KEY", "bench")
+    sys.path.insert(0, os.path.join(ROOT, args.agent))
+    import functions.sender as sender
+
+    deadline = time.time() + 10
+    while not sender.sio.connected and time.time() < deadline:
+        sender.connect_socket()
+        time.sleep(0.2)
+    if not sender.sio.connected:
+        print("could not connect to stand-in receiver")
+        return 1
+    sender.IS_LICENSED = True
+    time.sleep(0.5)  # let register_agent land before counting
+
+    before = run(sender, receiver, False, args.events, counter)
+    after = run(sender, receiver, True, args.events, counter)
+
+    for label, rep in (("per-entry", before), ("batched", after)):
+        print(f"{label:>10}: {rep['entries']} entries in {rep['frames']} frames, "
+              f"{rep['bytes']} bytes, {rep['frames_per_sec']} frames/s, {rep['elapsed_s']} s")
+        print(f"{'':>10}  {rep['events']}")
+    if after["frames"]:
+        print(f"frame reduction: {before['frames'] / after['frames']:.1f}x")
+
+    sender.sio.disconnect()
+    receiver.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Compression benchmark for packed (binary) agent payloads.
+
+Collects real task_info, installed_apps and system_info snapshots plus a
+synthetic network scan, and emits them through the agent sender twice: once
+plain and once packed. The stand-in receiver advertises packed support,
+decodes every agent_packed event and reports, per type, the plain size, the
+size on the wire with packing enabled, the ratio and the agent's encode CPU
+cost. Payloads under the compression threshold stay plain in both runs.
+
+    python benchmarks/bench_codec.py --agent agent-admin --rounds 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from standin_receiver import StandinReceiver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _unpack(packed):
+    body = packed["body"]
+    if packed.get("z"):
+        body = zlib.decompress(body)
+    if packed.get("fmt") == "msgpack":
+        import msgpack
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-admin", choices=["agent-user", "agent-admin"])
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--format", default=None, help="json or msgpack (default: best available)")
+    args = ap.parse_args()
+
+    logging.disable(logging.INFO)
+
+    os.environ["AGENT_PACKED"] = "1"
+    if args.format:
+        os.environ["AGENT_PACKED_FORMAT"] = args.format
+    receiver = StandinReceiver().start()
+    receiver.registration = {"isLicensed": False, "capabilities": {"packed": ["json", "msgpack"]}}
+    receiver.on("license_activate", lambda data: {"success": False, "message": "stand-in"})
+    os.environ["SERVER_URL"] = receiver.url
+    os.environ.setdefault("TENANT_KEY", "bench")
+    sys.path.insert(0, os.path.join(ROOT, args.agent))
+
+    import functions.sender as sender
+    from functions.system import get_system_info
+    from functions.taskmanager import collect_process_info
+    from functions.installed_apps import get_installed_apps
+
+    lock = threading.Lock()
+    plain = defaultdict(int)
+    packed = defaultdict(int)
+    received = {"n": 0}
+
+    def key_of(event, data):
+        return data.get("type", event) if event == "agent_data" and isinstance(data, dict) else event
+
+    def on_plain(event):
+        def hook(data):
+            size = len(json.dumps([event, data], default=str))
+            with lock:
+                target = packed if sender.PACKED_ENABLED else plain
+                target[key_of(event, data)] += size
+                received["n"] += 1
+        return hook
+
+    def on_packed(p):
+        data = _unpack(p)
+        with lock:
+            packed[key_of(p["event"], data)] += len(p["body"]) + len(json.dumps(
+                ["agent_packed", {k: v for k, v in p.items() if k != "body"}]))
+            received["n"] += 1
+
+    for event in ("agent_data", "network_scan_raw"):
+        receiver.on(event, on_plain(event))
+    receiver.on("agent_packed", on_packed)
+
+    deadline = time.time() + 10
+    while not sender.sio.connected and time.time() < deadline:
+        sender.connect_socket()
+        time.sleep(0.2)
+    time.sleep(1.0)  # registration_status round trip
+    if not sender.sio.connected or not sender.BACKEND_CAPS:
+        print("stand-in receiver did not negotiate capabilities")
+        return 1
+    sender.IS_LICENSED = True
+
+    apps = get_installed_apps()
+    payloads = [
+        ("system_info", get_system_info()),
+        ("task_info", collect_process_info(measure_interval=0.2)),
+        ("installed_apps", {"apps": apps, "count": len(apps)}),
+    ]
+    scan = [{"ip": f"192.168.{i // 254}.{i % 254 + 1}", "mac": f"aa:bb:cc:00:{i // 256:02x}:{i % 256:02x}",
+             "vendor": None} for i in range(500)]
+
+    expected = 0
+    for enabled in (False, True):
+        sender.PACKED_ENABLED = enabled
+        for _ in range(args.rounds):
+            for data_type, payload in payloads:
+                sender.send_data(data_type, payload)
+                expected += 1
+                time.sleep(0.02)  # keep snapshots from coalescing in the queue
+            if hasattr(sender, "send_raw_network_scan"):  # agent-admin only
+                sender.send_raw_network_scan(scan)
+                expected += 1
+
+        # Drain before switching modes so frames are attributed correctly
+        deadline = time.time() + 30
+        while received["n"] < expected and time.time() < deadline:
+            time.sleep(0.05)
+
+    enc = sender.get_codec_stats()
+    print(f"format: {sender.codec.fmt}, compress >= {sender.PACKED_MIN_COMPRESS} bytes, {args.rounds} round(s)")
+    print(f"{'type':<22}{'plain B':>12}{'packed B':>12}{'ratio':>8}{'encode us':>12}")
+    for key in sorted(plain):
+        ratio = plain[key] / packed[key] if packed.get(key) else float("nan")
+        cpu = enc.get(key, {}).get("cpu_us_per_emit")
+        print(f"{key:<22}{plain[key]:>12}{packed.get(key, 0):>12}{ratio:>8.1f}{cpu if cpu is not None else '-':>12}")
+
+    sender.sio.disconnect()
+    receiver.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Acknowledged delivery benchmark.
+
+Sends N event entries through the agent sender with acks negotiated and
+compares throughput against stop-and-wait delivery (one sio.call round trip
+per entry). AGENT_BATCH / AGENT_SPOOL from the environment apply as usual.
+With --disconnect-every K the stand-in receiver drops the
+connection after every K-th entry it sees; the agent must reconnect and
+retransmit its in-flight window, and the run checks that every entry
+arrived (duplicates are counted and discarded on (stream, seq), like the
+backend does).
+
+    python benchmarks/bench_delivery.py --agent agent-user --entries 5000 --window 256
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from standin_receiver import StandinReceiver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-user", choices=["agent-user", "agent-admin"])
+    ap.add_argument("--entries", type=int, default=5000)
+    ap.add_argument("--window", type=int, default=256)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--disconnect-every", type=int, default=0)
+    ap.add_argument("--stop-and-wait", type=int, default=500,
+                    help="entries sent with one round trip each, for comparison (0 to skip)")
+    args = ap.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    os.environ["AGENT_ACK"] = "1"
+    os.environ["AGENT_ACK_WINDOW"] = str(args.window)
+    os.environ["AGENT_ACK_TIMEOUT"] = str(args.timeout)
+    os.environ["AGENT_QUEUE_MAX_EVENTS"] = str(args.entries * 2)
+    os.environ["AGENT_QUEUE_EVENT_CAP"] = str(args.entries * 2)
+
+    receiver = StandinReceiver().start()
+    receiver.registration = {"isLicensed": False, "capabilities": {"ack": True}}
+    receiver.on("license_activate", lambda data: {"success": False, "message": "stand-in"})
+    os.environ["SERVER_URL"] = receiver.url
+    os.environ.setdefault("TENANT_KEY", "bench")
+    sys.path.insert(0, os.path.join(ROOT, args.agent))
+
+    import functions.sender as sender
+
+    lock = threading.Lock()
+    seen = set()
+    received = set()
+    counts = {"frames": 0, "duplicates": 0}
+
+    def on_data(entry):
+        with lock:
+            counts["frames"] += 1
+            key = (entry.get("stream"), entry.get("seq"))
+            if entry.get("seq") is not None and key in seen:
+                counts["duplicates"] += 1
+                return {"success": True, "duplicate": True, "seq": entry.get("seq")}
+            seen.add(key)
+            received.add(entry["data"]["i"])
+            n = len(received)
+        if args.disconnect_every and n % args.disconnect_every == 0:
+            receiver.disconnect_all()
+        return {"success": True, "seq": entry.get("seq")}
+
+    receiver.on("agent_data", on_data)
+    receiver.on("agent_data_batch", lambda batch: {
+        "success": True, "results": [on_data(e) for e in batch["entries"]]})
+
+    deadline = time.time() + 10
+    while not sender.sio.connected and time.time() < deadline:
+        sender.connect_socket()
+        time.sleep(0.2)
+    if not sender.sio.connected:
+        print("could not connect to stand-in receiver")
+        return 1
+    time.sleep(1.0)  # registration_status round trip
+    if not sender.get_delivery_stats()["active"]:
+        print("acks were not negotiated")
+        return 1
+    sender.IS_LICENSED = True
+
+    t0 = time.perf_counter()
+    for i in range(args.entries):
+        sender.send_data("bench_event", {"i": i})
+    deadline = time.time() + 120
+    while len(received) < args.entries and time.time() < deadline:
+        if sender.sio.connected:
+            sender.flush_queue()
+            time.sleep(0.01)
+        else:
+            # Server-side disconnects are not retried by socketio; main.py
+            # reconnects the same way
+            sender.connect_socket()
+            time.sleep(0.2)
+    while sender.get_delivery_stats()["inflight_frames"] and time.time() < deadline:
+        time.sleep(0.01)
+    windowed = time.perf_counter() - t0
+
+    stats = sender.get_delivery_stats()
+    missing = args.entries - len(received)
+    print(f"windowed:       {args.entries} entries in {windowed:.2f}s "
+          f"({args.entries / windowed:,.0f}/s), window={args.window}")
+    print(f"  frames={counts['frames']} duplicates={counts['duplicates']} missing={missing} "
+          f"retransmits={stats['retransmits']} inflight_left={stats['inflight_frames']}")
+
+    if args.stop_and_wait and not args.disconnect_every:
+        t0 = time.perf_counter()
+        for i in range(args.stop_and_wait):
+            sender.sio.call("agent_data", {"agentId": "bench", "type": "bench_event",
+                                           "data": {"i": args.entries + i}}, timeout=10)
+        saw = time.perf_counter() - t0
+        print(f"stop-and-wait:  {args.stop_and_wait} entries in {saw:.2f}s "
+              f"({args.stop_and_wait / saw:,.0f}/s)")
+
+    sender.sio.disconnect()
+    receiver.stop()
+    return 0 if missing == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Bandwidth benchmark for delta-encoded snapshots.
+
+Runs the real collectors (system_info, task_info, installed_apps) for a few
+cycles and sends each snapshot through the agent sender to an in-process
+stand-in receiver that acks like the backend and rebuilds every snapshot
+from its deltas. Reports bytes on the wire with full snapshots vs deltas and
+checks that the rebuilt snapshots match what the agent collected.
+
+    python benchmarks/bench_delta.py --agent agent-admin --cycles 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from standin_receiver import StandinReceiver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-admin", choices=["agent-user", "agent-admin"])
+    ap.add_argument("--cycles", type=int, default=10)
+    ap.add_argument("--interval", type=float, default=1.0)
+    args = ap.parse_args()
+
+    logging.disable(logging.INFO)
+
+    os.environ["AGENT_DELTA"] = "1"
+    receiver = StandinReceiver().start()
+    os.environ["SERVER_URL"] = receiver.url
+    os.environ.setdefault("TENANT_KEY", "bench")
+    sys.path.insert(0, os.path.join(ROOT, args.agent))
+
+    import functions.sender as sender
+    from functions import delta
+    from functions.system import get_system_info
+    from functions.taskmanager import collect_process_info
+    from functions.installed_apps import get_installed_apps
+
+    cache = {}
+    mismatches = []
+    expected = {}
+
+    def on_data(entry):
+        data_type = entry["type"]
+        if entry.get("encoding") == "delta":
+            base = cache.get(data_type)
+            if not base or base[0] != entry["base"]:
+                return {"success": False, "resync": True}
+            data = delta.apply(base[1], entry["data"])
+        else:
+            data = entry["data"]
+        cache[data_type] = (entry["seq"], data)
+        want = expected.get(data_type)
+        if want is not None and _canon(want) != _canon(data):
+            mismatches.append(data_type)
+        return {"success": True, "seq": entry["seq"]}
+
+    receiver.on("agent_data", on_data)
+
+    deadline = time.time() + 10
+    while not sender.sio.connected and time.time() < deadline:
+        sender.connect_socket()
+        time.sleep(0.2)
+    if not sender.sio.connected:
+        print("could not connect to stand-in receiver")
+        return 1
+    sender.IS_LICENSED = True
+    time.sleep(0.5)
+
+    full_bytes = 0
+    receiver.reset()
+    for _ in range(args.cycles):
+        apps = get_installed_apps()
+        for data_type, payload in (("system_info", get_system_info()),
+                                   ("task_info", collect_process_info(measure_interval=0.2)),
+                                   ("installed_apps", {"apps": apps, "count": len(apps)})):
+            expected[data_type] = payload
+            full_bytes += len(json.dumps(["agent_data", {"type": data_type, "data": payload}]))
+            sender.send_data(data_type, payload)
+            time.sleep(0.05)
+        time.sleep(args.interval)
+
+    rep = receiver.report()
+    print(f"cycles          : {args.cycles}")
+    print(f"full snapshots  : {full_bytes} bytes")
+    print(f"delta on wire   : {rep['bytes']} bytes ({full_bytes / max(rep['bytes'], 1):.1f}x smaller)")
+    print(f"rebuild mismatch: {len(mismatches)}")
+
+    sender.sio.disconnect()
+    receiver.stop()
+    return 0
+
+
+def _canon(obj):
+    """Order-insensitive form for comparing rebuilt snapshots (list patches may reorder items)."""
+    if isinstance(obj, dict):
+        return {k: _canon(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return sorted((_canon(i) for i in obj), key=repr)
+    return obj
+
+
+if __name__ == "__main__":
+    sys.exit(main())
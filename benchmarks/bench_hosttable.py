@@ -0,0 +1,99 @@
+"""
+Per-cycle target selection cost of the visualizer scanner on large subnets.
+
+Compares the previous incremental_scan() bookkeeping (a dotted string per
+subnet host every cycle, neighbors_of() building ip_network objects per
+alive host, random.sample over the remainder) with the offset-indexed
+HostTable (visualizer-scanner/hosttable.py). Probing itself is left out.
+
+    python benchmarks/bench_hosttable.py --cidr 10.20.0.0/16 --alive 500
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agent-admin", "visualizer-scanner"))
+
+from hosttable import HostTable  # noqa: E402
+
+NEIGHBOR_RANGE = 2
+SAMPLE = 30
+
+
+def old_neighbors_of(ip_str, cidr, rng=NEIGHBOR_RANGE):
+    ip = ipaddress.IPv4Address(ip_str)
+    net = ipaddress.ip_network(cidr, False)
+    base = int(ip)
+    out = []
+    for d in range(-rng, rng + 1):
+        if d == 0:
+            continue
+        cand = ipaddress.IPv4Address(base + d)
+        if cand in net:
+            out.append(str(cand))
+    return out
+
+
+def old_targets(previous_alive, cidr):
+    net = ipaddress.ip_network(cidr, False)
+    all_hosts = [str(h) for h in net.hosts()]
+    target = set(previous_alive)
+    for ip in list(previous_alive):
+        for n in old_neighbors_of(ip, cidr):
+            target.add(n)
+    remaining = [h for h in all_hosts if h not in target]
+    if remaining:
+        target.update(random.sample(remaining, min(SAMPLE, len(remaining))))
+    return [str(ip) for ip in target]
+
+
+def new_targets(table):
+    target = set(table.alive)
+    for offset in table.alive:
+        target.update(table.neighbors(offset, NEIGHBOR_RANGE))
+    target.update(table.sample(SAMPLE, target))
+    return [table.ip_of(o) for o in target]
+
+
+def measure(fn, rounds):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    secs = (time.perf_counter() - t0) / rounds
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return secs, peak, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cidr", default="10.20.0.0/16")
+    ap.add_argument("--alive", type=int, default=500)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    table = HostTable(args.cidr)
+    offsets = random.Random(3).sample(list(table.host_offsets()), args.alive)
+    table.record_cycle({o: bytes([2, 0, 0, 0, o >> 8 & 255, o & 255]) for o in offsets}, time.time())
+    alive_ips = [table.ip_of(o) for o in offsets]
+
+    state_bytes = (table.last_seen.itemsize * len(table.last_seen)
+                   + table.mac_index.itemsize * len(table.mac_index) + len(table.backoff))
+    print(f"{args.cidr}: {table.host_count} hosts, {args.alive} alive, "
+          f"table arrays {state_bytes / 1024:.0f} KiB")
+    for name, fn in (("old (strings, ip_network)", lambda: old_targets(alive_ips, args.cidr)),
+                     ("HostTable (offsets)", lambda: new_targets(table))):
+        secs, peak, targets = measure(fn, args.rounds)
+        print(f"  {name:28s} {secs * 1000:9.2f} ms/cycle   peak alloc {peak / 1024 / 1024:7.2f} MiB   "
+              f"{len(targets)} targets")
+
+
+if __name__ == "__main__":
+    main()
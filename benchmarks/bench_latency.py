@@ -0,0 +1,102 @@
+"""
+End-to-end latency benchmark for the sender loop.
+
+Several producer threads call send_data() concurrently, like the agent's
+collectors and monitors do; each entry carries its send time and the
+stand-in receiver records how long it took to arrive. Reports p50/p95/max
+latency and entries/s. AGENT_BATCH / AGENT_ACK from the environment apply
+as usual.
+
+    python benchmarks/bench_latency.py --agent agent-user --producers 4 --entries 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from standin_receiver import StandinReceiver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-user", choices=["agent-user", "agent-admin"])
+    ap.add_argument("--producers", type=int, default=4)
+    ap.add_argument("--entries", type=int, default=500, help="entries per producer")
+    ap.add_argument("--gap", type=float, default=0.002, help="seconds between sends per producer")
+    args = ap.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    receiver = StandinReceiver().start()
+    receiver.registration = {"isLicensed": False, "capabilities": {"ack": True}}
+    receiver.on("license_activate", lambda data: {"success": False, "message": "stand-in"})
+    os.environ["SERVER_URL"] = receiver.url
+    os.environ.setdefault("TENANT_KEY", "bench")
+    sys.path.insert(0, os.path.join(ROOT, args.agent))
+
+    import functions.sender as sender
+
+    lock = threading.Lock()
+    latencies = []
+
+    def on_entry(entry):
+        lat = time.time() - entry["data"]["sent_at"]
+        with lock:
+            latencies.append(lat)
+        return {"success": True, "seq": entry.get("seq")}
+
+    receiver.on("agent_data", on_entry)
+    receiver.on("agent_data_batch", lambda batch: {
+        "success": True, "results": [on_entry(e) for e in batch["entries"]]})
+
+    deadline = time.time() + 10
+    while not sender.sio.connected and time.time() < deadline:
+        sender.connect_socket()
+        time.sleep(0.2)
+    if not sender.sio.connected:
+        print("could not connect to stand-in receiver")
+        return 1
+    time.sleep(1.0)  # registration_status round trip
+    sender.IS_LICENSED = True
+
+    def produce(n):
+        for i in range(args.entries):
+            sender.send_data("bench_event", {"producer": n, "i": i, "sent_at": time.time()})
+            time.sleep(args.gap)
+
+    total = args.producers * args.entries
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(args.producers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    deadline = time.time() + 30
+    while len(latencies) < total and time.time() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - t0
+
+    ms = [v * 1000 for v in latencies]
+    print(f"{len(ms)}/{total} entries from {args.producers} producers in {elapsed:.2f}s "
+          f"({len(ms) / elapsed:,.0f}/s)")
+    print(f"latency ms: p50={_pct(ms, 0.5):.2f} p95={_pct(ms, 0.95):.2f} max={max(ms or [0]):.2f}")
+
+    sender.sio.disconnect()
+    receiver.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Probe traffic and join/leave detection latency of the visualizer scanner's
+target selection, simulated on a virtual clock (no packets are sent).
+
+Compares the previous incremental_scan() policy (every alive host, its
+neighbors and 30 random hosts each cycle; one miss means down) with the
+HostTable liveness model (visualizer-scanner/hosttable.py, ProbePolicy).
+A simulated subnet has stable hosts, a few flapping ones, and a host
+joining and another leaving every --churn seconds.
+
+    python benchmarks/bench_liveness.py --cidr 192.168.1.0/24 --alive 60 --minutes 60
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agent-admin", "visualizer-scanner"))
+
+from hosttable import HostTable, ProbePolicy  # noqa: E402
+
+CYCLE = 2.0
+NEIGHBOR_RANGE = 2
+SAMPLE = 30
+
+
+class World:
+    def __init__(self, table, alive, flappers, churn, seed):
+        self.rng = random.Random(seed)
+        hosts = list(table.host_offsets())
+        self.up = set(self.rng.sample(hosts, alive))
+        self.free = [o for o in hosts if o not in self.up]
+        self.flappers = set(self.rng.sample(sorted(self.up), flappers))
+        self.churn = churn
+        self.next_churn = churn
+        self.changes = {}           # offset -> (time, up) awaiting detection
+
+    def step(self, now):
+        if int(now) % 10 == 0:
+            for o in self.flappers:
+                if o in self.up:
+                    self.up.discard(o)
+                else:
+                    self.up.add(o)
+        if now >= self.next_churn:
+            self.next_churn += self.churn
+            joined = self.free.pop(self.rng.randrange(len(self.free)))
+            self.up.add(joined)
+            self.changes[joined] = (now, True)
+            left = self.rng.choice(sorted(self.up - self.flappers - {joined}))
+            self.up.discard(left)
+            self.free.append(left)
+            self.changes[left] = (now, False)
+
+
+def old_targets(table, alive):
+    target = set(alive)
+    for o in alive:
+        target.update(table.neighbors(o, NEIGHBOR_RANGE))
+    target.update(table.sample(SAMPLE, target))
+    return target
+
+
+def run(cidr, alive, flappers, minutes, churn, adaptive, seed=7):
+    policy = ProbePolicy(CYCLE, join_slo=120.0, leave_slo=30.0, max_sample=SAMPLE)
+    table = HostTable(cidr, policy)
+    world = World(table, alive, flappers, churn, seed)
+    random.seed(seed)
+
+    # Initial full sweep, as at scanner start
+    every = table.host_offsets()
+    table.record_cycle({o: None for o in every if o in world.up}, 0.0, every)
+    detected = set(table.alive)
+
+    probes, latencies = [], {True: [], False: []}
+    now = 0.0
+    while now < minutes * 60:
+        now += CYCLE
+        world.step(now)
+        if adaptive:
+            target = table.due(now, NEIGHBOR_RANGE)
+            target.update(table.sweep(policy.sample_size(table.unknown_count()), target))
+        else:
+            target = old_targets(table, detected)
+        probes.append(len(target))
+        found = {o: None for o in target if o in world.up}
+        if adaptive:
+            table.record_cycle(found, now, target)
+            detected = set(table.alive)
+        else:
+            detected = set(found)
+            table.alive = detected
+        for o, (t, up) in list(world.changes.items()):
+            if (o in detected) == up:
+                latencies[up].append(now - t)
+                del world.changes[o]
+    missed = len(world.changes)
+    return statistics.mean(probes), latencies, missed
+
+
+def fmt(values):
+    if not values:
+        return "      -"
+    values = sorted(values)
+    p95 = values[int(0.95 * (len(values) - 1))]
+    return f"p50 {statistics.median(values):5.0f}s  p95 {p95:5.0f}s  max {values[-1]:5.0f}s"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cidr", default="192.168.1.0/24")
+    ap.add_argument("--alive", type=int, default=60)
+    ap.add_argument("--flappers", type=int, default=3)
+    ap.add_argument("--minutes", type=int, default=60)
+    ap.add_argument("--churn", type=float, default=60.0, help="seconds between join/leave pairs")
+    args = ap.parse_args()
+
+    print(f"{args.cidr}: {args.alive} alive ({args.flappers} flapping), join+leave every {args.churn:.0f}s, "
+          f"{args.minutes} min, cycle {CYCLE:.0f}s, SLO join 120s / leave 30s")
+    for name, adaptive in (("old (alive+neighbors+30)", False), ("liveness (ProbePolicy)", True)):
+        mean_probes, lat, missed = run(args.cidr, args.alive, args.flappers, args.minutes,
+                                       args.churn, adaptive)
+        print(f"  {name:26s} {mean_probes:6.1f} hosts/cycle   join {fmt(lat[True])}   "
+              f"leave {fmt(lat[False])}   undetected {missed}")
+
+
+if __name__ == "__main__":
+    main()
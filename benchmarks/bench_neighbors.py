@@ -0,0 +1,107 @@
+"""
+Neighbor table parsing benchmark for the visualizer scanner.
+
+Records synthetic ARP tables with thousands of entries in each source
+format and compares the previous read_arp_table() parsing (per-call regex
+compile, an IPv4Address per line, string keys) with the readers in
+visualizer-scanner/neighbor_table.py. Also times one live read of each
+source available on this host (`arp -a` subprocess vs the native one).
+
+    python benchmarks/bench_neighbors.py --entries 5000
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import struct
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agent-admin", "visualizer-scanner"))
+
+import neighbor_table as nt  # noqa: E402
+
+
+def old_parse(out, cidr):
+    """Parsing half of the previous scanner_service.read_arp_table()."""
+    import re
+    net = ipaddress.ip_network(cidr, False)
+    res = {}
+    mac_regex = re.compile(r"([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})")
+    for line in out.splitlines():
+        parts = line.strip().split()
+        if not parts:
+            continue
+        try:
+            a = ipaddress.IPv4Address(parts[0])
+            if a in net and not a.is_multicast and not a.is_loopback and a != net.broadcast_address:
+                m = mac_regex.search(line)
+                res[str(a)] = m.group(0).replace("-", ":").lower() if m else None
+        except Exception:
+            continue
+    return res
+
+
+def record(entries):
+    rnd = random.Random(7)
+    rows = []
+    for i in range(entries):
+        ip = (10 << 24) | (i + 1)
+        mac = bytes([2] + [rnd.randrange(256) for _ in range(5)])
+        rows.append((ip, mac))
+    windows = "Interface: 10.0.0.5 --- 0xb\n  Internet Address      Physical Address      Type\n" + "".join(
+        f"  {nt.int_to_ip(ip):<20s}  {mac.hex('-'):<20s}  dynamic\n" for ip, mac in rows)
+    proc = "IP address       HW type     Flags       HW address            Mask     Device\n" + "".join(
+        f"{nt.int_to_ip(ip):<16s} 0x1         0x2         {mac.hex(':')}     *        eth0\n" for ip, mac in rows)
+    ipnet = struct.pack("<I", len(rows)) + b"".join(
+        struct.pack("<II8s4sI", 11, 6, mac + b"\0\0", ip.to_bytes(4, "big"), 3) for ip, mac in rows)
+    return windows, proc, ipnet
+
+
+def timed(fn, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - t0) / rounds, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=5000)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    windows, proc, ipnet = record(args.entries)
+    cidr = "10.0.0.0/8"
+    network, netmask = 10 << 24, 0xFF000000
+
+    table = nt.NeighborTable()
+    cases = [
+        ("old read_arp_table parse (arp -a text)", lambda: old_parse(windows, cidr)),
+        ("parse_arp_output (arp -a text)", lambda: nt.parse_arp_output(windows)),
+        ("parse_proc_arp (/proc/net/arp)", lambda: nt.parse_proc_arp(proc)),
+        ("parse_ipnettable (GetIpNetTable)", lambda: nt.parse_ipnettable(ipnet)),
+    ]
+    print(f"{args.entries} recorded entries, mean of {args.rounds} round(s)")
+    for name, fn in cases:
+        secs, result = timed(fn, args.rounds)
+        print(f"  {name:42s} {secs * 1000:8.2f} ms   {len(result)} entries")
+
+    # Subnet filtering with ints, as the scanner does every cycle
+    parsed = nt.parse_proc_arp(proc)
+    table.read = lambda: parsed
+    secs, result = timed(lambda: table.in_subnet(network, netmask), args.rounds)
+    print(f"  {'in_subnet (int mask filter)':42s} {secs * 1000:8.2f} ms   {len(result)} entries")
+
+    print("live read on this host:")
+    secs, result = timed(nt.read_arp_command, 5)
+    print(f"  {'arp -a subprocess + parse':42s} {secs * 1000:8.2f} ms   {len(result)} entries")
+    if os.path.exists("/proc/net/arp"):
+        secs, result = timed(nt.read_proc_arp, 5)
+        print(f"  {'/proc/net/arp':42s} {secs * 1000:8.2f} ms   {len(result)} entries")
+
+
+if __name__ == "__main__":
+    main()
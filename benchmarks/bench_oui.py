@@ -0,0 +1,89 @@
+"""
+MAC vendor lookups/sec of the mmap'd OUI index (agent-admin/functions/oui.py,
+data/oui.bin) against a plain {prefix: name} dict loaded from the same
+file, plus what each costs to load and keep.
+
+    python benchmarks/bench_oui.py --lookups 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agent-admin"))
+
+from functions.oui import HEADER, OUI_FILE, RECORD_SIZE, OuiIndex, mac_prefix  # noqa: E402
+
+
+def load_dict(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    _, count, names = HEADER.unpack_from(data)
+    table = {}
+    for i in range(count):
+        at = HEADER.size + i * RECORD_SIZE
+        name_at = names + int.from_bytes(data[at + 3:at + 6], "big")
+        table[int.from_bytes(data[at:at + 3], "big")] = data[name_at + 1:name_at + 1 + data[name_at]].decode()
+    return table
+
+
+def sample_macs(index, n, known_share, seed=5):
+    rng = random.Random(seed)
+    prefixes = []
+    m = index._map
+    for _ in range(n):
+        if rng.random() < known_share:
+            at = HEADER.size + rng.randrange(index.count) * RECORD_SIZE
+            prefix = int.from_bytes(m[at:at + 3], "big")
+        else:
+            prefix = rng.randrange(1 << 24) & ~0x030000
+        tail = rng.randrange(1 << 24)
+        prefixes.append(":".join(f"{b:02x}" for b in (prefix << 24 | tail).to_bytes(6, "big")))
+    return prefixes
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=OUI_FILE)
+    ap.add_argument("--lookups", type=int, default=200000)
+    ap.add_argument("--known", type=float, default=0.8, help="share of MACs with a registered prefix")
+    args = ap.parse_args()
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    index = OuiIndex(args.path)
+    index.open()
+    open_ms = (time.perf_counter() - t0) * 1000
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    table = load_dict(args.path)
+    dict_ms = (time.perf_counter() - t0) * 1000
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    macs = sample_macs(index, args.lookups, args.known)
+    print(f"{index.count} prefixes, {os.path.getsize(args.path) / 1024:.0f} KiB file, "
+          f"{args.lookups} lookups ({args.known:.0%} registered)")
+
+    t0 = time.perf_counter()
+    hits = sum(1 for mac in macs if index.lookup(mac))
+    secs = time.perf_counter() - t0
+    print(f"  mmap index   open {open_ms:7.2f} ms   heap {index_bytes / 1024:8.0f} KiB   "
+          f"{args.lookups / secs:10.0f} lookups/s   {hits} hits")
+
+    t0 = time.perf_counter()
+    hits = sum(1 for mac in macs if table.get(mac_prefix(mac)))
+    secs = time.perf_counter() - t0
+    print(f"  dict         load {dict_ms:7.2f} ms   heap {dict_bytes / 1024:8.0f} KiB   "
+          f"{args.lookups / secs:10.0f} lookups/s   {hits} hits")
+
+
+if __name__ == "__main__":
+    main()
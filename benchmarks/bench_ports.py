@@ -0,0 +1,108 @@
+"""
+Local port scan benchmark: selector engine vs the previous thread pool.
+
+Opens a few listeners on the target, then runs both engines over the same
+range several times and reports wall time, CPU time and peak thread count
+per scan. Both engines must find the same open ports.
+
+    python benchmarks/bench_ports.py --range 1-1024 --rounds 5
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ThreadPeak:
+    """Samples threading.active_count() in the background."""
+
+    def __init__(self, every=0.002):
+        self.every = every
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.every):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        # Minus the sampler itself
+        self.peak -= 1
+
+
+def measure(fn, rounds):
+    walls, cpus, peaks, result = [], [], [], None
+    for _ in range(rounds):
+        with ThreadPeak() as tp:
+            w0, c0 = time.perf_counter(), time.process_time()
+            result = fn()
+            walls.append(time.perf_counter() - w0)
+            cpus.append(time.process_time() - c0)
+        peaks.append(tp.peak)
+    return result, sum(walls) / rounds, sum(cpus) / rounds, max(peaks)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--target", default="127.0.0.1")
+    ap.add_argument("--range", default="1-1024")
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=0.35)
+    ap.add_argument("--workers", type=int, default=300)
+    ap.add_argument("--listeners", type=int, default=5)
+    args = ap.parse_args()
+
+    sys.path.insert(0, os.path.join(ROOT, "agent-admin"))
+    from functions.ports import _parse_port_range, _scan_selector, _scan_threaded
+
+    start, end = _parse_port_range(args.range)
+    ports = range(start, end + 1)
+
+    listeners = []
+    for port in ports:
+        if len(listeners) >= args.listeners:
+            break
+        s = socket.socket()
+        try:
+            s.bind((args.target, port))
+            s.listen()
+            listeners.append(s)
+        except OSError:
+            s.close()
+
+    try:
+        engines = {
+            "threads": lambda: sorted(_scan_threaded(args.target, ports, args.timeout, args.workers)),
+            "selector": lambda: sorted(_scan_selector(args.target, ports, args.timeout, args.workers)),
+        }
+        results = {}
+        print(f"{args.target} {start}-{end} ({len(ports)} ports, {len(listeners)} bench listener(s)), "
+              f"{args.rounds} round(s), workers/in-flight={args.workers}")
+        for name, fn in engines.items():
+            found, wall, cpu, peak = measure(fn, args.rounds)
+            results[name] = found
+            print(f"  {name:9s} wall {wall * 1000:8.1f} ms   cpu {cpu * 1000:8.1f} ms   "
+                  f"peak threads {peak:4d}   open {len(found)}")
+    finally:
+        for s in listeners:
+            s.close()
+
+    if results["threads"] != results["selector"]:
+        print(f"MISMATCH: threads={results['threads']} selector={results['selector']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
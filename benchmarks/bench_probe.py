@@ -0,0 +1,118 @@
+"""
+Host sweep benchmark for the visualizer scanner's TCP probe engine.
+
+Sweeps N loopback addresses (127.0.x.1..N) with the selector engine
+(visualizer-scanner/probe.py) and with the previous design (blocking
+probes, ports tried one after another, on a 200-thread pool).
+
+Loopback answers closed ports with an instant RST, so silent hosts are
+emulated: each probe port gets a listener on 0.0.0.0 whose accept queue
+is kept full, which makes the kernel drop further SYNs (connect times
+out). A last sweep puts a closed port first, so every host answers with
+a RST.
+
+    python benchmarks/bench_probe.py --hosts 254
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agent-admin", "visualizer-scanner"))
+
+from probe import ProbeEngine  # noqa: E402
+
+
+def threaded_sweep(ips, ports, timeout, threads=200):
+    """The previous scanner_service probe: sequential ports per host, thread pool."""
+    def tcp_probe(ip):
+        for port in ports:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.settimeout(timeout)
+            try:
+                if s.connect_ex((ip, port)) == 0:
+                    return True
+            except OSError:
+                pass
+            finally:
+                s.close()
+        return False
+
+    alive = set()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        futures = {ex.submit(tcp_probe, ip): ip for ip in ips}
+        for fut in as_completed(futures):
+            if fut.result():
+                alive.add(futures[fut])
+    return alive
+
+
+def blackhole_ports(count):
+    """Listeners with a full accept queue: further connects to them hang."""
+    held = []
+    ports = []
+    for _ in range(count):
+        listener = socket.socket()
+        listener.bind(("0.0.0.0", 0))
+        listener.listen(0)
+        port = listener.getsockname()[1]
+        held.append(listener)
+        # Fill the accept queue (backlog 0 still queues one or two)
+        for _ in range(3):
+            c = socket.socket()
+            c.setblocking(False)
+            c.connect_ex(("127.0.0.1", port))
+            held.append(c)
+        ports.append(port)
+    time.sleep(0.2)
+    return ports, held
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hosts", type=int, default=254)
+    ap.add_argument("--ports", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=0.12)
+    ap.add_argument("--inflight", type=int, default=512)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    ports, held = blackhole_ports(args.ports)
+    ips = [f"127.0.{1 + i // 254}.{1 + i % 254}" for i in range(args.hosts)]
+    engine = ProbeEngine(ports, timeout=args.timeout, max_inflight=args.inflight)
+
+    try:
+        print(f"{args.hosts} silent hosts x {args.ports} ports, timeout {args.timeout}s, "
+              f"{args.rounds} round(s)")
+        for name, sweep in (("threads", lambda: threaded_sweep(ips, ports, args.timeout)),
+                            ("selector", lambda: engine.probe(ips))):
+            walls, cpus = [], []
+            for _ in range(args.rounds):
+                w0, c0 = time.perf_counter(), time.process_time()
+                alive = sweep()
+                walls.append(time.perf_counter() - w0)
+                cpus.append(time.process_time() - c0)
+            print(f"  {name:9s} wall {sum(walls) / len(walls):6.3f} s   "
+                  f"cpu {sum(cpus) / len(cpus):6.3f} s   alive {len(alive)}")
+
+        # Every host answers on the first (closed) port
+        probe_sock = socket.socket()
+        probe_sock.bind(("127.0.0.1", 0))
+        closed_port = probe_sock.getsockname()[1]
+        probe_sock.close()
+        engine.ports = [closed_port] + ports
+        w0 = time.perf_counter()
+        alive = engine.probe(ips)
+        print(f"  selector, all hosts answering RST: {time.perf_counter() - w0:.3f} s, "
+              f"alive {len(alive)}/{len(ips)}, {engine.last_stats['connects']} connects")
+    finally:
+        for s in held:
+            s.close()
+
+
+if __name__ == "__main__":
+    main()
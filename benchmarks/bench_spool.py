@@ -0,0 +1,72 @@
+"""
+Write-throughput and replay benchmark for the on-disk telemetry spool.
+
+Appends N app_usage-sized records, then replays them from a fresh Spool
+instance (as after a restart) in drain-sized chunks with acks.
+
+    python benchmarks/bench_spool.py --agent agent-user --records 100000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-user", choices=["agent-user", "agent-admin"])
+    ap.add_argument("--records", type=int, default=100000)
+    ap.add_argument("--chunk", type=int, default=200)
+    ap.add_argument("--segment-bytes", type=int, default=4 * 1024 * 1024)
+    args = ap.parse_args()
+
+    sys.path.insert(0, os.path.join(ROOT, args.agent))
+    from functions.spool import Spool
+
+    entry = {
+        "timestamp": "2025-01-01T00:00:00",
+        "agentId": "bench-agent",
+        "type": "app_usage",
+        "data": {"eventType": "OPEN", "appName": "chrome.exe", "pid": 4242,
+                 "timestamp": "2025-01-01T00:00:00+00:00", "title": "Inbox - Mail"},
+    }
+
+    tmp = tempfile.mkdtemp(prefix="spool-bench-")
+    try:
+        sp = Spool(tmp, segment_size=args.segment_bytes, max_segments=1 << 20)
+        t0 = time.perf_counter()
+        for i in range(args.records):
+            entry["data"]["pid"] = i
+            sp.append(entry)
+        write_s = time.perf_counter() - t0
+        written = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.endswith(".seg"))
+        sp.close()
+
+        sp = Spool(tmp, segment_size=args.segment_bytes, max_segments=1 << 20)
+        t0 = time.perf_counter()
+        replayed = 0
+        while True:
+            records = sp.read(args.chunk)
+            if not records:
+                break
+            replayed += len(records)
+            sp.ack(records[-1][0])
+        replay_s = time.perf_counter() - t0
+        left = len([f for f in os.listdir(tmp) if f.endswith(".seg")])
+        sp.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"write : {args.records} records in {write_s:.3f} s "
+          f"({args.records / write_s:,.0f} rec/s, {written / write_s / 1e6:.1f} MB/s of segments)")
+    print(f"replay: {replayed} records in {replay_s:.3f} s "
+          f"({replayed / replay_s:,.0f} rec/s, chunk={args.chunk}), {left} segment(s) left after compaction")
+
+
+if __name__ == "__main__":
+    main()
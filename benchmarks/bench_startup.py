@@ -0,0 +1,142 @@
+"""
+Startup benchmark: time-to-first-heartbeat and import-time breakdown.
+
+Starts the agent's modules in a fresh interpreter (`python -X importtime`),
+in the order main.py imports them, then connects the sender from a
+background thread the way main.py's socket thread does. The first
+heartbeat is the agent's register_agent reaching the stand-in receiver
+(the backend marks the agent online on it).
+
+Reports:
+  - time until the agent modules are imported (main loop could start)
+  - time-to-first-heartbeat
+  - the slowest imports (cumulative) as reported by -X importtime
+
+Exits with status 1 when either time exceeds its threshold, so it can be
+used as a regression check:
+
+    python benchmarks/bench_startup.py --agent agent-admin --max-import 0.5 --max-heartbeat 3
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from standin_receiver import StandinReceiver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mirrors the imports at the top of each agent's main.py
+AGENT_MODULES = {
+    "agent-user": ["functions.system", "functions.taskmanager", "functions.installed_apps",
+                   "functions.sender", "functions.scheduler", "functions.usbMonitor",
+                   "functions.fileMonitor"],
+    "agent-admin": ["functions.system", "functions.ports", "functions.taskmanager",
+                    "functions.installed_apps", "functions.sender", "functions.scheduler",
+                    "functions.usbMonitor"],
+}
+
+DRIVER = r"""
+import importlib, os, sys, threading, time
+t0 = float(os.environ["BENCH_T0"])
+sys.path.insert(0, os.getcwd())
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:  # Windows-only modules when benchmarking elsewhere
+        print(f"SKIPPED {name}: {e!r}", flush=True)
+print(f"IMPORTED {time.time() - t0:.4f}", flush=True)
+import functions.sender as sender
+threading.Thread(target=sender.connect_socket, daemon=True).start()
+time.sleep(60)
+"""
+
+
+def _parse_importtime(stderr_text):
+    """Returns [(cumulative_us, self_us, module)] from -X importtime output."""
+    rows = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3:
+            rows.append((int(parts[1]), int(parts[0]), parts[2].strip()))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agent", default="agent-user", choices=list(AGENT_MODULES))
+    ap.add_argument("--top", type=int, default=12)
+    ap.add_argument("--max-import", type=float, default=0.5, help="seconds until modules are imported")
+    ap.add_argument("--max-heartbeat", type=float, default=3.0, help="seconds until register_agent arrives")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    args = ap.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    receiver = StandinReceiver().start()
+    heartbeat = {}
+    arrived = threading.Event()
+
+    def on_register(data):
+        heartbeat.setdefault("at", time.time())
+        arrived.set()
+
+    receiver.on("register_agent", on_register)
+
+    env = dict(os.environ, SERVER_URL=receiver.url, TENANT_KEY=os.getenv("TENANT_KEY", "bench"))
+    env["BENCH_T0"] = repr(time.time())
+    t0 = float(env["BENCH_T0"])
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", DRIVER, *AGENT_MODULES[args.agent]],
+        cwd=os.path.join(ROOT, args.agent), env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+
+    imported = None
+    skipped = []
+    for line in proc.stdout:
+        if line.startswith("SKIPPED"):
+            skipped.append(line.strip())
+        elif line.startswith("IMPORTED"):
+            imported = float(line.split()[1])
+            break
+
+    arrived.wait(args.timeout)
+    ttfh = heartbeat["at"] - t0 if "at" in heartbeat else None
+
+    proc.kill()
+    _, stderr_text = proc.communicate()
+    receiver.stop()
+
+    rows = _parse_importtime(stderr_text)
+    if imported is None:
+        errors = [l for l in stderr_text.splitlines() if not l.startswith("import time:")]
+        print("agent startup failed:\n" + "\n".join(errors[-15:]))
+    print(f"agent: {args.agent}")
+    for s in skipped:
+        print(f"  {s}")
+    print(f"modules imported:         {imported:.3f}s" if imported is not None else "modules imported: n/a")
+    print(f"time-to-first-heartbeat:  {ttfh:.3f}s" if ttfh is not None else "time-to-first-heartbeat: none")
+    print(f"\nslowest imports (cumulative ms, self ms):")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:9.1f} {self_us / 1000:8.1f}  {name}")
+
+    failed = []
+    if imported is None or imported > args.max_import:
+        failed.append(f"import {imported}s > {args.max_import}s")
+    if ttfh is None or ttfh > args.max_heartbeat:
+        failed.append(f"first heartbeat {ttfh}s > {args.max_heartbeat}s")
+    if failed:
+        print("\nREGRESSION: " + "; ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Stand-in Socket.IO receiver for agent benchmarks.
+
+Accepts any agent connection and counts the frames and bytes of every
+event it receives. Runs in-process on a background thread so benchmark
+scripts can point an agent's sender at it through SERVER_URL.
+
+Set `registration` to a dict to answer register_agent with a
+registration_status event (e.g. to advertise backend capabilities).
+`disconnect_all()` drops every connected agent, to exercise reconnects.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import defaultdict
+
+import socketio
+from aiohttp import web
+
+
+def _binary_len(obj):
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(_binary_len(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_binary_len(v) for v in obj)
+    return 0
+
+
+def _wire_size(obj):
+    """JSON text size plus raw binary attachment sizes."""
+    text = json.dumps(obj, default=lambda o: "" if isinstance(o, (bytes, bytearray)) else str(o))
+    return len(text) + _binary_len(obj)
+
+
+class StandinReceiver:
+    def __init__(self, host="127.0.0.1", port=0):
+        if port == 0:
+            with socket.socket() as s:
+                s.bind((host, 0))
+                port = s.getsockname()[1]
+        self.host = host
+        self.port = port
+        self.url = f"http://{host}:{port}"
+
+        self.sio = socketio.AsyncServer(async_mode="aiohttp", max_http_buffer_size=64 * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.hooks = {}
+        self.registration = None
+        self.sids = set()
+        self.reset()
+
+        @self.sio.event
+        async def connect(sid, environ, auth=None):
+            self.sids.add(sid)
+            return True
+
+        @self.sio.event
+        async def disconnect(sid, *args):
+            self.sids.discard(sid)
+
+        @self.sio.on("*")
+        async def catch_all(event, sid, data=None):
+            self._record(event, data)
+            if event == "register_agent" and self.registration is not None:
+                await self.sio.emit("registration_status", self.registration, to=sid)
+            hook = self.hooks.get(event)
+            if hook:
+                return hook(data)
+
+        self.app = web.Application()
+        self.sio.attach(self.app)
+        self.loop = asyncio.new_event_loop()
+        self._runner = None
+
+    def reset(self):
+        with self.lock:
+            self.frames = defaultdict(int)
+            self.bytes = defaultdict(int)
+            self.first_at = None
+            self.last_at = None
+
+    def _record(self, event, data):
+        size = _wire_size([event, data])
+        now = time.time()
+        with self.lock:
+            self.frames[event] += 1
+            self.bytes[event] += size
+            if self.first_at is None:
+                self.first_at = now
+            self.last_at = now
+
+    def on(self, event, hook):
+        """Registers hook(data) for an event; its return value is the ack."""
+        self.hooks[event] = hook
+
+    def disconnect_all(self):
+        """Schedules a server-side disconnect of every agent; safe from hooks."""
+        for sid in list(self.sids):
+            asyncio.run_coroutine_threadsafe(self.sio.disconnect(sid), self.loop)
+
+    def start(self):
+        ready = threading.Event()
+
+        async def serve():
+            self._runner = web.AppRunner(self.app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            ready.set()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(serve())
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(10)
+        return self
+
+    def stop(self):
+        if self._runner:
+            fut = asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop)
+            try:
+                fut.result(5)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def report(self, elapsed=None):
+        with self.lock:
+            frames = sum(self.frames.values())
+            total = sum(self.bytes.values())
+            if elapsed is None and self.first_at is not None:
+                elapsed = max(self.last_at - self.first_at, 1e-6)
+            per_event = {e: {"frames": self.frames[e], "bytes": self.bytes[e]} for e in self.frames}
+        rate = frames / elapsed if elapsed else 0.0
+        return {"frames": frames, "bytes": total, "frames_per_sec": round(rate, 2), "events": per_event}
+
+
+if __name__ == "__main__":
+    r = StandinReceiver(port=5000).start()
+    print(f"Stand-in receiver listening on {r.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(json.dumps(r.report()))
+    except KeyboardInterrupt:
+        r.stop()
@@ -0,0 +1,43 @@
+"""
+Regenerates agent-admin/data/oui.bin (MAC vendor index, functions/oui.py)
+from the IEEE MA-L registry CSV:
+
+    https://standards-oui.ieee.org/oui/oui.csv
+
+    python build_oui.py --csv oui.csv
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "agent-admin"))
+
+from functions.oui import build_index, read_ieee_csv  # noqa: E402
+
+DEFAULT_OUT = os.path.join(ROOT, "agent-admin", "data", "oui.bin")
+
+
+def build(csv_path, out_path=DEFAULT_OUT):
+    data = build_index(read_ieee_csv(csv_path))
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+    return data
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", default=os.path.join(ROOT, "agent-admin", "data", "oui.csv"))
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    args = ap.parse_args()
+
+    data = build(args.csv, args.out)
+    count = int.from_bytes(data[4:8], "big")
+    print(f"[OUI] {count} prefixes, {len(data) / 1024:.0f} KiB -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
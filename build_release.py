@@ -57,10 +57,17 @@ def build_app(app_id):
     
     # 🔹 ADD DATA for Admin Agent
     if app_id == "agent-admin":
-        # Bundling visualizer-scanner and python-embed
+        # Regenerate the MAC vendor index when a fresh IEEE CSV was dropped in
+        oui_csv = os.path.join(app_dir, "data", "oui.csv")
+        if os.path.exists(oui_csv):
+            print("[BUILD] Rebuilding data/oui.bin from oui.csv...")
+            subprocess.check_call([sys.executable, os.path.join(PROJECT_ROOT, "build_oui.py"), "--csv", oui_csv])
+
+        # Bundling visualizer-scanner, python-embed and the OUI index
         pyinstaller_cmd.extend([
             "--add-data", f"visualizer-scanner;visualizer-scanner",
-            "--add-data", f"python-embed;python-embed"
+            "--add-data", f"python-embed;python-embed",
+            "--add-data", f"data/oui.bin;data"
         ])
         
     subprocess.check_call(pyinstaller_cmd, cwd=app_dir)